@@ -1,132 +1,14 @@
 import os
-import re
 import fitz  # PyMuPDF
 import customtkinter as ctk
 import tkinter as tk
 from tkinter import filedialog, messagebox
 from pathlib import Path
-from typing import List, Optional, Tuple, Dict
+from typing import Optional, Dict
 import threading
 
-
-# ==================== CONFIGURACIÓN ====================
-ctk.set_appearance_mode("dark")
-ctk.set_default_color_theme("blue")
-
-
-# ==================== UTILIDADES ====================
-
-def parse_page_ranges(ranges: str, max_page: int) -> Optional[List[int]]:
-    """
-    Parsea un string de rangos como "1-3,5,7-9" a lista de índices 0-based.
-    Retorna None si hay error o índices fuera de límites. 
-    """
-    if not ranges. strip():
-        return list(range(max_page))
-    
-    page_nums = set()
-    token_re = re.compile(r"^\s*(\d+)(?:\s*-\s*(\d+))?\s*$")
-    
-    for part in ranges.split(","):
-        part = part.strip()
-        if not part: 
-            continue
-        
-        match = token_re.match(part)
-        if not match: 
-            return None
-        
-        start = int(match.group(1))
-        end = int(match.group(2)) if match.group(2) else start
-        
-        if start < 1 or end < start:
-            return None
-        
-        for p in range(start - 1, end):
-            if p < 0 or p >= max_page:
-                return None
-            page_nums.add(p)
-    
-    return sorted(page_nums)
-
-
-def create_unique_path(path: Path) -> Path:
-    """Crea una ruta única si el archivo ya existe."""
-    if not path.exists():
-        return path
-    
-    base = path.stem
-    ext = path.suffix
-    parent = path.parent
-    counter = 1
-    
-    while True:
-        new_path = parent / f"{base} ({counter}){ext}"
-        if not new_path.exists():
-            return new_path
-        counter += 1
-
-
-# ==================== LÓGICA DE DIVISIÓN ====================
-
-def split_pdf_fitz(
-    input_path:  Path,
-    output_dir:  Path,
-    ranges_text:  str,
-    progress_callback=None,
-    status_callback=None,
-) -> Tuple[int, int, List[Path]]:
-    """
-    Divide el PDF usando fitz (PyMuPDF).
-    Retorna:  (success_count, fail_count, created_files)
-    """
-    try:
-        doc = fitz.open(str(input_path))
-    except Exception as e:
-        raise RuntimeError(f"No se pudo abrir el PDF: {e}")
-    
-    num_pages = doc.page_count
-    page_indices = parse_page_ranges(ranges_text, num_pages)
-    
-    if page_indices is None: 
-        doc.close()
-        raise ValueError("Rangos inválidos o fuera de límites.")
-    
-    total = len(page_indices)
-    success = 0
-    fail = 0
-    created_files:  List[Path] = []
-    
-    for i, page_idx in enumerate(page_indices, start=1):
-        try:
-            # Crear nuevo documento con una sola página
-            new_doc = fitz.open()
-            new_doc.insert_pdf(doc, from_page=page_idx, to_page=page_idx)
-            
-            # Generar nombre de salida
-            out_name = f"{input_path.stem}_pagina_{page_idx + 1}.pdf"
-            out_path = output_dir / out_name
-            out_path = create_unique_path(out_path)
-            
-            # Guardar con compresión
-            new_doc.save(str(out_path), garbage=4, deflate=True)
-            new_doc.close()
-            
-            created_files.append(out_path)
-            success += 1
-            
-        except Exception as e:
-            print(f"[ERROR] Página {page_idx + 1}: {e}")
-            fail += 1
-        
-        finally:
-            if progress_callback: 
-                progress_callback(i / total)
-            if status_callback:
-                status_callback(f"Procesadas {i}/{total}")
-    
-    doc.close()
-    return success, fail, created_files
+from core.config import get_save_profile
+from core.pdf_ops import split_pdf_fitz
 
 
 # ==================== APLICACIÓN PRINCIPAL ====================
@@ -419,7 +301,8 @@ class PDFSplitterApp2(ctk.CTkFrame):
                 output_dir,
                 ranges_text,
                 progress_callback=lambda v: self.after(0, lambda: self.progressbar.set(v)),
-                status_callback=lambda t: self.after(0, lambda: self.status_label.configure(text=t))
+                status_callback=lambda t: self.after(0, lambda: self.status_label.configure(text=t)),
+                save_profile=get_save_profile("Extraer paginas de PDF")
             )
             
             # Guardar estado para deshacer
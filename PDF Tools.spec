@@ -6,7 +6,19 @@ a = Analysis(
     pathex=[],
     binaries=[],
     datas=[],
-    hiddenimports=[],
+    # Las herramientas se importan al abrirlas (tools/tools_registry.py)
+    hiddenimports=[
+        'tools.pdf_merge',
+        'tools.pdf_merge_group',
+        'tools.pdf_splitter',
+        'tools.pdf_page_deleter',
+        'tools.pdf_multiplier_support',
+        'tools.pdf_split_orders',
+        'tools.validate_emails',
+        'tools.horus',
+        'tools.carnet_virtual',
+        'ALGORITMOS_BASE.pdf_splitter2',
+    ],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
@@ -0,0 +1,125 @@
+"""
+Pruebas de rendimiento de las operaciones PDF.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks run                          # 10, 100 y 1000 páginas
+    python -m benchmarks run --sizes 10 100 1000 10000
+    python -m benchmarks run --save-baseline benchmarks/baseline.json
+    python -m benchmarks run --compare benchmarks/baseline.json
+    python -m benchmarks run --sizes 100 --save-profiles fast balanced smallest
+
+Con --compare el código de salida es 1 si algún caso empeoró más que --tolerance.
+Los PDFs sintéticos se guardan en --work-dir y se reutilizan entre corridas.
+"""
+import argparse
+import os
+import sys
+
+from benchmarks.suite import (
+    OPERATIONS, ROOT, compare, load_results, measure_case, run_suite, save_results,
+)
+from benchmarks.synthetic import KINDS, spec_name
+from core.save_profiles import PROFILE_CHOICES
+
+DEFAULT_SIZES = [10, 100, 1000]
+DEFAULT_WORK_DIR = os.path.join(ROOT, ".bench")
+
+
+def _format_result(result) -> str:
+    if "error" in result:
+        return f"ERROR: {result['error']}"
+    return (f"{result['wall_s']:8.3f} s  {result['peak_rss_mb']:7.1f} MB  "
+            f"{result['output_bytes'] / 2**20:9.2f} MB salida")
+
+
+def cmd_run(args) -> int:
+    specs = [
+        spec_name(kind, pages, resources == "shared")
+        for kind in args.kinds
+        for resources in args.resources
+        for pages in args.sizes
+    ]
+    print(f"[INFO] {len(specs)} PDFs x {len(args.ops)} operaciones (repeticiones: {args.repeat})")
+
+    data = run_suite(
+        specs, args.ops, args.work_dir, repeat=args.repeat, seed=args.seed,
+        on_result=lambda key, result: print(f"  {key:<40} {_format_result(result)}"),
+        save_profiles=args.save_profiles,
+    )
+
+    if args.output:
+        save_results(data, args.output)
+        print(f"[INFO] Resultados: {args.output}")
+    if args.save_baseline:
+        save_results(data, args.save_baseline)
+        print(f"[INFO] Línea base guardada: {args.save_baseline}")
+
+    if not args.compare:
+        return 0
+
+    rows = compare(data, load_results(args.compare), args.tolerance)
+    print(f"\nComparación con {args.compare} (tolerancia {args.tolerance:.0%}):")
+    for row in rows:
+        if row["status"] in ("nuevo", "error"):
+            print(f"  {row['case']:<40} {row['status']}")
+            continue
+        print(
+            f"  {row['case']:<40} tiempo x{row['wall_s_ratio']:.2f}  "
+            f"memoria x{row['peak_rss_mb_ratio']:.2f}  salida x{row['output_bytes_ratio']:.2f}  "
+            f"{row['status']}"
+            + (f" ({', '.join(row['regressions'])})" if row["regressions"] else "")
+        )
+
+    regressions = [row for row in rows if row["regressions"]]
+    if regressions:
+        print(f"[ERROR] {len(regressions)} caso(s) empeoraron.")
+        return 1
+    print("[INFO] Sin regresiones.")
+    return 0
+
+
+def cmd_case(args) -> int:
+    """Mide un solo caso (lo usa run, en un proceso nuevo por caso)."""
+    import json
+    print(json.dumps(measure_case(args.op, args.src, args.work_dir, args.save_profile)))
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="benchmarks", description="Rendimiento de las operaciones PDF")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("run", help="Correr la suite")
+    p.add_argument("--sizes", nargs="+", type=int, default=DEFAULT_SIZES, help="Páginas de los PDFs sintéticos")
+    p.add_argument("--kinds", nargs="+", choices=KINDS, default=list(KINDS), help="Contenido: texto o escaneado")
+    p.add_argument("--resources", nargs="+", choices=("shared", "unique"), default=["shared", "unique"],
+                   help="Recursos compartidos entre páginas o únicos por página")
+    p.add_argument("--ops", nargs="+", choices=list(OPERATIONS), default=list(OPERATIONS), help="Operaciones")
+    p.add_argument("--repeat", type=int, default=1, help="Repeticiones por caso (se toma el mejor tiempo)")
+    p.add_argument("--seed", type=int, default=0, help="Semilla de los PDFs sintéticos")
+    p.add_argument("--work-dir", default=DEFAULT_WORK_DIR, help="Carpeta de PDFs generados y salidas temporales")
+    p.add_argument("-o", "--output", help="Guardar los resultados de esta corrida en JSON")
+    p.add_argument("--save-baseline", metavar="JSON", help="Guardar esta corrida como línea base")
+    p.add_argument("--compare", metavar="JSON", help="Comparar contra una línea base")
+    p.add_argument("--tolerance", type=float, default=0.15, help="Empeoramiento permitido (0.15 = 15%%)")
+    p.add_argument("--save-profiles", nargs="+", choices=PROFILE_CHOICES, default=["auto"],
+                   help="Perfiles de guardado a medir (cada caso se corre con cada uno)")
+    p.set_defaults(func=cmd_run)
+
+    p = sub.add_parser("case", help="(interno) medir un caso en este proceso")
+    p.add_argument("op", choices=list(OPERATIONS))
+    p.add_argument("src")
+    p.add_argument("--work-dir", default=DEFAULT_WORK_DIR)
+    p.add_argument("--save-profile", choices=PROFILE_CHOICES, default="auto")
+    p.set_defaults(func=cmd_case)
+
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
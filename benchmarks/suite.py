@@ -0,0 +1,324 @@
+"""
+Casos de rendimiento de las operaciones de core.pdf_ops (las que usan las
+herramientas y la línea de comandos) y comparación contra una línea base.
+
+Cada caso corre en un proceso nuevo, así el pico de memoria (RSS) es solo el
+de esa operación. Se registra por caso:
+  - wall_s: tiempo de reloj de la operación (sin abrir Python ni generar el PDF),
+  - peak_rss_mb: pico de memoria del proceso (en Linux/macOS también el de los
+    procesos hijos, p. ej. el pool de división; en Windows solo el proceso),
+  - output_bytes: tamaño total de lo que escribió la operación.
+
+Con varios perfiles de guardado (core.save_profiles) cada caso se mide con
+cada uno; la clave lleva el perfil al final salvo para "auto":
+merge/text-unique-100/fast.
+"""
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Partes en las que se corta el PDF para medir la unión
+MERGE_PARTS = 10
+
+# Copias máximas para multiplicar (la herramienta admite pocas decenas)
+MULTIPLY_MAX_COPIES = 1000
+
+# Diferencias de tiempo menores a esto se consideran ruido
+MIN_WALL_DELTA_S = 0.05
+
+
+# ==================== OPERACIONES ====================
+
+def _merge_inputs(work_dir: str, src: str) -> List[str]:
+    """Corta el PDF en MERGE_PARTS archivos (se generan una sola vez)."""
+    import fitz  # PyMuPDF
+
+    base = os.path.splitext(os.path.basename(src))[0]
+    parts_dir = os.path.join(work_dir, "inputs", f"{base}-parts")
+    doc = fitz.open(src)
+    try:
+        parts = min(MERGE_PARTS, doc.page_count)
+        step = -(-doc.page_count // parts)
+        paths = [os.path.join(parts_dir, f"part_{i:02d}.pdf") for i in range(parts)]
+        if not all(os.path.exists(p) for p in paths):
+            os.makedirs(parts_dir, exist_ok=True)
+            for i, path in enumerate(paths):
+                part = fitz.open()
+                part.insert_pdf(doc, from_page=i * step, to_page=min(doc.page_count, (i + 1) * step) - 1)
+                part.save(path, garbage=4, deflate=True)
+                part.close()
+    finally:
+        doc.close()
+    return paths
+
+
+def _first_page(work_dir: str, src: str) -> str:
+    """PDF de 1 página para multiplicar."""
+    import fitz  # PyMuPDF
+
+    base = os.path.splitext(os.path.basename(src))[0]
+    path = os.path.join(work_dir, "inputs", f"{base}-page1.pdf")
+    if not os.path.exists(path):
+        doc = fitz.open(src)
+        single = fitz.open()
+        single.insert_pdf(doc, from_page=0, to_page=0)
+        single.save(path, garbage=4, deflate=True)
+        single.close()
+        doc.close()
+    return path
+
+
+def _page_count(src: str) -> int:
+    from core.pdf_ops import get_page_count
+    return get_page_count(src)
+
+
+def prepare_merge(work_dir, src):
+    return {"paths": _merge_inputs(work_dir, src)}
+
+
+def run_merge(prepared, out_dir):
+    from core.pdf_ops import merge_pdfs
+    merge_pdfs(prepared["paths"], os.path.join(out_dir, "unido.pdf"), save_profile=prepared["save_profile"])
+
+
+def prepare_split(work_dir, src):
+    return {"src": src}
+
+
+def run_split(prepared, out_dir):
+    from core.pdf_ops import split_pdf_pages
+    split_pdf_pages(prepared["src"], out_dir, save_profile=prepared["save_profile"])
+
+
+def prepare_delete(work_dir, src):
+    # Una de cada tres páginas, como una limpieza típica de soportes
+    return {"src": src, "pages": list(range(0, _page_count(src), 3))}
+
+
+def run_delete(prepared, out_dir):
+    from core.pdf_ops import delete_pages
+    delete_pages(
+        prepared["src"], prepared["pages"], os.path.join(out_dir, "editado.pdf"),
+        save_profile=prepared["save_profile"]
+    )
+
+
+def prepare_multiply(work_dir, src):
+    copies = min(_page_count(src), MULTIPLY_MAX_COPIES)
+    return {"src": _first_page(work_dir, src), "names": [f"CC{i:010d}" for i in range(copies)]}
+
+
+def run_multiply(prepared, out_dir):
+    from core.pdf_ops import multiply_pdf
+    multiply_pdf(prepared["src"], prepared["names"], out_dir, prefix="SOP_", save_profile=prepared["save_profile"])
+
+
+# operación -> (preparar entradas (no se mide), ejecutar (se mide))
+OPERATIONS: Dict[str, tuple] = {
+    "merge": (prepare_merge, run_merge),
+    "split": (prepare_split, run_split),
+    "delete": (prepare_delete, run_delete),
+    "multiply": (prepare_multiply, run_multiply),
+}
+
+
+# ==================== MEDICIÓN (proceso hijo) ====================
+
+def peak_rss_mb() -> float:
+    """Pico de memoria del proceso actual (y de sus hijos, donde se puede) en MB."""
+    try:
+        import resource
+    except ImportError:
+        return _windows_peak_rss() / 2**20
+
+    # ru_maxrss viene en KB en Linux y en bytes en macOS
+    scale = 1 if sys.platform == "darwin" else 1024
+    own = _linux_peak_rss_kb() or resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return max(own, children) * scale / 2**20
+
+
+def _linux_peak_rss_kb() -> int:
+    """
+    VmHWM de /proc (KB). En Linux ru_maxrss se hereda del proceso padre a
+    través de fork/exec, así que mediría la memoria de la suite, no la del caso.
+    """
+    try:
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+def _windows_peak_rss() -> int:
+    import ctypes
+    from ctypes import wintypes
+
+    class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+        _fields_ = [
+            ("cb", wintypes.DWORD),
+            ("PageFaultCount", wintypes.DWORD),
+            ("PeakWorkingSetSize", ctypes.c_size_t),
+            ("WorkingSetSize", ctypes.c_size_t),
+            ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+            ("PagefileUsage", ctypes.c_size_t),
+            ("PeakPagefileUsage", ctypes.c_size_t),
+        ]
+
+    counters = PROCESS_MEMORY_COUNTERS()
+    counters.cb = ctypes.sizeof(counters)
+    ctypes.windll.psapi.GetProcessMemoryInfo(
+        ctypes.windll.kernel32.GetCurrentProcess(), ctypes.byref(counters), counters.cb
+    )
+    return counters.PeakWorkingSetSize
+
+
+def _dir_size(path: str) -> int:
+    total = 0
+    for folder, _, files in os.walk(path):
+        total += sum(os.path.getsize(os.path.join(folder, f)) for f in files)
+    return total
+
+
+def measure_case(op: str, src: str, work_dir: str, save_profile: str = "auto") -> Dict:
+    """Ejecuta una operación en este proceso y retorna sus métricas."""
+    prepare, run = OPERATIONS[op]
+    prepared = dict(prepare(work_dir, src), save_profile=save_profile)
+
+    out_dir = os.path.join(work_dir, "outputs", op)
+    shutil.rmtree(out_dir, ignore_errors=True)
+    os.makedirs(out_dir)
+
+    start = time.perf_counter()
+    run(prepared, out_dir)
+    wall = time.perf_counter() - start
+
+    result = {
+        "wall_s": round(wall, 4),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "output_bytes": _dir_size(out_dir),
+    }
+    shutil.rmtree(out_dir, ignore_errors=True)
+    return result
+
+
+def run_case_subprocess(op: str, src: str, work_dir: str, save_profile: str = "auto") -> Dict:
+    """Mide la operación en un intérprete nuevo (python -m benchmarks case ...)."""
+    proc = subprocess.run(
+        [sys.executable, "-m", "benchmarks", "case", op, src, "--work-dir", work_dir,
+         "--save-profile", save_profile],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "falló el caso")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+# ==================== SUITE Y LÍNEA BASE ====================
+
+def environment_info() -> Dict:
+    import fitz  # PyMuPDF
+    return {
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pymupdf": fitz.VersionBind,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def run_suite(
+    specs: List[str],
+    ops: List[str],
+    work_dir: str,
+    repeat: int = 1,
+    seed: int = 0,
+    on_result: Optional[Callable[[str, Dict], None]] = None,
+    save_profiles: Optional[List[str]] = None,
+) -> Dict:
+    """
+    Corre cada operación sobre cada PDF sintético. Con repeat > 1 se guarda el
+    mejor tiempo y el mayor pico de memoria.
+    Retorna {"meta": {...}, "results": {"split/text-shared-100": {...}}}.
+    """
+    from benchmarks.synthetic import ensure_pdf
+
+    results = {}
+    for spec in specs:
+        src = ensure_pdf(work_dir, spec, seed)
+        for op in ops:
+            for profile in save_profiles or ["auto"]:
+                key = f"{op}/{spec}" if profile == "auto" else f"{op}/{spec}/{profile}"
+                try:
+                    # Entradas derivadas (partes, página 1) se crean aquí, fuera de la medición
+                    OPERATIONS[op][0](work_dir, src)
+                    runs = [run_case_subprocess(op, src, work_dir, profile) for _ in range(repeat)]
+                    result = {
+                        "wall_s": min(r["wall_s"] for r in runs),
+                        "peak_rss_mb": max(r["peak_rss_mb"] for r in runs),
+                        "output_bytes": runs[-1]["output_bytes"],
+                    }
+                except Exception as e:
+                    result = {"error": str(e)}
+                results[key] = result
+                if on_result:
+                    on_result(key, result)
+
+    meta = dict(environment_info(), repeat=repeat, seed=seed, save_profiles=save_profiles or ["auto"])
+    return {"meta": meta, "results": results}
+
+
+def save_results(data: Dict, path: str):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+
+
+def load_results(path: str) -> Dict:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare(current: Dict, baseline: Dict, tolerance: float = 0.15) -> List[Dict]:
+    """
+    Compara cada caso con la línea base. Un caso es regresión si el tiempo o la
+    memoria crecen más que `tolerance` (0.15 = 15%), o si el caso falla ahora.
+    """
+    rows = []
+    base_results = baseline.get("results", {})
+    for key, cur in current["results"].items():
+        base = base_results.get(key)
+        row = {"case": key, "current": cur, "baseline": base, "regressions": []}
+        if base is None or "error" in base:
+            row["status"] = "nuevo"
+        elif "error" in cur:
+            row["status"] = "error"
+            row["regressions"].append("error")
+        else:
+            for metric in ("wall_s", "peak_rss_mb", "output_bytes"):
+                ratio = cur[metric] / base[metric] if base[metric] else 1.0
+                row[f"{metric}_ratio"] = ratio
+                if ratio > 1 + tolerance:
+                    if metric == "wall_s" and cur[metric] - base[metric] < MIN_WALL_DELTA_S:
+                        continue
+                    row["regressions"].append(metric)
+            row["status"] = "regresión" if row["regressions"] else "ok"
+        rows.append(row)
+    return rows
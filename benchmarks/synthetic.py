@@ -0,0 +1,121 @@
+"""
+PDFs sintéticos y reproducibles para las pruebas de rendimiento.
+
+Dos tipos de contenido:
+  - "text": páginas de texto con una fuente incrustada,
+  - "scan": páginas escaneadas (una imagen JPEG de página completa),
+
+y dos formas de usar los recursos:
+  - compartidos: todas las páginas usan el mismo objeto (una fuente, una imagen),
+  - únicos: cada página trae su propia copia u objeto, como un PDF unido a
+    partir de muchos archivos sueltos.
+
+La misma especificación y semilla siempre producen el mismo contenido.
+"""
+import os
+import random
+from typing import Dict, List
+
+import fitz  # PyMuPDF
+
+
+KINDS = ("text", "scan")
+
+# Tamaño de la imagen escaneada (A4 a ~100 ppp)
+SCAN_SIZE = (827, 1169)
+
+LINES_PER_PAGE = 40
+
+
+def spec_name(kind: str, pages: int, shared: bool) -> str:
+    """Nombre estable de un PDF sintético: text-shared-100, scan-unique-1000..."""
+    return f"{kind}-{'shared' if shared else 'unique'}-{pages}"
+
+
+def parse_spec(name: str) -> Dict:
+    kind, resources, pages = name.split("-")
+    return {"kind": kind, "pages": int(pages), "shared": resources == "shared"}
+
+
+def _text_lines(rng: random.Random, page_number: int) -> List[str]:
+    words = ["factura", "paciente", "servicio", "valor", "fecha", "documento",
+             "atención", "orden", "código", "total", "autorización", "régimen"]
+    lines = [f"Página {page_number} - documento CC{rng.randrange(10**9, 10**10)}"]
+    for _ in range(LINES_PER_PAGE - 1):
+        lines.append(" ".join(rng.choice(words) for _ in range(rng.randint(6, 12))))
+    return lines
+
+
+def _add_text_page(doc: fitz.Document, rng: random.Random, page_number: int, font_buffer: bytes):
+    page = doc.new_page()
+    page.insert_font(fontname="F0", fontbuffer=font_buffer)
+    y = 60
+    for line in _text_lines(rng, page_number):
+        page.insert_text((50, y), line, fontname="F0", fontsize=10)
+        y += 18
+
+
+def _scan_image(rng: random.Random) -> bytes:
+    """Imagen en grises parecida a una hoja escaneada: fondo claro y renglones oscuros."""
+    width, height = SCAN_SIZE
+    samples = bytearray([rng.randint(235, 250)]) * (width * height)
+    y = 80
+    while y < height - 80:
+        # Un renglón de "palabras" que se repite en 12 filas de píxeles
+        row = bytearray(samples[y * width:(y + 1) * width])
+        x = 70
+        while x < width - 120:
+            word = rng.randint(20, 90)
+            row[x:x + word] = bytes([rng.randint(20, 70)]) * word
+            x += word + rng.randint(8, 16)
+        for line in range(y, y + 12):
+            samples[line * width:(line + 1) * width] = row
+        y += rng.randint(22, 30)
+    pix = fitz.Pixmap(fitz.csGRAY, width, height, bytes(samples), False)
+    return pix.tobytes("jpg", jpg_quality=60)
+
+
+def generate_pdf(path: str, kind: str, pages: int, shared: bool, seed: int = 0):
+    """Genera el PDF sintético en path."""
+    if kind not in KINDS:
+        raise ValueError(f"Tipo desconocido: {kind} (use {', '.join(KINDS)})")
+
+    rng = random.Random(f"{kind}-{shared}-{seed}")
+    font_buffer = fitz.Font("tiro").buffer
+    doc = fitz.open()
+    shared_image = _scan_image(rng) if kind == "scan" and shared else None
+    image_xref = 0
+
+    for i in range(1, pages + 1):
+        if kind == "text" and shared:
+            # insert_font reutiliza el mismo objeto de fuente en todas las páginas
+            _add_text_page(doc, rng, i, font_buffer)
+        elif kind == "text":
+            # Cada página viene de su propio documento: fuente duplicada
+            single = fitz.open()
+            _add_text_page(single, rng, i, font_buffer)
+            doc.insert_pdf(single)
+            single.close()
+        else:
+            page = doc.new_page(width=595, height=842)
+            if shared:
+                image_xref = page.insert_image(page.rect, stream=shared_image, xref=image_xref)
+            else:
+                page.insert_image(page.rect, stream=_scan_image(rng))
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    # garbage=4 fusionaría las copias idénticas: los recursos únicos dejarían de serlo
+    doc.save(path, garbage=4 if shared else 3, deflate=True)
+    doc.close()
+
+
+def ensure_pdf(work_dir: str, name: str, seed: int = 0) -> str:
+    """Ruta del PDF sintético `name`; lo genera solo si aún no existe."""
+    path = os.path.join(work_dir, "inputs", f"{name}-s{seed}.pdf")
+    if not os.path.exists(path):
+        spec = parse_spec(name)
+        print(f"[INFO] Generando {name}...")
+        tmp_path = path + ".tmp"
+        generate_pdf(tmp_path, spec["kind"], spec["pages"], spec["shared"], seed)
+        os.replace(tmp_path, path)
+    return path
@@ -0,0 +1,135 @@
+"""
+Caché local de consultas a Horus (data/horus_cache.sqlite3).
+
+Cada semana se vuelven a consultar casi los mismos afiliados. La caché guarda
+por (tipo, número de documento) el nombre, estado, IPS y la fecha de la
+consulta; mientras no supere el TTL ("horus_cache_days" en config.json) la
+respuesta sale de aquí sin pasar por el límite de ritmo de la API.
+
+Solo se guardan respuestas válidas: los errores, "REVISAR (...)" y el token
+inválido se vuelven a consultar la próxima vez.
+"""
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional, Tuple
+
+from core.config import DATA_DIR
+
+
+CACHE_FILE = os.path.normpath(os.path.join(DATA_DIR, "horus_cache.sqlite3"))
+
+# Días que una consulta sigue siendo válida (si config.json no lo define)
+DEFAULT_TTL_DAYS = 30
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS affiliates (
+    doc_type TEXT NOT NULL,
+    doc_number TEXT NOT NULL,
+    name TEXT NOT NULL,
+    status TEXT NOT NULL,
+    ips TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (doc_type, doc_number)
+)
+"""
+
+# Nombres que indican que la consulta no dio un afiliado (no se guardan)
+_NOT_CACHED_NAMES = ("DESCONECTADO", "TOKEN INVÁLIDO")
+_NOT_CACHED_PREFIXES = ("REVISAR", "ERROR")
+
+
+def is_cacheable(row: Tuple[str, str, str, str]) -> bool:
+    """True si la fila es un afiliado encontrado (no un error ni un "revisar")."""
+    name = row[1]
+    return bool(name) and name not in _NOT_CACHED_NAMES and not name.startswith(_NOT_CACHED_PREFIXES)
+
+
+def ttl_seconds(days: Optional[float] = None) -> float:
+    """TTL en segundos: `days`, o el de config.json, o DEFAULT_TTL_DAYS."""
+    if days is None:
+        from core.config import get_horus_cache_days
+        days = get_horus_cache_days()
+    return max(0.0, float(days if days is not None else DEFAULT_TTL_DAYS)) * 86400
+
+
+class AffiliateCache:
+    """Afiliados por (tipo, número). Una conexión compartida por los hilos, con lock."""
+
+    def __init__(self, path: str = CACHE_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(_SCHEMA)
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    # ==================== LECTURA / ESCRITURA ====================
+
+    def get(self, doc_type: str, doc_number: str, max_age: float) -> Optional[Tuple[str, str, str, float]]:
+        """(nombre, estado, ips, fetched_at) si hay una consulta más nueva que max_age segundos."""
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT name, status, ips, fetched_at FROM affiliates WHERE doc_type = ? AND doc_number = ?",
+                (doc_type, doc_number),
+            ).fetchone()
+        if row is None or time.time() - row[3] > max_age:
+            return None
+        return row
+
+    def put(self, doc_type: str, doc_number: str, name: str, status: str, ips: str,
+            fetched_at: Optional[float] = None):
+        """Guarda (o reemplaza) la consulta. Los errores de disco no interrumpen las consultas."""
+        try:
+            with self._lock:
+                conn = self._connection()
+                conn.execute(
+                    "INSERT OR REPLACE INTO affiliates VALUES (?, ?, ?, ?, ?, ?)",
+                    (doc_type, doc_number, name, status, ips, fetched_at or time.time()),
+                )
+                conn.commit()
+        except sqlite3.Error as e:
+            print(f"[WARN] No se pudo guardar la consulta en caché: {e}")
+
+    # ==================== LIMPIEZA ====================
+
+    def purge(self, max_age: float) -> int:
+        """Borra las consultas más viejas que max_age segundos. Retorna cuántas."""
+        with self._lock:
+            conn = self._connection()
+            removed = conn.execute(
+                "DELETE FROM affiliates WHERE fetched_at < ?", (time.time() - max_age,)
+            ).rowcount
+            conn.commit()
+        return removed
+
+    def clear(self):
+        self.purge(-1)
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+_cache: Optional[AffiliateCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_affiliate_cache() -> AffiliateCache:
+    """Caché compartida por la herramienta y la línea de comandos."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = AffiliateCache()
+        return _cache
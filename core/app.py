@@ -2,7 +2,10 @@ import customtkinter as ctk
 # import os, sys
 # from pathlib import Path
 
-from core.config import load_config, save_config
+from core.config import load_config, update_config
+from core.instrumentation import set_profiling
+from core.jobs import shutdown_runner
+from core.raster_service import shutdown_raster_service
 from ui.main_window import MainWindow
 from core.config import APP_NAME, VERSION, DEFAULT_CONFIG
 
@@ -17,6 +20,7 @@ class App(ctk.CTk):
         self.minsize(850, 540)
 
         ctk.set_appearance_mode(self.config_data.get("theme", DEFAULT_CONFIG["theme"]))
+        set_profiling(self.config_data.get("profiling", DEFAULT_CONFIG["profiling"]))
         ctk.set_default_color_theme(DEFAULT_CONFIG["color_theme"])
 
         self.main_window = MainWindow(self, self.config_data)
@@ -29,9 +33,12 @@ class App(ctk.CTk):
         """Guarda configuración y cierra la app correctamente."""
         try:
             self.config_data["last_tool"] = self.main_window.current_tool_name
-            save_config(self.config_data)
+            update_config(last_tool=self.config_data["last_tool"])
         except Exception as e:
             print(f"Error al guardar configuración: {e}")
         finally:
+            # Los trabajos en curso se detienen en su próximo punto de control
+            shutdown_runner()
+            shutdown_raster_service()
             self.destroy()  # ← Cierra la ventana correctamente
 
@@ -0,0 +1,682 @@
+"""
+Generación de la base CARNET VIRTUAL sin interfaz gráfica.
+La usan la herramienta "Carnet Virtual" y la línea de comandos.
+"""
+import os
+import re
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+import pandas as pd
+
+from core.instrumentation import span
+from tools.vaccine_catalog import VACCINE_CATALOG
+
+# Nombres de meses en español
+MESES_ESP = {
+    1: "ENE", 2: "FEB", 3: "MAR", 4: "ABR", 5: "MAY", 6: "JUN",
+    7: "JUL", 8: "AGO", 9: "SEP", 10: "OCT", 11: "NOV", 12: "DIC"
+}
+
+# Columnas que deben ser numéricas en el Excel de salida
+NUMERIC_COLUMNS = [
+    'documento',
+    'telefono',
+    'c_desplazamiento',
+    'c_discapacidad',
+    'c_usuaria',
+    'dosis_aplicada',
+    'lote_jeringa',
+    'evento_postvacunal'
+]
+
+# Diccionario para normalización del nombre del brazo
+ARM_DICTIONARY = {
+    # Left arm variations / Variaciones brazo izquierdo
+    'IZQUIERDO': 'IZQUIERDO',
+    'IZQUIERDA': 'IZQUIERDO',
+    'IZQ': 'IZQUIERDO',
+    'IZ': 'IZQUIERDO',
+    'I': 'IZQUIERDO',
+    'IQ': 'IZQUIERDO',
+    
+    # Right arm variations / Variaciones brazo derecho
+    'DERECHO': 'DERECHO',
+    'DERECHA': 'DERECHO',
+    'DER': 'DERECHO',
+    'DE': 'DERECHO',
+    'D': 'DERECHO',
+    'DR': 'DERECHO',
+}
+
+
+# Columnas del Excel de salida (en orden)
+OUTPUT_COLUMNS = [
+    'fecha_vacunacion', 'tipo_documento', 'documento', 'fecha_nacimiento',
+    'sexo', 'primer_apellido', 'segundo_apellido', 'nombres', 'regimen',
+    'aseguradora', 'municipio', 'area_residencia', 'barrio', 'direccion',
+    'eps', 'telefono', 'grupo_etnico', 'c_desplazamiento', 'c_discapacidad',
+    'correo', 'c_usuaria', 'fecha_parto', 'tipo_poblacion', 'dosis_aplicada',
+    'biologico', 'lote_biologico', 'jeringa', 'lote_jeringa',
+    'evento_postvacunal', 'vacunador', 'municipio_reporta', 'novedad',
+    'desc_novedad', 'modalidad_vacunacion', 'nota_enfermeria', 'jornada'
+]
+
+
+class CarnetProcessor:
+    """
+    Lógica de la herramienta Carnet Virtual: detección de vacunas, mapeo de
+    columnas y generación del Excel de salida.
+    """
+    
+    def __init__(self, log: Optional[Callable[[str], None]] = None):
+        # Lotes y vencimientos por vacuna (los ingresa el usuario)
+        self.lotes: Dict[str, str] = {}
+        self.vencimientos: Dict[str, str] = {}
+        
+        # Contadores para estadísticas
+        self.vaccine_counts: Dict[str, int] = {}
+        
+        # Vacunas detectadas en el archivo
+        self.vaccines_detected: List[str] = []
+        
+        self._log = log
+    
+    def log(self, message):
+        """Envía un mensaje al registro (o a la consola si no hay callback)."""
+        if self._log:
+            self._log(message)
+        else:
+            print(message)
+    
+    # ==================== DETECCIÓN DE VACUNAS ====================
+    
+    def identify_vaccine(self, vaccine_text):
+        """Identifica la vacuna a partir del texto usando el catálogo."""
+        vaccine_text_upper = self._clean_text(vaccine_text)
+        
+        for vaccine_id, vaccine_info in VACCINE_CATALOG.items():
+            for keyword in vaccine_info['keywords']:
+                if keyword in vaccine_text_upper:
+                    return vaccine_id
+        
+        return 'UNKNOWN'
+    
+    def detect_vaccines_in_file(self, file_path):
+        """Detecta qué vacunas están presentes en el archivo Excel."""
+        try:
+            with span("read_excel"):
+                df = pd.read_excel(file_path)
+            
+            # Log de columnas encontradas para debugging
+            # self.log(f"📋 Columnas del archivo: {len(df.columns)}")
+            
+            # Buscar columna de vacunas
+            column_mapping = self.map_columns(df.columns.tolist())
+            
+            if 'vacuna' not in column_mapping:
+                self.log("⚠️ No se encontró columna de vacunas")
+                # Mostrar columnas disponibles para ayudar al usuario
+                self.log(f"   Columnas disponibles: {', '.join(df.columns.tolist()[:10])}...")
+                return
+            
+            vacuna_col = column_mapping['vacuna']
+            
+            # Revisar todas las vacunas en el archivo
+            vaccines_found = set()
+            
+            for value in df[vacuna_col].dropna():
+                # Parsear el texto para obtener TODAS las vacunas de la celda
+                biologicos = self._parse_biologicos(str(value))
+                
+                for biologico in biologicos:
+                    vaccine_id = self.identify_vaccine(biologico)
+                    if vaccine_id != 'UNKNOWN':
+                        vaccines_found.add(vaccine_id)
+            
+            # Ordenar por prioridad
+            self.vaccines_detected = sorted(list(vaccines_found))
+            
+            # Inicializar contadores
+            self.vaccine_counts = {v_id: 0 for v_id in self.vaccines_detected}
+            
+            # Log de detección
+            if self.vaccines_detected:
+                vaccine_names = [
+                    VACCINE_CATALOG[v_id]['display_name'] 
+                    for v_id in self.vaccines_detected
+                ]
+                self.log(f"🔍 Vacunas detectadas: {', '.join(vaccine_names)}")
+                
+                # Verificar columnas de brazo detectadas
+                for v_id in self.vaccines_detected:
+                    brazo_key = f'brazo_{v_id.lower()}'
+                    if brazo_key in column_mapping:
+                        pass
+                        # self.log(f"   ✅ Columna brazo {VACCINE_CATALOG[v_id]['display_name']}: '{column_mapping[brazo_key]}'")
+                    else:
+                        self.log(f"   ⚠️ Sin columna brazo para {VACCINE_CATALOG[v_id]['display_name']} (usará: {VACCINE_CATALOG[v_id]['default_arm']})")
+            else:
+                self.log("⚠️ No se detectaron vacunas conocidas en el archivo")
+            
+        except Exception as e:
+            self.log(f"⚠️ Error al detectar vacunas: {str(e)}")
+            self.vaccines_detected = []
+
+    # ==================== FECHAS ====================
+    
+    def parse_and_format_date(self, date_text):
+        """Parsea y formatea una fecha en múltiples formatos aceptados."""
+        if not date_text:
+            return None
+        
+        date_text = date_text.strip()
+        normalized = re.sub(r'[/\-\.]', ' ', date_text)
+        
+        formats_to_try = [
+            '%d %m %Y',
+            '%d/%m/%Y',
+            '%d-%m-%Y',
+            '%d %m %y',
+            '%d/%m/%y',
+            '%d-%m-%y',
+        ]
+        
+        try:
+            parsed_date = datetime.strptime(normalized, '%d %m %Y')
+            return parsed_date.strftime('%d/%m/%Y')
+        except ValueError:
+            pass
+        
+        try:
+            parsed_date = datetime.strptime(normalized, '%d %m %y')
+            return parsed_date.strftime('%d/%m/%Y')
+        except ValueError:
+            pass
+        
+        for fmt in formats_to_try:
+            try:
+                parsed_date = datetime.strptime(date_text, fmt)
+                return parsed_date.strftime('%d/%m/%Y')
+            except ValueError:
+                continue
+        
+        return None
+
+    # ==================== PROCESAMIENTO DE DATOS ====================
+    
+    def process(self, input_path, output_dir="", progress_callback=None) -> Dict:
+        """
+        Procesa el archivo de entrada y genera el Excel de salida.
+        Retorna un resumen: created, total_rows, total_applications, vaccine_counts.
+        """
+        def update_progress(value):
+            if progress_callback:
+                progress_callback(value)
+        
+        # Reiniciar contadores
+        self.vaccine_counts = {v_id: 0 for v_id in self.vaccines_detected}
+        
+        self.log("🚀 Iniciando procesamiento de datos...")
+        update_progress(0.1)
+        
+        with span("read_excel"):
+            df_input = pd.read_excel(input_path)
+        total_rows = len(df_input)
+        self.log(f"✅ Archivo leído correctamente. Total de registros: {total_rows}")
+        
+        update_progress(0.2)
+        
+        column_mapping = self.map_columns(df_input.columns.tolist())
+        self.log(f"📋 Columnas mapeadas: {len(column_mapping)}")
+        
+        first_date = None
+        if 'fecha_atencion' in column_mapping and len(df_input) > 0:
+            first_date = df_input.iloc[0].get(column_mapping['fecha_atencion'], None)
+            self.log(f"📅 Fecha identificada: {first_date}")
+        
+        update_progress(0.3)
+        
+        processed_rows = []
+        
+        for index, row in df_input.iterrows():
+            update_progress(0.3 + (0.5 * (index + 1) / total_rows))
+            processed_rows.extend(self.process_row(row, column_mapping))
+        
+        self.log(f"✅ Registros procesados: {len(processed_rows)}")
+        
+        update_progress(0.85)
+        
+        output_path = self.generate_output_filename(input_path, first_date, output_dir)
+        self.log(f"📁 Generando: {os.path.basename(output_path)}")
+        
+        df_output = pd.DataFrame(processed_rows, columns=OUTPUT_COLUMNS)
+        
+        self.create_excel_file(df_output, output_path)
+        
+        update_progress(1.0)
+        
+        return {
+            'created': output_path,
+            'total_rows': total_rows,
+            'total_applications': len(df_output),
+            'vaccine_counts': dict(self.vaccine_counts),
+        }
+    
+    def generate_output_filename(self, input_path, date_from_data, output_dir=""):
+        """Genera el nombre del archivo de salida basado en la fecha y vacunas detectadas."""
+        if not output_dir:
+            output_dir = os.path.dirname(input_path)
+        
+        try:
+            if isinstance(date_from_data, datetime):
+                day = date_from_data.day
+                month = date_from_data.month
+            elif isinstance(date_from_data, str):
+                date_from_data = str(date_from_data).strip()
+                
+                for fmt in ['%d/%m/%Y', '%d-%m-%Y', '%Y-%m-%d', '%d %m %Y']:
+                    try:
+                        parsed_date = datetime.strptime(date_from_data, fmt)
+                        day = parsed_date.day
+                        month = parsed_date.month
+                        break
+                    except ValueError:
+                        continue
+                else:
+                    day = datetime.now().day
+                    month = datetime.now().month
+            else:
+                day = datetime.now().day
+                month = datetime.now().month
+        except Exception:
+            day = datetime.now().day
+            month = datetime.now().month
+        
+        month_name = MESES_ESP.get(month, "MES")
+        
+        # Generar nombre según vacunas detectadas
+        vaccine_names = [
+            VACCINE_CATALOG[v_id]['keywords'][0] 
+            for v_id in self.vaccines_detected
+        ]
+        
+        vaccine_str = " - ".join(vaccine_names) if vaccine_names else "VACUNAS"
+        
+        filename = f"BASE CARNET VIRTUAL [{vaccine_str}] DIA {day} {month_name}.xlsx"
+        full_path = os.path.join(output_dir, filename)
+        
+        return full_path
+    
+    def create_excel_file(self, df, output_path):
+        """Crea archivo Excel con formato correcto."""
+        from openpyxl import Workbook
+        from openpyxl.styles import Font, Alignment, Border, Side
+        
+        self.log("📝 Creando archivo Excel...")
+        
+        workbook = Workbook()
+        worksheet = workbook.active
+        worksheet.title = "Datos Vacunación"
+        
+        header_font = Font(name='Calibri', size=11, bold=True)
+        header_alignment = Alignment(horizontal='left', vertical='center', wrap_text=False)
+        
+        cell_font = Font(name='Calibri', size=10)
+        cell_alignment = Alignment(horizontal='left', vertical='center')
+        
+        thin_border = Border(
+            left=Side(style='thin'),
+            right=Side(style='thin'),
+            top=Side(style='thin'),
+            bottom=Side(style='thin')
+        )
+        
+        headers = df.columns.tolist()
+        for col_idx, header in enumerate(headers, 1):
+            cell = worksheet.cell(row=1, column=col_idx, value=header)
+            cell.font = header_font
+            cell.alignment = header_alignment
+            cell.border = thin_border
+        
+        numeric_col_indices = set()
+        for idx, header in enumerate(headers, 1):
+            if header in NUMERIC_COLUMNS:
+                numeric_col_indices.add(idx)
+        
+        for row_idx, row in enumerate(df.values, 2):
+            for col_idx, value in enumerate(row, 1):
+                if col_idx in numeric_col_indices and value:
+                    try:
+                        numeric_value = int(re.sub(r'[^\d]', '', str(value)))
+                        cell = worksheet.cell(row=row_idx, column=col_idx, value=numeric_value)
+                    except (ValueError, TypeError):
+                        cell = worksheet.cell(row=row_idx, column=col_idx, value=value)
+                else:
+                    cell = worksheet.cell(row=row_idx, column=col_idx, value=value)
+                
+                cell.font = cell_font
+                cell.alignment = cell_alignment
+                cell.border = thin_border
+        
+        column_widths = {
+            'fecha_vacunacion': 15, 'tipo_documento': 12, 'documento': 15,
+            'fecha_nacimiento': 15, 'sexo': 12, 'primer_apellido': 18,
+            'segundo_apellido': 18, 'nombres': 25, 'regimen': 15,
+            'aseguradora': 20, 'municipio': 12, 'area_residencia': 12,
+            'barrio': 20, 'direccion': 30, 'eps': 20, 'telefono': 15,
+            'grupo_etnico': 12, 'c_desplazamiento': 14, 'c_discapacidad': 14,
+            'correo': 35, 'c_usuaria': 10, 'fecha_parto': 12,
+            'tipo_poblacion': 12, 'dosis_aplicada': 12, 'biologico': 20,
+            'lote_biologico': 15, 'jeringa': 20, 'lote_jeringa': 12,
+            'evento_postvacunal': 16, 'vacunador': 15, 'municipio_reporta': 15,
+            'novedad': 12, 'desc_novedad': 15, 'modalidad_vacunacion': 18,
+            'nota_enfermeria': 80, 'jornada': 25
+        }
+        
+        for col_idx, header in enumerate(headers, 1):
+            col_letter = worksheet.cell(row=1, column=col_idx).column_letter
+            width = column_widths.get(header, 15)
+            worksheet.column_dimensions[col_letter].width = width
+        
+        worksheet.freeze_panes = 'A2'
+        
+        with span("write_excel"):
+            workbook.save(output_path)
+        
+        self.log(f"✅ Archivo Excel creado: {os.path.basename(output_path)}")
+    
+    # ==================== PROCESAMIENTO DE FILAS ====================
+    
+    def map_columns(self, input_columns):
+        """Mapea nombres de columnas de entrada a nombres esperados."""
+        column_mapping = {}
+        
+        for col in input_columns:
+            col_upper = str(col).upper().strip()
+            
+            if 'FECHA' in col_upper and 'ATENCION' in col_upper:
+                column_mapping['fecha_atencion'] = col
+            elif 'TIPO' in col_upper and 'DOCUMENTO' in col_upper:
+                column_mapping['tipo_documento'] = col
+            elif 'NUMERO' in col_upper and 'DOCUMENTO' in col_upper:
+                column_mapping['numero_documento'] = col
+            elif 'PRIMER NOMBRE' in col_upper or col_upper == 'PRIMER NOMBRE':
+                column_mapping['primer_nombre'] = col
+            elif 'SEGUNDO NOMBRE' in col_upper or col_upper == 'SEGUNDO NOMBRE':
+                column_mapping['segundo_nombre'] = col
+            elif 'PRIMER APELLIDO' in col_upper or col_upper == 'PRIMER APELLIDO':
+                column_mapping['primer_apellido'] = col
+            elif 'SEGUNDO APELLIDO' in col_upper or col_upper == 'SEGUNDO APELLIDO':
+                column_mapping['segundo_apellido'] = col
+            elif 'FECHA' in col_upper and 'NACIMIENTO' in col_upper:
+                column_mapping['fecha_nacimiento'] = col
+            elif 'TELEFON' in col_upper or 'NUMERO TELEFONICO' in col_upper:
+                column_mapping['telefono'] = col
+            elif 'CORREO' in col_upper:
+                column_mapping['correo'] = col
+            elif 'DIRECC' in col_upper:
+                column_mapping['direccion'] = col
+            elif 'BARRIO' in col_upper:
+                column_mapping['barrio'] = col
+            elif col_upper == 'EPS':
+                column_mapping['eps'] = col
+            elif 'SEXO' in col_upper:
+                column_mapping['sexo'] = col
+            elif 'VACUNA' in col_upper and 'NOMBRE' in col_upper:
+                column_mapping['vacuna'] = col
+            elif 'JORNADA' in col_upper or 'LUGAR' in col_upper:
+                column_mapping['jornada'] = col
+        
+        # Mapear columnas de brazo dinámicamente buscando coincidencias con keywords del catálogo
+        for col in input_columns:
+            col_upper = str(col).upper().strip()
+            
+            # Buscar en cada vacuna del catálogo
+            for vaccine_id, vaccine_info in VACCINE_CATALOG.items():
+                # Ya encontramos esta columna de brazo, saltar
+                if f'brazo_{vaccine_id.lower()}' in column_mapping:
+                    continue
+                
+                # Buscar coincidencia con cualquier keyword de la vacuna
+                for keyword in vaccine_info['keywords']:
+                    # La columna contiene el keyword de la vacuna
+                    if keyword in col_upper:
+                        # Verificar que NO sea la columna principal de vacunas
+                        if 'NOMBRE' not in col_upper and 'VACUNA' not in col_upper:
+                            column_mapping[f'brazo_{vaccine_id.lower()}'] = col
+                            # self.log(f"   📍 Columna brazo detectada: '{col}' → {vaccine_info['display_name']}")
+                            break
+                
+                # Si ya encontramos, salir del loop de keywords
+                if f'brazo_{vaccine_id.lower()}' in column_mapping:
+                    break
+        
+        return column_mapping
+    
+    def process_row(self, row, column_mapping):
+        """Procesa una fila y retorna una o más filas de salida."""
+        vacuna_texto = row.get(column_mapping.get('vacuna', ''), '')
+        biologicos = self._parse_biologicos(vacuna_texto)
+        
+        if not biologicos:
+            biologicos = ['SIN ESPECIFICAR']
+        
+        # Datos comunes del paciente
+        fecha_vac = self._format_date(row.get(column_mapping.get('fecha_atencion', ''), ''))
+        tipo_doc = self._clean_text(row.get(column_mapping.get('tipo_documento', ''), ''))
+        documento = self._clean_document(row.get(column_mapping.get('numero_documento', ''), ''))
+        fecha_nac = self._format_date(row.get(column_mapping.get('fecha_nacimiento', ''), ''))
+        
+        sexo_raw = row.get(column_mapping.get('sexo', ''), '')
+        sexo = self._translate_sex(sexo_raw)
+        
+        primer_apellido = self._clean_text(row.get(column_mapping.get('primer_apellido', ''), ''))
+        segundo_apellido = self._clean_text(row.get(column_mapping.get('segundo_apellido', ''), ''))
+        nombres = self._get_full_name(
+            row.get(column_mapping.get('primer_nombre', ''), ''),
+            row.get(column_mapping.get('segundo_nombre', ''), '')
+        )
+        barrio = self._clean_text(row.get(column_mapping.get('barrio', ''), ''))
+        direccion = self._clean_text(row.get(column_mapping.get('direccion', ''), ''))
+        eps = self._clean_text(row.get(column_mapping.get('eps', ''), ''))
+        telefono = self._clean_document(row.get(column_mapping.get('telefono', ''), ''))
+        correo = self._clean_text(row.get(column_mapping.get('correo', ''), ''))
+        jornada = self._clean_text(row.get(column_mapping.get('jornada', ''), ''))
+        
+        output_rows = []
+        
+        for biologico_raw in biologicos:
+            biologico_raw = self._clean_text(biologico_raw)
+            vaccine_id = self.identify_vaccine(biologico_raw)
+            
+            if vaccine_id == 'UNKNOWN':
+                continue
+            
+            vaccine_info = VACCINE_CATALOG.get(vaccine_id)
+            
+            if not vaccine_info:
+                continue
+            
+            # Obtener lote y vencimiento
+            lote = self.lotes.get(vaccine_id, '')
+            vencimiento = self.vencimientos.get(vaccine_id, '')
+            
+            # Obtener brazo
+            brazo_col = column_mapping.get(f'brazo_{vaccine_id.lower()}')
+            if brazo_col:
+                brazo_raw = row.get(brazo_col, vaccine_info['default_arm'])
+                brazo = self._normalize_arm(brazo_raw)
+            else:
+                brazo = vaccine_info['default_arm']
+            
+            # Nombre del biológico
+            biologico_display = vaccine_info['display_name']
+            
+            # Jeringa
+            jeringa = vaccine_info.get('jeringa', 'JERINGA PRELLENADA')
+            
+            # Incrementar contador
+            self.vaccine_counts[vaccine_id] += 1
+            
+            # Generar nota de enfermería
+            nota = self._generate_nursing_note(vaccine_id, lote, vencimiento, brazo)
+            
+            output_row = {
+                'fecha_vacunacion': fecha_vac,
+                'tipo_documento': tipo_doc,
+                'documento': documento,
+                'fecha_nacimiento': fecha_nac,
+                'sexo': sexo,
+                'primer_apellido': primer_apellido,
+                'segundo_apellido': segundo_apellido,
+                'nombres': nombres,
+                'regimen': '',
+                'aseguradora': '',
+                'municipio': 'CALI',
+                'area_residencia': 'URBANA',
+                'barrio': barrio,
+                'direccion': direccion,
+                'eps': eps,
+                'telefono': telefono,
+                'grupo_etnico': 'NINGUNO',
+                'c_desplazamiento': '0',
+                'c_discapacidad': '0',
+                'correo': correo,
+                'c_usuaria': '0',
+                'fecha_parto': 'NINGUNO',
+                'tipo_poblacion': 'ADULTO',
+                'dosis_aplicada': '1',
+                'biologico': biologico_display,
+                'lote_biologico': lote,
+                'jeringa': jeringa,
+                'lote_jeringa': '0',
+                'evento_postvacunal': '0',
+                'vacunador': '* AUXILIAR',
+                'municipio_reporta': 'CALI',
+                'novedad': 'NINGUNO',
+                'desc_novedad': 'SIN NOVEDAD',
+                'modalidad_vacunacion': 'EXTRAMURAL',
+                'nota_enfermeria': nota,
+                'jornada': jornada
+            }
+            
+            output_rows.append(output_row)
+        
+        return output_rows
+    
+    def _generate_nursing_note(self, vaccine_id, lote, vencimiento, brazo):
+        """Genera la nota de enfermería usando información del catálogo."""
+        vaccine_info = VACCINE_CATALOG.get(vaccine_id, {})
+        vaccine_desc = vaccine_info.get('description', 'vacuna no especificada')
+        brazo_text = brazo.upper() if brazo else "IZQUIERDO"
+        
+        note = (
+            f"Asiste usuario para aplicación de vacuna contra {vaccine_desc}, "
+            f"jeringa prellenada, lote {lote}, con fecha de vencimiento {vencimiento}. "
+            f"Se brinda explicación del procedimiento y se informa sobre posibles efectos posvacunales. "
+            f"Se realiza administración del biológico en región deltoides de brazo {brazo_text.lower()} sin incidencias. "
+            f"Se entrega carnet de vacunas debidamente diligenciado. "
+            f"Paciente refiere haber comprendido la información proporcionada."
+        )
+        
+        return note
+    
+    # ==================== UTILIDADES DE PROCESAMIENTO ====================
+    
+    def _clean_text(self, text):
+        """Elimina espacios extra y convierte a mayúsculas."""
+        if pd.isna(text) or text is None:
+            return ""
+        text = str(text).strip()
+        text = re.sub(r'\s+', ' ', text)
+        return text.upper()
+    
+    def _clean_document(self, documento):
+        """Limpia número de documento y retorna como string numérico."""
+        if pd.isna(documento) or documento is None:
+            return ""
+        doc_clean = re.sub(r'[^\d]', '', str(documento))
+        return doc_clean
+    
+    def _normalize_arm(self, arm_text):
+        """Normaliza nombre del brazo usando diccionario."""
+        if pd.isna(arm_text) or arm_text is None:
+            return "IZQUIERDO"
+        
+        arm_clean = self._clean_text(arm_text)
+        
+        if not arm_clean:
+            return "IZQUIERDO"
+        
+        if arm_clean in ARM_DICTIONARY:
+            return ARM_DICTIONARY[arm_clean]
+        
+        for key, value in ARM_DICTIONARY.items():
+            if key in arm_clean or arm_clean in key:
+                return value
+        
+        return arm_clean
+    
+    def _translate_sex(self, sexo):
+        """Traduce sexo de MASCULINO/FEMENINO a HOMBRE/MUJER."""
+        sexo_upper = self._clean_text(sexo)
+        
+        if 'MASCULINO' in sexo_upper or sexo_upper == 'M':
+            return 'HOMBRE'
+        elif 'FEMENINO' in sexo_upper or sexo_upper == 'F':
+            return 'MUJER'
+        else:
+            return sexo_upper
+    
+    def _format_date(self, date_value):
+        """Formatea fecha a DD/MM/YYYY."""
+        if pd.isna(date_value) or date_value is None:
+            return ""
+        
+        try:
+            if isinstance(date_value, datetime):
+                return date_value.strftime('%d/%m/%Y')
+            elif isinstance(date_value, str):
+                formatted = self.parse_and_format_date(date_value)
+                if formatted:
+                    return formatted
+                return date_value
+            return str(date_value)
+        except Exception:
+            return str(date_value)
+    
+    def _get_full_name(self, primer_nombre, segundo_nombre):
+        """Combina primer y segundo nombre."""
+        primer = self._clean_text(primer_nombre)
+        segundo = self._clean_text(segundo_nombre)
+        
+        if segundo:
+            return f"{primer} {segundo}"
+        return primer
+    
+    def _parse_biologicos(self, vacuna_texto):
+        """Analiza texto de vacuna para extraer biológicos individuales."""
+        if pd.isna(vacuna_texto) or vacuna_texto is None:
+            return []
+        
+        vacuna_texto = self._clean_text(vacuna_texto)
+        
+        if " - " in vacuna_texto:
+            parts = vacuna_texto.split(" - ")
+        elif "-" in vacuna_texto and not vacuna_texto.startswith("-"):
+            parts = vacuna_texto.split("-")
+        elif "/" in vacuna_texto:
+            parts = vacuna_texto.split("/")
+        elif "," in vacuna_texto:
+            parts = vacuna_texto.split(",")
+        else:
+            parts = [vacuna_texto]
+        
+        biologicos = []
+        for part in parts:
+            part = part.strip()
+            if part:
+                biologicos.append(part)
+        
+        return biologicos
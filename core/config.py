@@ -1,5 +1,8 @@
-import os
+import copy
 import json
+import os
+import tempfile
+import threading
 
 APP_NAME = "PDF Tools"
 VERSION = "1.0.0"
@@ -26,13 +29,26 @@ VERSION = "1.0.0"
 DEFAULT_CONFIG = {
     "theme": "light",
     "color_theme": "blue",
-    "last_tool": "Calculadora"
+    "last_tool": "Calculadora",
+    # Guardar un perfil cProfile de cada trabajo en data/profiles/
+    "profiling": False,
+    # Perfil de guardado por herramienta (core.save_profiles); si falta, "auto"
+    "save_profiles": {},
+    # Patrones para nombrar las órdenes desde el texto (core.page_names); vacío = los predeterminados
+    "name_patterns": [],
+    # Límites de consulta a Horus (core.horus_engine: rate_per_second, burst, min/max_in_flight, latency_target); vacío = los predeterminados
+    "horus_limits": {},
+    # Días que una consulta a Horus se reutiliza desde la caché (core.affiliate_cache)
+    "horus_cache_days": 30
 }
 
 ICONO_APP = os.path.join(os.path.dirname(__file__), "..", "assets", "icon.png")
 DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data")
 CONFIG_FILE = os.path.join(DATA_DIR, "config.json")
 
+# Un solo escritor a la vez (leer-modificar-guardar no se intercala)
+_config_lock = threading.RLock()
+
 
 
 def load_config():
@@ -42,11 +58,66 @@ def load_config():
     try:
         with open(CONFIG_FILE, "r", encoding="utf-8") as f:
             return json.load(f)
-    except (json.JSONDecodeError, FileNotFoundError):
-        # Si el archivo está vacío o roto, lo repara
-        save_config(DEFAULT_CONFIG)
-        return DEFAULT_CONFIG
+    except (json.JSONDecodeError, FileNotFoundError) as e:
+        # No se reescribe con los valores por defecto: se perderían los ajustes
+        # del usuario; el próximo guardado deja el archivo bien
+        print(f"[WARN] No se pudo leer config.json ({e}); se usan los valores por defecto")
+        return copy.deepcopy(DEFAULT_CONFIG)
 
 def save_config(config):
-    with open(CONFIG_FILE, "w", encoding="utf-8") as f:
-        json.dump(config, f, indent=4, ensure_ascii=False)
+    """Escribe en un temporal y lo reemplaza: quien lee nunca ve el archivo a medias."""
+    with _config_lock:
+        _write_config(config)
+
+def _write_config(config):
+    os.makedirs(DATA_DIR, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=DATA_DIR, prefix="config.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(config, f, indent=4, ensure_ascii=False)
+        os.replace(tmp_path, CONFIG_FILE)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+def update_config(**changes):
+    """
+    Cambia solo las claves indicadas sobre lo que hay en disco (no sobre una
+    copia cargada al arrancar, que borraría lo guardado después por otra vista).
+    Retorna la configuración guardada.
+    """
+    with _config_lock:
+        config = dict(load_config())
+        config.update(changes)
+        save_config(config)
+        return config
+
+def get_save_profile(tool_name):
+    """Perfil de guardado elegido para la herramienta, o None (el predeterminado)."""
+    return load_config().get("save_profiles", {}).get(tool_name)
+
+def get_name_patterns():
+    """Patrones guardados para nombrar páginas desde su texto, o [] (los predeterminados)."""
+    return load_config().get("name_patterns") or []
+
+def set_save_profile(tool_name, profile):
+    """Guarda el perfil de guardado de una herramienta sin tocar los demás."""
+    with _config_lock:
+        profiles = dict(load_config().get("save_profiles") or {})
+        profiles[tool_name] = profile
+        update_config(save_profiles=profiles)
+        return profiles
+
+def set_name_patterns(patterns):
+    update_config(name_patterns=list(patterns))
+
+def get_horus_limits():
+    """Límites de consulta a Horus guardados, o {} (los predeterminados)."""
+    return load_config().get("horus_limits") or {}
+
+def get_horus_cache_days():
+    """Días de validez de la caché de afiliados, o None (el predeterminado)."""
+    return load_config().get("horus_cache_days")
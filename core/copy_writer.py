@@ -0,0 +1,151 @@
+"""
+Escritura de muchas copias idénticas de un archivo.
+
+Multiplicar soportes crea cientos de PDFs con el mismo contenido. El PDF se
+serializa una sola vez (bytes en memoria) y cada copia es solo E/S:
+
+  - auto: la primera copia se escribe de una vez; las demás se clonan de ella
+    con reflink (copy-on-write, sin duplicar datos) si el sistema de archivos
+    lo permite (Linux: btrfs, XFS...). Si no, se escriben los bytes.
+  - write: siempre se escriben los bytes.
+  - hardlink: las copias son enlaces duros a la primera. Es lo más rápido,
+    pero todas comparten el mismo contenido: modificar una las modifica
+    todas. Si el enlace falla (otro disco, FAT32), se escriben los bytes.
+
+Con workers > 1 las copias se escriben desde un pool de hilos (útil en
+carpetas de red, donde cada archivo espera al servidor).
+"""
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, List, Optional
+
+from core.instrumentation import span
+
+
+COPY_MODES = ("auto", "write", "hardlink")
+DEFAULT_COPY_MODE = "auto"
+
+# Hilos de escritura por defecto. En un disco local escribir en serie es igual
+# o más rápido; en carpetas de red conviene subirlo (p. ej. 4-8)
+DEFAULT_WRITE_WORKERS = 1
+
+# ioctl FICLONE de Linux (clonar un archivo completo)
+_FICLONE = 0x40049409
+
+
+def _clone_file(src: str, dst: str) -> bool:
+    """Crea dst como reflink de src. False si el sistema no lo permite."""
+    if not sys.platform.startswith("linux"):
+        return False
+    import fcntl
+    try:
+        with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+            fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+        return True
+    except OSError:
+        return False
+
+
+class CopyWriter:
+    """Escribe `data` en cada ruta según copy_mode. Se puede usar desde varios hilos."""
+
+    def __init__(self, data: bytes, copy_mode: str = DEFAULT_COPY_MODE):
+        if copy_mode not in COPY_MODES:
+            raise ValueError(f"Modo de copia desconocido: {copy_mode} (use {', '.join(COPY_MODES)})")
+        self.data = data
+        self.copy_mode = copy_mode
+        self.source: Optional[str] = None       # primera copia escrita
+        self._link_ok = copy_mode != "write"    # se deja de intentar tras el primer fallo
+        self._lock = threading.Lock()
+
+    def write(self, path: str):
+        source = self.source
+        if source and self._link_ok:
+            if self._link(source, path):
+                return
+            with self._lock:
+                if self._link_ok:
+                    method = "reflink" if self.copy_mode == "auto" else self.copy_mode
+                    print(f"[INFO] No se pudo usar {method} en esta carpeta; se escribirán los archivos.")
+                self._link_ok = False
+
+        with open(path, "wb") as f:
+            f.write(self.data)
+        if source is None:
+            self.source = path
+
+    def _link(self, source: str, path: str) -> bool:
+        if self.copy_mode == "hardlink":
+            try:
+                os.link(source, path)
+                return True
+            except OSError:
+                return False
+        return _clone_file(source, path)
+
+
+def write_copies(
+    data: bytes,
+    paths: List[str],
+    copy_mode: str = DEFAULT_COPY_MODE,
+    workers: int = DEFAULT_WRITE_WORKERS,
+    progress_callback: Optional[Callable[[float], None]] = None,
+    on_created: Optional[Callable[[str], None]] = None,
+) -> List[str]:
+    """
+    Escribe una copia de `data` en cada ruta. La primera se escribe antes de
+    repartir el resto entre los hilos (las demás se clonan de ella).
+    progress_callback y on_created se llaman desde el hilo que llama a esta
+    función; on_created también para las copias que terminan después de una
+    cancelación (quien llama sabe qué quedó en disco). Retorna las rutas
+    creadas, en el orden recibido.
+    """
+    writer = CopyWriter(data, copy_mode)
+    total = len(paths)
+    created = set()
+
+    def done(path: str):
+        created.add(path)
+        if on_created:
+            on_created(path)
+        if progress_callback:
+            progress_callback(len(created) / total)
+
+    with span("write_copies"):
+        if not paths:
+            return []
+        writer.write(paths[0])
+        done(paths[0])
+
+        rest = paths[1:]
+        if workers > 1 and len(rest) > 1:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="copy") as pool:
+                futures = {pool.submit(writer.write, path): path for path in rest}
+                try:
+                    for future in as_completed(futures):
+                        future.result()
+                        done(futures[future])
+                except BaseException:
+                    # Cancelación o error: no se empiezan más copias
+                    for future in futures:
+                        future.cancel()
+                    # Las que ya se estaban escribiendo terminan igual: se informan
+                    for future, path in futures.items():
+                        if future.cancelled() or path in created:
+                            continue
+                        try:
+                            future.result()
+                        except Exception:
+                            continue
+                        created.add(path)
+                        if on_created:
+                            on_created(path)
+                    raise
+        else:
+            for path in rest:
+                writer.write(path)
+                done(path)
+
+    return [path for path in paths if path in created]
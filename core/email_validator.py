@@ -0,0 +1,141 @@
+"""
+Validación de correos electrónicos sin interfaz gráfica.
+La usan la herramienta "Validar Correos" y la línea de comandos.
+"""
+import re
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, List, Optional, Tuple
+
+import dns.resolver
+import pandas as pd
+
+from core.instrumentation import span
+
+
+# ==================== DATACLASS PARA ERRORES ====================
+@dataclass
+class EmailError:
+    """Clase para almacenar información de errores en correos."""
+    row: int
+    email: str
+    error_type: str
+    detail: str = ""
+
+
+# ==================== CLASE VALIDADOR ====================
+class EmailValidator:
+    """
+    Clase encargada de toda la lógica de validación de correos.
+    Valida formato, caracteres y dominios MX.
+    """
+
+    EMAIL_PATTERN = re.compile(r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$")
+    EMAIL_COLUMN_NAMES = ['correo', 'email', 'e-mail', 'mail', 'correo electrónico', 'correo electronico']
+
+    @staticmethod
+    def normalize_text(text: str) -> str:
+        """Elimina acentos y caracteres especiales Unicode."""
+        nfkd = unicodedata.normalize('NFKD', text)
+        return ''.join(c for c in nfkd if not unicodedata.combining(c))
+
+    def is_valid_email(self, email: str) -> bool:
+        """Valida el formato del correo electrónico."""
+        email = email.strip()
+        email = self.normalize_text(email)
+        if not email or any(ord(c) > 127 for c in email):
+            return False
+        return self.EMAIL_PATTERN.fullmatch(email) is not None
+
+    @lru_cache(maxsize=500)
+    def is_valid_domain(self, domain: str) -> bool:
+        """Valida que el dominio tenga registros MX válidos (con caché)."""
+        try:
+            with span("dns_lookup"):
+                dns.resolver.resolve(domain, 'MX', lifetime=3)
+            return True
+        except Exception:
+            return False
+
+    def find_email_column(self, columns: List[str]) -> Optional[str]:
+        """Busca automáticamente la columna que contiene correos."""
+        columns_lower = [col.lower().strip() for col in columns]
+        for name in self.EMAIL_COLUMN_NAMES:
+            if name in columns_lower:
+                return columns[columns_lower.index(name)]
+        return None
+
+    def validate_single_email(self, idx: int, email: str) -> Optional[EmailError]:
+        """Valida un correo individual y retorna el error si existe."""
+        if pd.isna(email):
+            return None
+
+        email = str(email).strip()
+
+        if '@' not in email:
+            return EmailError(idx, email, "FORMATO", "Falta el carácter '@'")
+
+        user, domain = email.split('@', 1)
+
+        if any(ord(c) > 127 for c in user):
+            return EmailError(idx, email, "CARACTERES", "Usuario contiene acentos o caracteres no permitidos")
+
+        clean_email = self.normalize_text(email)
+
+        if not self.is_valid_email(clean_email):
+            return EmailError(idx, email, "FORMATO", "Formato de correo inválido")
+
+        clean_domain = clean_email.split('@')[1]
+        if not self.is_valid_domain(clean_domain):
+            return EmailError(idx, email, "DOMINIO", f"Dominio inválido ({clean_domain})")
+
+        return None
+
+
+# ==================== PROCESAMIENTO ====================
+
+def read_email_column(file_path: str, validator: EmailValidator) -> Tuple[Optional[str], List[str], list]:
+    """
+    Lee el Excel y busca la columna de correos.
+    Retorna: (columna encontrada o None, columnas disponibles, correos)
+    """
+    with span("read_excel"):
+        df = pd.read_excel(file_path, engine='openpyxl')
+    columns = df.columns.tolist()
+    email_column = validator.find_email_column(columns)
+    if not email_column:
+        return None, columns, []
+    return email_column, columns, df[email_column].tolist()
+
+
+def validate_emails(
+    emails: list,
+    validator: EmailValidator,
+    on_result: Optional[Callable[[Optional[EmailError], int, int], None]] = None,
+    max_workers: int = 10,
+) -> List[EmailError]:
+    """
+    Valida los correos en paralelo. La fila reportada es la del Excel (índice + 2).
+    on_result(error_o_None, completados, total) se llama al terminar cada correo.
+    """
+    total = len(emails)
+    errors: List[EmailError] = []
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(validator.validate_single_email, idx + 2, email): idx
+            for idx, email in enumerate(emails)
+        }
+
+        completed = 0
+        for future in as_completed(futures):
+            completed += 1
+            result = future.result()
+            if result:
+                errors.append(result)
+            if on_result:
+                on_result(result, completed, total)
+
+    return errors
@@ -0,0 +1,184 @@
+"""
+Índice de los PDFs de una carpeta para "Unir grupos de PDFs".
+
+get_groups_case_sensitive listaba la carpeta, ordenaba todo con natural_key
+y recalculaba el prefijo de cada archivo en cada refresco (también después
+de unir un solo grupo). En carpetas de red con ~20.000 archivos eso tarda
+varios segundos. FolderIndex guarda por archivo (nombre, prefijo, clave
+natural) y los grupos ya ordenados:
+
+  - refresh() primero mira la fecha de modificación de la carpeta: si no
+    cambió no se lista nada. Si cambió, se lista y solo se procesan los
+    nombres nuevos; los que desaparecieron se quitan,
+  - apply_changes() registra lo que la propia aplicación movió o creó
+    (unir/deshacer) sin volver a listar la carpeta,
+  - refresh(force=True) reconstruye todo (botón "Refrescar": algunos
+    recursos de red no actualizan la fecha de la carpeta).
+"""
+import bisect
+import os
+import re
+import threading
+import time
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+
+def natural_key(s: str):
+    """Clave para ordenamiento natural."""
+    parts = re.split(r'(\d+)', s)
+    return [int(p) if p.isdigit() else p for p in parts]
+
+
+def extract_prefix(filename: str) -> str:
+    """Extrae el prefijo antes del primer espacio o punto."""
+    name_no_ext = re.sub(r'\.pdf$', '', filename, flags=re.IGNORECASE)
+    match = re.search(r'[.\s]', name_no_ext)
+    if match:
+        return name_no_ext[:match.start()]
+    return name_no_ext
+
+
+# Una fecha de carpeta más reciente que esto no se da por buena (en FAT/red la
+# resolución es de ~2 s: un archivo creado en el mismo instante no la cambiaría)
+MTIME_SLACK_NS = 3 * 10**9
+
+
+def _trusted_mtime(mtime_ns: int) -> Optional[int]:
+    """La fecha de la carpeta, o None si es tan reciente que hay que volver a listar."""
+    return None if time.time_ns() - mtime_ns < MTIME_SLACK_NS else mtime_ns
+
+
+class FileEntry(NamedTuple):
+    name: str
+    prefix: str
+    sort_key: list
+
+
+class FolderIndex:
+    """PDFs de una carpeta agrupados por prefijo, actualizados por diferencias."""
+
+    def __init__(self, folder: str):
+        self.folder = folder
+        self.entries: Dict[str, FileEntry] = {}
+        self._by_prefix: Dict[str, List[Tuple[list, str]]] = {}   # prefijo -> [(clave, nombre)] ordenado
+        self._prefix_keys: Dict[str, list] = {}
+        self._dir_mtime: Optional[int] = None                       # None: listar en el próximo refresh
+        self._loaded = False
+        self._groups: Optional[Dict[str, List[str]]] = None       # resultado de groups(), hasta el próximo cambio
+        self._lock = threading.Lock()
+
+    # ==================== ACTUALIZACIÓN ====================
+
+    def refresh(self, force: bool = False) -> bool:
+        """Actualiza el índice con la carpeta. Retorna True si algo cambió."""
+        with self._lock:
+            dir_mtime = os.stat(self.folder).st_mtime_ns
+            if not force and dir_mtime == self._dir_mtime:
+                return False
+
+            if force:
+                self._clear()
+            on_disk = {name for name in os.listdir(self.folder) if name.lower().endswith(".pdf")}
+
+            removed = [name for name in self.entries if name not in on_disk]
+            added = [name for name in on_disk if name not in self.entries]
+            for name in removed:
+                self._remove(name)
+            for name in added:
+                self._add(name)
+
+            self._dir_mtime = _trusted_mtime(dir_mtime)
+            self._loaded = True
+            changed = bool(removed or added)
+            if changed:
+                self._groups = None
+            return changed
+
+    def apply_changes(self, removed: Iterable[str] = (), added: Iterable[str] = ()):
+        """
+        Registra cambios hechos por la aplicación (archivos movidos o creados en
+        la carpeta) sin listarla. Si el índice aún no se cargó, no hace nada.
+        """
+        with self._lock:
+            if not self._loaded:
+                return
+            for name in removed:
+                self._remove(name)
+            for name in added:
+                if name.lower().endswith(".pdf") and name not in self.entries:
+                    self._add(name)
+            self._groups = None
+            # Si el índice estaba al día, la carpeta cambió solo por estos
+            # movimientos: se toma su nueva fecha sin volver a listarla
+            if self._dir_mtime is not None:
+                try:
+                    self._dir_mtime = os.stat(self.folder).st_mtime_ns
+                except OSError:
+                    self._dir_mtime = None
+
+    def _clear(self):
+        self.entries.clear()
+        self._by_prefix.clear()
+        self._prefix_keys.clear()
+        self._groups = None
+
+    def _add(self, name: str):
+        # Solo el nombre: un stat por archivo es caro en carpetas de red
+        prefix = extract_prefix(name)
+        entry = FileEntry(name, prefix, natural_key(name))
+        self.entries[name] = entry
+        members = self._by_prefix.get(prefix)
+        if members is None:
+            members = self._by_prefix[prefix] = []
+            self._prefix_keys[prefix] = natural_key(prefix)
+        bisect.insort(members, (entry.sort_key, name))
+
+    def _remove(self, name: str):
+        entry = self.entries.pop(name, None)
+        if entry is None:
+            return
+        members = self._by_prefix[entry.prefix]
+        i = bisect.bisect_left(members, (entry.sort_key, name))
+        if i < len(members) and members[i][1] == name:
+            del members[i]
+        if not members:
+            del self._by_prefix[entry.prefix]
+            del self._prefix_keys[entry.prefix]
+
+    # ==================== CONSULTA ====================
+
+    def groups(self) -> Dict[str, List[str]]:
+        """Grupos con más de 1 PDF, en orden natural (prefijos y archivos)."""
+        with self._lock:
+            if self._groups is None:
+                keys = sorted(
+                    (p for p, members in self._by_prefix.items() if len(members) > 1),
+                    key=self._prefix_keys.__getitem__,
+                )
+                self._groups = {p: [name for _, name in self._by_prefix[p]] for p in keys}
+            return {k: list(v) for k, v in self._groups.items()}
+
+    def files(self, prefix: str) -> List[str]:
+        """Archivos de un prefijo (aunque sea uno solo), en orden natural."""
+        with self._lock:
+            return [name for _, name in self._by_prefix.get(prefix, [])]
+
+
+_indexes: Dict[str, FolderIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_folder_index(folder: str) -> FolderIndex:
+    """Índice compartido de la carpeta (se crea vacío; refresh() lo carga)."""
+    key = os.path.normcase(os.path.abspath(folder))
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = _indexes[key] = FolderIndex(folder)
+        return index
+
+
+def find_folder_index(folder: str) -> Optional[FolderIndex]:
+    """Índice de la carpeta si ya existe (para registrar cambios), o None."""
+    with _indexes_lock:
+        return _indexes.get(os.path.normcase(os.path.abspath(folder)))
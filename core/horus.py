@@ -0,0 +1,379 @@
+"""
+Consulta de afiliados en Horus Health sin interfaz gráfica.
+La usan la herramienta "Horus" y la línea de comandos.
+
+HorusClient mantiene una requests.Session: las consultas reutilizan las
+conexiones (keep-alive, sin un TCP+TLS nuevo por documento) y el token va en
+los encabezados de la sesión. Los timeouts, errores de conexión y 5xx se
+reintentan con backoff exponencial antes de dejar una fila "ERROR (...)".
+
+ResultStore guarda los resultados por columnas (tipo, número, nombre, estado,
+ips) con un índice de documentos: importar un Excel no vuelve a leer la tabla
+para saber qué documentos ya están, y exportar escribe las columnas tal cual
+con un libro write_only (o CSV), sin volver a separar cada documento.
+"""
+import bisect
+import csv
+import random
+import re
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Container, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from openpyxl import Workbook, load_workbook
+
+from core.instrumentation import span
+
+
+# Constantes de la API
+DOC_TYPES = {"CC": 1, "TI": 2, "RC": 3}
+LOGIN_URL = "https://backend.horus-health.com/api/auth/validar-usuario"
+BASE_URL = "https://backend.horus-health.com/api/afiliados/consultar-afiliado"
+
+EXPORT_HEADERS = ["Tipo Doc", "Número", "Nombre", "Estado", "IPS"]
+
+# Respuestas que piden esperar antes de reintentar
+RATE_LIMIT_STATUS = (429, 503)
+
+# Errores transitorios: se reintentan con backoff exponencial (BACKOFF_SECONDS * 2^intento)
+RETRY_STATUS = (500, 502, 503, 504)
+MAX_RETRIES = 3
+BACKOFF_SECONDS = 0.5
+
+# Filas que dejan los reintentos agotados: la API estaba saturada, no es un resultado
+OVERLOAD_NAMES = frozenset(f"REVISAR ({code})" for code in RETRY_STATUS + RATE_LIMIT_STATUS)
+
+REQUEST_TIMEOUT = 10
+DEFAULT_POOL_SIZE = 4
+
+
+class RateLimited(Exception):
+    """La API pidió bajar el ritmo (429, o 503 con Retry-After)."""
+
+    def __init__(self, status_code: int, retry_after: Optional[float]):
+        super().__init__(f"La API pidió esperar ({status_code})")
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+# ==================== UTILIDADES ====================
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Segundos a esperar según Retry-After (segundos o fecha HTTP), o None."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+# Documento bien formado ("CC123456789", "cc 123456789")
+_DOCUMENT_RE = re.compile(r"\s*([^\W\d_]+)\s*(\d+)\s*")
+
+
+def split_document(document: str) -> Tuple[str, str]:
+    """Separa 'CC123456789' en ('CC', '123456789')."""
+    match = _DOCUMENT_RE.fullmatch(document)
+    if match:
+        return match.group(1).upper(), match.group(2)
+    # Formato irregular ("C.C. 123.456"): letras por un lado y dígitos por otro
+    doc_type = ''.join([c for c in document if c.isalpha()]).upper()
+    doc_number = ''.join([c for c in document if c.isdigit()])
+    return doc_type, doc_number
+
+
+# ==================== CLIENTE ====================
+
+class HorusClient:
+    """
+    Cliente de la API con una sesión compartida por los hilos de consulta.
+    pool_size: conexiones que se mantienen abiertas (una por consulta en vuelo).
+    """
+
+    def __init__(
+        self,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        max_retries: int = MAX_RETRIES,
+        backoff: float = BACKOFF_SECONDS,
+        timeout: float = REQUEST_TIMEOUT,
+    ):
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.token: Optional[str] = None
+        self.session = requests.Session()
+        self.session.headers["Accept"] = "application/json"
+        self.pool_size = 0
+        self._pool_lock = threading.Lock()
+        self.set_pool_size(pool_size)
+
+    def set_pool_size(self, pool_size: int):
+        """Ajusta las conexiones que se conservan (p. ej. al subir max_in_flight)."""
+        pool_size = max(1, int(pool_size))
+        with self._pool_lock:
+            if pool_size == self.pool_size:
+                return
+            old = self.session.adapters.get("https://")
+            self.session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+            self.pool_size = pool_size
+        if old is not None:
+            old.close()
+
+    def close(self):
+        self.session.close()
+
+    # ==================== HTTP ====================
+
+    def _request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Envía la petición reintentando timeouts, errores de conexión y 5xx.
+        Un 503 con Retry-After no se reintenta aquí: es un límite de ritmo y
+        lo maneja quien consulta (RateLimited).
+        """
+        attempt = 0
+        while True:
+            try:
+                with span("http_request"):
+                    response = self.session.request(method, url, timeout=self.timeout, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt >= self.max_retries:
+                    raise
+            else:
+                retryable = (
+                    response.status_code in RETRY_STATUS
+                    and not (response.status_code == 503 and response.headers.get("Retry-After"))
+                )
+                if not retryable or attempt >= self.max_retries:
+                    return response
+            time.sleep(self.backoff * 2 ** attempt * random.uniform(1, 1.5))
+            attempt += 1
+
+    # ==================== API ====================
+
+    def login(self, email: str, password: str) -> Optional[str]:
+        """Inicia sesión y retorna el token, o None si las credenciales son inválidas."""
+        payload = {"email": email, "password": password}
+        response = self._request("POST", LOGIN_URL, json=payload)
+        token = response.json().get("token")
+        self.set_token(token)
+        return token
+
+    def set_token(self, token: Optional[str]):
+        """Guarda el token en los encabezados de la sesión (None lo quita)."""
+        self.token = token
+        if token:
+            self.session.headers["Authorization"] = f"Bearer {token}"
+        else:
+            self.session.headers.pop("Authorization", None)
+
+    def query_affiliate(self, document: str) -> Tuple[str, str, str, str]:
+        """
+        Consulta un afiliado individual en la API.
+        Retorna: (documento, nombre, estado, ips)
+        Si la API pide esperar (429, o 503 con Retry-After) lanza RateLimited
+        para que quien consulta reintente después.
+        """
+        if not self.token:
+            return document, "DESCONECTADO", "", ""
+
+        # Extraer tipo y número del documento
+        doc_type, doc_number = split_document(document)
+
+        type_id = DOC_TYPES.get(doc_type)
+        if not type_id or not doc_number:
+            return document, "REVISAR (formato inválido)", "", ""
+
+        url = f"{BASE_URL}/{doc_number}/{type_id}"
+
+        try:
+            response = self._request("GET", url)
+
+            if response.status_code == 401:
+                return document, "TOKEN INVÁLIDO", "", ""
+
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            if response.status_code == 429 or (response.status_code in RATE_LIMIT_STATUS and retry_after is not None):
+                raise RateLimited(response.status_code, retry_after)
+
+            if response.status_code == 200:
+                return _row_from_data(document, response.json())
+
+            return document, f"REVISAR ({response.status_code})", "", ""
+
+        except RateLimited:
+            raise
+        except Exception as e:
+            return document, f"ERROR ({str(e)})", "", ""
+
+
+def _row_from_data(document: str, data: dict) -> Tuple[str, str, str, str]:
+    """Fila (documento, nombre, estado, ips) a partir de la respuesta de la API."""
+    # Construir nombre completo
+    name = " ".join(filter(None, [
+        data.get("primer_nombre"),
+        data.get("segundo_nombre"),
+        data.get("primer_apellido"),
+        data.get("segundo_apellido")
+    ])).strip()
+
+    if not name:
+        name = "REVISAR (sin nombre)"
+
+    status = data.get("estado_afiliado", {}).get("nombre", "REVISAR")
+    ips = data.get("ips", {}).get("nombre", "REVISAR")
+
+    return document, name, status, ips
+
+
+# ==================== RESULTADOS ====================
+
+class ResultStore:
+    """
+    Resultados de una consulta en columnas paralelas. El tipo y número se
+    separan una sola vez, al agregar la fila. Las filas quedan ordenadas por
+    su posición en la lista de entrada aunque lleguen en otro orden.
+    """
+
+    def __init__(self, rows: Iterable[Tuple[str, str, str, str]] = ()):
+        self.clear()
+        self.extend(rows)
+
+    def clear(self):
+        # Listas nuevas (no .clear()): una exportación en curso sigue con las anteriores
+        self.documents: List[str] = []
+        self.doc_types: List[str] = []
+        self.doc_numbers: List[str] = []
+        self.names: List[str] = []
+        self.statuses: List[str] = []
+        self.ips: List[str] = []
+        self.positions: List[int] = []  # posición de cada fila en la lista de entrada
+        self._document_set = set()
+
+    def add(self, row: Tuple[str, str, str, str], position: Optional[int] = None) -> int:
+        """
+        Agrega la fila según su posición de entrada (por defecto, al final).
+        Retorna el número de fila donde quedó.
+        """
+        document, name, status, ips = row
+        doc_type, doc_number = split_document(document)
+        last = self.positions[-1] if self.positions else -1
+        if position is None:
+            position = last + 1
+        self._document_set.add(document)
+        if position >= last:
+            at = len(self.positions)
+        else:
+            # Llegó antes que otra de la lista (la consulta tardó más): casi siempre cerca del final
+            at = bisect.bisect_right(self.positions, position)
+        for column, value in ((self.positions, position), (self.documents, document),
+                              (self.doc_types, doc_type), (self.doc_numbers, doc_number),
+                              (self.names, name), (self.statuses, status), (self.ips, ips)):
+            column.insert(at, value)
+        return at
+
+    def append(self, row: Tuple[str, str, str, str]):
+        self.add(row)
+
+    def extend(self, rows: Iterable[Tuple[str, str, str, str]]):
+        for row in rows:
+            self.append(row)
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def __contains__(self, document) -> bool:
+        return document in self._document_set
+
+    def rows(self) -> Iterator[Tuple[str, str, str, str]]:
+        """Filas (documento, nombre, estado, ips) en orden."""
+        return zip(self.documents, self.names, self.statuses, self.ips)
+
+    def export_rows(self) -> Iterator[Tuple[str, str, str, str, str]]:
+        """Filas (tipo, número, nombre, estado, ips) como van al Excel."""
+        return zip(self.doc_types, self.doc_numbers, self.names, self.statuses, self.ips)
+
+
+def _export_rows(results) -> Iterator:
+    if isinstance(results, ResultStore):
+        return results.export_rows()
+    return ((*split_document(doc), nombre, estado, ips) for doc, nombre, estado, ips in results)
+
+
+# ==================== EXCEL ====================
+
+def read_documents_from_excel(file_path: str, existing: Optional[Container[str]] = None) -> Tuple[List[str], int]:
+    """
+    Lee documentos desde la fila 3, columnas C (tipo) y D (número).
+    existing: documentos que ya están (un set o un ResultStore); no se copian.
+    Retorna: (documentos nuevos, duplicados omitidos)
+    """
+    with span("read_excel"):
+        wb = load_workbook(filename=file_path, read_only=True, data_only=True)
+    ws = wb.active
+
+    existing = existing if existing is not None else ()
+    seen = set()
+    loaded = []
+    skipped = 0
+
+    try:
+        for row in ws.iter_rows(min_row=3, min_col=3, max_col=4, values_only=True):
+            col_c = "" if len(row) < 1 or row[0] is None else str(row[0])
+            col_d = "" if len(row) < 2 or row[1] is None else str(row[1])
+            val = f"{col_c}{col_d}".strip()
+
+            if val:
+                if val in seen or val in existing:
+                    skipped += 1
+                else:
+                    loaded.append(val)
+                    seen.add(val)
+    finally:
+        wb.close()
+
+    return loaded, skipped
+
+
+def export_results_excel(results, file_path: str) -> str:
+    """
+    Exporta a Excel separando tipo y número. results: un ResultStore o filas
+    (documento, nombre, estado, ips). El libro es write_only: las filas van
+    directo al archivo y la memoria no crece con la cantidad de afiliados.
+    """
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Afiliados")
+
+    # Encabezados
+    ws.append(EXPORT_HEADERS)
+
+    with span("write_excel"):
+        for row in _export_rows(results):
+            ws.append(row)
+        wb.save(file_path)
+    return file_path
+
+
+def export_results_csv(results, file_path: str) -> str:
+    """Igual que export_results_excel pero a CSV (UTF-8 con BOM para que Excel respete las tildes)."""
+    with span("write_csv"):
+        with open(file_path, "w", encoding="utf-8-sig", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(EXPORT_HEADERS)
+            writer.writerows(_export_rows(results))
+    return file_path
+
+
+def export_results(results, file_path: str) -> str:
+    """Exporta a CSV si el archivo termina en .csv; si no, a Excel."""
+    if file_path.lower().endswith(".csv"):
+        return export_results_csv(results, file_path)
+    return export_results_excel(results, file_path)
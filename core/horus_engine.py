@@ -0,0 +1,396 @@
+"""
+Consultas concurrentes a Horus con límite de ritmo.
+
+Antes se consultaba un documento a la vez con una espera fija de 2-3 s
+(~0,4 consultas/s: 5.000 afiliados tomaban unas 4 horas). Aquí:
+
+  - un token bucket limita las consultas por segundo (rate_per_second, con
+    ráfagas de hasta `burst` seguidas),
+  - las consultas en vuelo las ajusta un control AIMD entre min_in_flight y
+    max_in_flight: sube de a una por ronda mientras las respuestas llegan
+    antes de latency_target, y baja a la mitad con un 429/5xx, un timeout o
+    una respuesta lenta,
+  - si la API responde 429 (o 503 con Retry-After), se pausan todas las
+    consultas el tiempo pedido (o un backoff exponencial si no lo indica) y
+    el documento se vuelve a consultar,
+  - con un 401 (token inválido) no se envían más consultas: las que faltan
+    quedan marcadas como TOKEN INVÁLIDO,
+  - con una caché (core.affiliate_cache), los documentos consultados hace
+    menos del TTL no se envían; las respuestas nuevas se guardan en ella,
+  - con una bitácora (core.horus_journal), cada resultado se guarda en disco
+    apenas llega y al reanudar solo se consultan los documentos pendientes.
+
+Los límites se configuran en config.json ("horus_limits").
+"""
+import queue
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+from core import horus as horus_api
+from core.affiliate_cache import AffiliateCache, is_cacheable, ttl_seconds
+from core.horus_journal import BatchJournal
+
+
+DEFAULT_LIMITS = {
+    "rate_per_second": 2.0,   # consultas por segundo en promedio
+    "burst": 2,               # consultas seguidas permitidas tras un rato sin consultar
+    "max_in_flight": 4,       # máximo de consultas esperando respuesta a la vez
+    "min_in_flight": 1,       # mínimo al que baja el control adaptativo
+    "latency_target": 3.0,    # segundos: una respuesta más lenta cuenta como congestión
+}
+
+# Reintentos de un documento tras 429 y espera cuando la API no manda Retry-After
+MAX_RATE_LIMIT_RETRIES = 5
+BACKOFF_SECONDS = 5.0
+MAX_BACKOFF_SECONDS = 120.0
+
+# Cada cuánto se revisa la cancelación mientras no termina ninguna consulta
+CANCEL_POLL_SECONDS = 0.5
+
+# Consultas recientes con las que se mide el ritmo (consultas/s y tiempo restante)
+RATE_WINDOW = 50
+
+Row = Tuple[str, str, str, str]
+
+# Filas que indican que la API está saturada (ya reintentadas por HorusClient)
+_OVERLOAD_PREFIXES = ("ERROR",)
+
+
+def load_limits(overrides: Optional[Dict] = None) -> Dict:
+    """Límites predeterminados con los de config.json y `overrides` encima."""
+    from core.config import get_horus_limits
+
+    limits = dict(DEFAULT_LIMITS)
+    for source in (get_horus_limits(), overrides or {}):
+        limits.update({k: v for k, v in source.items() if k in DEFAULT_LIMITS and v})
+    return limits
+
+
+class TokenBucket:
+    """Token bucket compartido por los hilos de consulta."""
+
+    def __init__(self, rate_per_second: float, burst: float = 1):
+        if rate_per_second <= 0:
+            raise ValueError("El límite de consultas por segundo debe ser mayor que 0.")
+        self.rate = float(rate_per_second)
+        self.capacity = max(1.0, float(burst))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def pause(self, seconds: float) -> bool:
+        """
+        Ninguna consulta sale antes de `seconds` (Retry-After). Al terminar la
+        pausa el ritmo arranca sin ráfaga. Retorna True si la pausa se extendió.
+        """
+        with self._lock:
+            until = time.monotonic() + max(0.0, seconds)
+            if until <= self._paused_until:
+                return False
+            self._paused_until = until
+            self._tokens = 0.0
+            self._updated = until
+            return True
+
+    def acquire(self, stop_event: Optional[threading.Event] = None) -> bool:
+        """Espera un turno. Retorna False si stop_event se activó mientras tanto."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    wait = self._paused_until - now
+                else:
+                    self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                    self._updated = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return True
+                    wait = (1 - self._tokens) / self.rate
+            if stop_event is None:
+                time.sleep(wait)
+            elif stop_event.wait(wait):
+                return False
+
+
+class AdaptiveConcurrency:
+    """
+    Límite AIMD de consultas en vuelo. Cada respuesta a tiempo suma 1/límite
+    (una consulta más por ronda); una señal de congestión lo reduce a la
+    mitad. Las consultas enviadas antes de la última reducción no lo vuelven
+    a reducir (una ráfaga de 429 cuenta una sola vez).
+    """
+
+    def __init__(self, min_limit: int, max_limit: int, latency_target: float):
+        self.min_limit = max(1, int(min_limit))
+        self.max_limit = max(self.min_limit, int(max_limit))
+        self.latency_target = float(latency_target)
+        self.limit = float(self.min_limit)
+        self.in_flight = 0
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+
+    @property
+    def current(self) -> int:
+        return int(self.limit)
+
+    def acquire(self, stop_event: Optional[threading.Event] = None) -> Optional[float]:
+        """Espera un lugar. Retorna el instante de envío, o None si stop_event se activó."""
+        with self._cond:
+            while self.in_flight >= int(self.limit):
+                if stop_event is not None and stop_event.is_set():
+                    return None
+                self._cond.wait(0.2)
+            self.in_flight += 1
+            return time.monotonic()
+
+    def release(self, started: float, congested: Optional[bool]):
+        """
+        Libera el lugar y ajusta el límite según cómo respondió la API
+        (congested None: no hubo respuesta, no se ajusta).
+        """
+        now = time.monotonic()
+        with self._cond:
+            self.in_flight -= 1
+            if congested is None:
+                pass
+            elif congested or now - started > self.latency_target:
+                if started >= self._last_decrease:
+                    self.limit = max(float(self.min_limit), self.limit / 2)
+                    self._last_decrease = now
+            else:
+                self.limit = min(float(self.max_limit), self.limit + 1 / self.limit)
+            self._cond.notify_all()
+
+
+class RateMeter:
+    """Consultas por segundo según las últimas RATE_WINDOW terminadas."""
+
+    def __init__(self, window: int = RATE_WINDOW):
+        self._times = deque(maxlen=window)
+
+    def add(self):
+        self._times.append(time.monotonic())
+
+    def rate(self) -> float:
+        if len(self._times) < 2:
+            return 0.0
+        elapsed = self._times[-1] - self._times[0]
+        return (len(self._times) - 1) / elapsed if elapsed > 0 else 0.0
+
+
+def _is_congested(row: Row) -> bool:
+    return row[1] in horus_api.OVERLOAD_NAMES or row[1].startswith(_OVERLOAD_PREFIXES)
+
+
+class _RunState:
+    """Estado compartido por los hilos de una corrida."""
+
+    def __init__(self):
+        self.stop = threading.Event()
+        self.unauthorized = False
+
+
+def _cached_row(cache: AffiliateCache, document: str, max_age: float) -> Optional[Row]:
+    doc_type, doc_number = horus_api.split_document(document)
+    if not doc_type or not doc_number:
+        return None
+    hit = cache.get(doc_type, doc_number, max_age)
+    return (document, hit[0], hit[1], hit[2]) if hit else None
+
+
+def _query_with_retries(
+    client: horus_api.HorusClient, document: str, bucket: TokenBucket, state: _RunState,
+    cache: Optional[AffiliateCache] = None, concurrency: Optional[AdaptiveConcurrency] = None,
+) -> Optional[Row]:
+    """Consulta un documento respetando el ritmo; None si se detuvo la corrida."""
+    attempts = 0
+    while True:
+        if state.unauthorized:
+            return document, "TOKEN INVÁLIDO", "", ""
+        started = concurrency.acquire(state.stop) if concurrency is not None else time.monotonic()
+        if started is None:
+            return None
+        congested = None  # sin respuesta (se detuvo la corrida): no ajusta el límite
+        try:
+            if state.stop.is_set() or not bucket.acquire(state.stop):
+                return None
+            # El tiempo en la cola del bucket no cuenta como latencia de la API
+            started = time.monotonic()
+            row = client.query_affiliate(document)
+            congested = _is_congested(row)
+        except horus_api.RateLimited as e:
+            congested = True
+            attempts += 1
+            if attempts > MAX_RATE_LIMIT_RETRIES:
+                return document, f"REVISAR ({e.status_code})", "", ""
+            wait = e.retry_after
+            if wait is None:
+                wait = min(MAX_BACKOFF_SECONDS, BACKOFF_SECONDS * 2 ** (attempts - 1)) * random.uniform(1, 1.2)
+            if bucket.pause(wait):
+                print(f"[WARN] Horus pidió esperar ({e.status_code}): pausa de {wait:.0f} s")
+            continue
+        finally:
+            if concurrency is not None:
+                concurrency.release(started, congested)
+
+        if row[1] == "TOKEN INVÁLIDO":
+            state.unauthorized = True
+        elif cache is not None and is_cacheable(row):
+            cache.put(*horus_api.split_document(document), *row[1:])
+        return row
+
+
+def query_affiliates(
+    client: horus_api.HorusClient,
+    documents: List[str],
+    on_result: Optional[Callable[[int, Row, int, int], None]] = None,
+    limits: Optional[Dict] = None,
+    cache: Optional[AffiliateCache] = None,
+    max_age: Optional[float] = None,
+    force_refresh: bool = False,
+    stats: Optional[Dict] = None,
+    journal: Optional[BatchJournal] = None,
+    check_cancelled: Optional[Callable[[], None]] = None,
+) -> List[Row]:
+    """
+    Consulta los documentos en paralelo dentro de los límites (load_limits)
+    con la sesión del cliente (ya autenticado).
+    on_result(índice, fila, completados, total) se llama desde este hilo a
+    medida que llegan las filas (primero las de la bitácora y la caché, en
+    orden; después las consultas según terminan: un documento en espera por
+    un 429 no retiene a los demás). El índice es la posición en `documents`.
+    Si on_result lanza una excepción (p. ej. cancelación) no se envían más
+    consultas y la excepción se propaga. check_cancelled (p. ej.
+    job.check_cancelled) se llama también mientras se espera: una
+    cancelación no espera a que llegue la próxima fila.
+    cache: se usan las consultas de menos de max_age segundos (por defecto el
+    TTL configurado); force_refresh consulta todo igual y actualiza la caché.
+    journal: bitácora del lote (documents debe ser journal.documents); sus
+    resultados definitivos no se vuelven a consultar y cada resultado nuevo
+    se agrega a ella.
+    limits: overrides sobre config.json; si trae todas las claves de
+    DEFAULT_LIMITS (load_limits() ya resuelto en la interfaz) no se lee la
+    configuración desde este hilo.
+    Si se pasa `stats`, se anotan "resumed", "cached" y "queried", y mientras
+    se consulta "in_flight" (límite actual), "rate" (consultas/s) y "eta"
+    (segundos restantes, o None si aún no se puede estimar).
+    Retorna las filas (documento, nombre, estado, ips) en el mismo orden.
+    """
+    if limits is None or any(not limits.get(key) for key in DEFAULT_LIMITS):
+        limits = load_limits(limits)
+    total = len(documents)
+    rows: List[Optional[Row]] = [None] * total
+    if total == 0:
+        return []
+
+    if journal is not None:
+        for idx, row in journal.final_rows().items():
+            rows[idx] = row
+    resumed = sum(1 for row in rows if row is not None)
+
+    try:
+        if cache is not None and not force_refresh:
+            max_age = ttl_seconds() if max_age is None else max_age
+            for idx, document in enumerate(documents):
+                if rows[idx] is None:
+                    rows[idx] = _cached_row(cache, document, max_age)
+                    if rows[idx] is not None and journal is not None:
+                        journal.append(idx, rows[idx])
+        pending = [idx for idx in range(total) if rows[idx] is None]
+        if stats is not None:
+            stats["resumed"] = resumed
+            stats["cached"] = total - len(pending) - resumed
+            stats["queried"] = len(pending)
+
+        _run_queries(client, documents, rows, pending, on_result, limits, cache, journal,
+                     stats if stats is not None else {}, check_cancelled)
+    finally:
+        if journal is not None:
+            journal.close()
+    return rows
+
+
+def _run_queries(
+    client: horus_api.HorusClient,
+    documents: List[str],
+    rows: List[Optional[Row]],
+    pending: List[int],
+    on_result: Optional[Callable[[int, Row, int, int], None]],
+    limits: Dict,
+    cache: Optional[AffiliateCache],
+    journal: Optional[BatchJournal],
+    stats: Dict,
+    check_cancelled: Optional[Callable[[], None]] = None,
+):
+    """Consulta los índices pendientes y reporta cada fila apenas está lista."""
+    total = len(documents)
+
+    def emit(idx: int):
+        nonlocal emitted
+        emitted += 1
+        if on_result:
+            on_result(idx, rows[idx], emitted, total)
+
+    emitted = 0
+    for idx in range(total):
+        if rows[idx] is not None:
+            emit(idx)
+    if not pending:
+        return
+
+    max_in_flight = max(1, int(limits["max_in_flight"]))
+    client.set_pool_size(max_in_flight)
+    bucket = TokenBucket(limits["rate_per_second"], limits["burst"])
+    state = _RunState()
+    # Los hilos son max_in_flight; cuántos consultan a la vez lo decide el control AIMD
+    concurrency = AdaptiveConcurrency(limits["min_in_flight"], max_in_flight, limits["latency_target"])
+    meter = RateMeter()
+    remaining = len(pending)
+    stats.update(in_flight=concurrency.current, rate=0.0, eta=None)
+
+    with ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix="horus") as executor:
+        futures = {
+            executor.submit(_query_with_retries, client, documents[idx], bucket, state, cache, concurrency): idx
+            for idx in pending
+        }
+        # Las consultas terminadas llegan por una cola: mientras no llega ninguna
+        # se revisa cada CANCEL_POLL_SECONDS si se pidió cancelar
+        completed: "queue.Queue" = queue.Queue()
+        for future in futures:
+            future.add_done_callback(completed.put)
+        try:
+            for _ in range(len(futures)):
+                while True:
+                    try:
+                        future = completed.get(timeout=CANCEL_POLL_SECONDS)
+                        break
+                    except queue.Empty:
+                        if check_cancelled:
+                            check_cancelled()
+                idx = futures[future]
+                rows[idx] = future.result()
+                meter.add()
+                remaining -= 1
+                rate = meter.rate()
+                stats.update(in_flight=concurrency.current, rate=rate, eta=remaining / rate if rate else None)
+                if rows[idx] is not None:
+                    if journal is not None:
+                        journal.append(idx, rows[idx])
+                    emit(idx)
+                if check_cancelled:
+                    check_cancelled()
+        except BaseException:
+            state.stop.set()
+            executor.shutdown(wait=True, cancel_futures=True)
+            # Las consultas que estaban en vuelo terminaron: se guardan para reanudar
+            if journal is not None:
+                for future, idx in futures.items():
+                    if rows[idx] is None and future.done() and not future.cancelled() and future.exception() is None:
+                        if future.result() is not None:
+                            journal.append(idx, future.result())
+            raise
@@ -0,0 +1,215 @@
+"""
+Bitácora en disco de una consulta por lotes a Horus (data/horus_batches/).
+
+Los resultados vivían solo en la tabla: si se cerraba la aplicación, vencía
+el token o se caía la red a mitad de 10.000 documentos, se perdía todo. Cada
+lote es un archivo <lote>.jsonl:
+
+  - la primera línea guarda la lista de documentos,
+  - cada consulta terminada agrega una línea {"i": índice, "row": [...]}
+    apenas llega (la última línea de un índice es la que vale),
+  - al reanudar, se vuelven a consultar solo los documentos sin resultado o
+    con un resultado no definitivo (token inválido, desconectado, error de
+    red, "REVISAR (429/5xx)"); los demás salen de la bitácora,
+  - rows() da las filas ya llegadas, en el orden de los documentos.
+
+Se conservan los últimos JOURNAL_KEEP lotes. Un lote que una consulta de
+esta aplicación está usando (claim) no se ofrece para reanudar ni se borra.
+"""
+import json
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from core.config import DATA_DIR
+from core.horus import OVERLOAD_NAMES
+
+
+JOURNAL_DIR = os.path.normpath(os.path.join(DATA_DIR, "horus_batches"))
+JOURNAL_KEEP = 10
+
+Row = Tuple[str, str, str, str]
+
+# Lotes en uso por una consulta en curso: ruta -> ¿sigue en uso?
+_in_use: Dict[str, Callable[[], bool]] = {}
+_in_use_lock = threading.Lock()
+
+# Resultados que no cuentan como terminados (se vuelven a consultar al reanudar)
+_RETRY_NAMES = ("TOKEN INVÁLIDO", "DESCONECTADO")
+_RETRY_PREFIXES = ("ERROR",)
+
+
+def is_final(row: Row) -> bool:
+    """
+    True si el resultado no cambia al volver a consultar (afiliado, "REVISAR
+    (formato inválido)", "REVISAR (404)"...). Un "REVISAR (429)" o "(5xx)"
+    quedó así por saturación de la API y se vuelve a consultar.
+    """
+    name = row[1]
+    return name not in _RETRY_NAMES and name not in OVERLOAD_NAMES and not name.startswith(_RETRY_PREFIXES)
+
+
+class BatchJournal:
+    """Documentos de un lote y los resultados que ya llegaron."""
+
+    def __init__(self, path: str, documents: List[str], created: float):
+        self.path = path
+        self.documents = documents
+        self.created = created
+        self.results: Dict[int, Row] = {}
+        self._file = None
+
+    @property
+    def batch_id(self) -> str:
+        return os.path.basename(self.path)[:-len(".jsonl")]
+
+    # ==================== CREAR / ABRIR ====================
+
+    @classmethod
+    def create(cls, documents: List[str], journal_dir: str = JOURNAL_DIR) -> "BatchJournal":
+        """Nuevo lote con su primera línea ya escrita."""
+        os.makedirs(journal_dir, exist_ok=True)
+        batch_id = time.strftime("%Y%m%d-%H%M%S") + f"-{time.time_ns() % 10**9:09d}"
+        journal = cls(os.path.join(journal_dir, f"{batch_id}.jsonl"), list(documents), time.time())
+        with open(journal.path, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"documents": journal.documents, "created": journal.created}, ensure_ascii=False) + "\n")
+        _prune(journal_dir)
+        return journal
+
+    @classmethod
+    def load(cls, path: str) -> "BatchJournal":
+        """Lee un lote. Una última línea incompleta (cierre a mitad de escritura) se ignora."""
+        with open(path, encoding="utf-8") as f:
+            header = json.loads(f.readline())
+            journal = cls(path, header["documents"], header.get("created", 0.0))
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                    journal.results[int(entry["i"])] = tuple(entry["row"])
+                except (ValueError, KeyError, TypeError):
+                    continue
+        return journal
+
+    # ==================== ESCRITURA ====================
+
+    def append(self, index: int, row: Row):
+        """Agrega un resultado y lo deja en disco antes de seguir."""
+        if self._file is None:
+            self._file = open(self.path, "a", encoding="utf-8")
+            if not _ends_with_newline(self.path):
+                # La última línea quedó cortada (cierre a mitad de escritura)
+                self._file.write("\n")
+        self._file.write(json.dumps({"i": index, "row": list(row)}, ensure_ascii=False) + "\n")
+        self._file.flush()
+        self.results[index] = tuple(row)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def claim(self, in_use: Callable[[], bool]) -> bool:
+        """
+        Marca el lote como en uso mientras in_use() sea True (p. ej. mientras
+        su trabajo esté en cola o en curso): find_unfinished y la limpieza lo
+        saltan. Retorna False si otra consulta ya lo está usando.
+        """
+        key = os.path.abspath(self.path)
+        with _in_use_lock:
+            if _still_in_use(key):
+                return False
+            _in_use[key] = in_use
+            return True
+
+    def discard(self):
+        """Borra el lote (el usuario no quiso reanudarlo)."""
+        self.close()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+    # ==================== CONSULTA ====================
+
+    def final_rows(self) -> Dict[int, Row]:
+        """Resultados definitivos por índice (no se vuelven a consultar)."""
+        return {idx: row for idx, row in self.results.items() if is_final(row)}
+
+    def pending_count(self) -> int:
+        return len(self.documents) - len(self.final_rows())
+
+    def rows(self) -> List[Row]:
+        """Filas para exportar, en el orden de los documentos (las que ya llegaron)."""
+        return [self.results[idx] for idx in range(len(self.documents)) if idx in self.results]
+
+
+def _still_in_use(key: str) -> bool:
+    """Con _in_use_lock tomado: True si la consulta que lo reclamó sigue activa."""
+    check = _in_use.get(key)
+    if check is None:
+        return False
+    if check():
+        return True
+    del _in_use[key]
+    return False
+
+
+def is_in_use(path: str) -> bool:
+    with _in_use_lock:
+        return _still_in_use(os.path.abspath(path))
+
+
+def _ends_with_newline(path: str) -> bool:
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        if f.tell() == 0:
+            return True
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
+
+
+def _batch_paths(journal_dir: str) -> List[str]:
+    try:
+        names = sorted(name for name in os.listdir(journal_dir) if name.endswith(".jsonl"))
+    except OSError:
+        return []
+    return [os.path.join(journal_dir, name) for name in names]
+
+
+def _prune(journal_dir: str):
+    for path in _batch_paths(journal_dir)[:-JOURNAL_KEEP]:
+        if is_in_use(path):
+            continue
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def latest_batch(journal_dir: str = JOURNAL_DIR) -> Optional[BatchJournal]:
+    """El lote más reciente, terminado o no (para exportar desde la bitácora); None si no hay."""
+    paths = _batch_paths(journal_dir)
+    if not paths:
+        return None
+    try:
+        return BatchJournal.load(paths[-1])
+    except (OSError, ValueError, KeyError) as e:
+        print(f"[WARN] No se pudo leer la bitácora '{os.path.basename(paths[-1])}': {e}")
+        return None
+
+
+def find_unfinished(journal_dir: str = JOURNAL_DIR) -> Optional[BatchJournal]:
+    """
+    El lote más reciente que no esté en uso, si le faltan documentos; None si
+    terminó o no hay.
+    """
+    paths = [path for path in _batch_paths(journal_dir) if not is_in_use(path)]
+    if not paths:
+        return None
+    try:
+        journal = BatchJournal.load(paths[-1])
+    except (OSError, ValueError, KeyError) as e:
+        print(f"[WARN] No se pudo leer la bitácora '{os.path.basename(paths[-1])}': {e}")
+        return None
+    return journal if journal.pending_count() else None
@@ -0,0 +1,184 @@
+"""
+Medición por etapas y perfilado.
+
+Las operaciones marcan sus etapas con span():
+
+    with span("save"):
+        doc.save(path, garbage=4, deflate=True)
+
+o con el decorador @timed("read_excel"). Cada etapa acumula cantidad de
+llamadas, tiempo total y máximo (en todo el proceso y por ejecución).
+
+run_scope("Unir PDFs") delimita una ejecución (un trabajo de core.jobs o un
+comando de la CLI). Si el perfilado está activo -variable de entorno
+PDFTOOLS_PROFILE=1 o la opción "profiling" de la configuración- además corre
+cProfile, guarda un .pstats en data/profiles/ e imprime el resumen de etapas.
+"""
+import cProfile
+import functools
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from core.config import DATA_DIR
+
+
+PROFILE_ENV = "PDFTOOLS_PROFILE"
+PROFILE_DIR = os.path.normpath(os.path.join(DATA_DIR, "profiles"))
+
+# Etapas conocidas (se puede usar cualquier nombre)
+STAGES = ("open", "insert_pdf", "delete_pages", "copy", "save", "write_page", "write_copies", "split", "read_excel",
+          "write_excel", "extract_text", "dns_lookup", "http_request")
+
+
+class StageStats:
+    """Acumulado de una etapa."""
+
+    __slots__ = ("count", "total", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, elapsed: float):
+        self.count += 1
+        self.total += elapsed
+        if elapsed > self.max:
+            self.max = elapsed
+
+    def as_dict(self) -> Dict:
+        return {"count": self.count, "total_s": round(self.total, 6), "max_s": round(self.max, 6)}
+
+
+_lock = threading.Lock()
+_stats: Dict[str, StageStats] = {}
+_local = threading.local()           # colectores de run_scope activos en este hilo
+_profiling_setting = False
+_profiler_lock = threading.Lock()     # un solo cProfile activo a la vez
+
+
+# ==================== ETAPAS ====================
+
+def _record(name: str, elapsed: float):
+    with _lock:
+        _stats.setdefault(name, StageStats()).add(elapsed)
+    for collector in getattr(_local, "collectors", ()):
+        collector.setdefault(name, StageStats()).add(elapsed)
+
+
+@contextmanager
+def span(name: str):
+    """Mide el bloque como una llamada de la etapa `name`."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _record(name, time.perf_counter() - start)
+
+
+def timed(name: str):
+    """Decorador: cada llamada a la función cuenta en la etapa `name`."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def snapshot() -> Dict[str, Dict]:
+    """Acumulado de todas las etapas desde el inicio (o desde reset())."""
+    with _lock:
+        return {name: stats.as_dict() for name, stats in _stats.items()}
+
+
+def reset():
+    with _lock:
+        _stats.clear()
+
+
+def format_stats(stats: Dict[str, Dict]) -> str:
+    """Tabla legible, ordenada por tiempo total."""
+    lines = []
+    for name, s in sorted(stats.items(), key=lambda item: -item[1]["total_s"]):
+        avg_ms = s["total_s"] / s["count"] * 1000 if s["count"] else 0
+        lines.append(
+            f"  {name:<14} {s['count']:>7} llamadas  {s['total_s']:9.3f} s  "
+            f"prom {avg_ms:8.2f} ms  máx {s['max_s'] * 1000:8.2f} ms"
+        )
+    return "\n".join(lines)
+
+
+# ==================== PERFILADO ====================
+
+def set_profiling(enabled: bool):
+    """Activa/desactiva el perfilado desde la configuración."""
+    global _profiling_setting
+    _profiling_setting = bool(enabled)
+
+
+def profiling_enabled() -> bool:
+    return _profiling_setting or os.environ.get(PROFILE_ENV, "").strip() not in ("", "0", "false", "no")
+
+
+def _profile_path(label: str) -> str:
+    safe = re.sub(r"[^\w-]+", "_", label).strip("_") or "ejecucion"
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+    return os.path.join(PROFILE_DIR, f"{safe}-{stamp}.pstats")
+
+
+@contextmanager
+def run_scope(label: str, profile: Optional[bool] = None):
+    """
+    Delimita una ejecución. Con perfilado activo (o profile=True) corre cProfile
+    en este hilo, guarda el .pstats y muestra las etapas de esta ejecución.
+    Retorna (en el `as`) el dict de etapas de la ejecución, que se llena al salir.
+    Solo una ejecución a la vez se perfila (desde Python 3.12 no puede haber
+    dos perfiladores activos); las demás corren sin perfil.
+    """
+    stages: Dict[str, StageStats] = {}
+    result: Dict[str, Dict] = {}
+    collectors: List = getattr(_local, "collectors", None) or []
+    _local.collectors = collectors
+    collectors.append(stages)
+
+    enabled = profiling_enabled() if profile is None else profile
+    profiler = None
+    if enabled:
+        if _profiler_lock.acquire(blocking=False):
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:
+                # Otro perfilador activo fuera de run_scope
+                _profiler_lock.release()
+                profiler = None
+        if profiler is None:
+            print(f"[WARN] '{label}' corre sin perfil: ya hay otra ejecución perfilándose")
+    start = time.perf_counter()
+    try:
+        yield result
+    finally:
+        if profiler:
+            profiler.disable()
+            _profiler_lock.release()
+        elapsed = time.perf_counter() - start
+        collectors.remove(stages)
+        result.update({name: s.as_dict() for name, s in stages.items()})
+
+        if profiler:
+            path = _profile_path(label)
+            try:
+                os.makedirs(PROFILE_DIR, exist_ok=True)
+                profiler.dump_stats(path)
+                print(f"[INFO] Perfil de '{label}' ({elapsed:.2f} s): {path}")
+            except OSError as e:
+                print(f"[WARN] No se pudo guardar el perfil: {e}")
+            if result:
+                print(f"[INFO] Etapas de '{label}':\n{format_stats(result)}")
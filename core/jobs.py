@@ -0,0 +1,285 @@
+"""
+Trabajos en segundo plano para las herramientas.
+
+Las herramientas no ejecutan el trabajo pesado (fitz, pandas...) en el hilo de
+la interfaz ni crean sus propios hilos: lo envían al JobRunner, que
+
+  - lo ejecuta en un pool acotado de hilos (los demás trabajos esperan en cola),
+  - permite cancelarlo: job.cancel() marca el trabajo y la siguiente llamada a
+    job.progress() o job.check_cancelled() lanza JobCancelled dentro de él,
+  - envía el progreso a la interfaz con after(), como máximo una vez cada
+    PROGRESS_INTERVAL segundos,
+  - llama on_done / on_error / on_cancel en el hilo de la interfaz.
+
+El trabajo recibe el Job como primer argumento:
+
+    def work(job, pdf_path):
+        return split_pdf_pages(pdf_path, ..., progress_callback=job.progress)
+
+    get_runner().submit(self, work, pdf_path, on_progress=..., on_done=...)
+
+Para trabajos que producen muchos resultados por segundo (p. ej. filas de una
+tabla), UiQueue los junta: los hilos hacen put() y la interfaz los recibe por
+lotes cada UI_QUEUE_INTERVAL_MS, en vez de un after() por resultado.
+"""
+import itertools
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from core.instrumentation import run_scope
+
+
+# Trabajos que corren a la vez; el resto queda en cola
+DEFAULT_MAX_JOBS = 2
+
+# Segundos mínimos entre dos actualizaciones de progreso en la interfaz
+PROGRESS_INTERVAL = 0.1
+
+# Cada cuánto vacía la interfaz una UiQueue, y cuántos elementos entrega por vez
+UI_QUEUE_INTERVAL_MS = 100
+UI_QUEUE_MAX_BATCH = 1000
+
+
+class JobCancelled(Exception):
+    """El trabajo se canceló antes de terminar."""
+
+
+class Job:
+    """Un trabajo enviado al JobRunner. Se usa desde el trabajo y desde la interfaz."""
+
+    QUEUED = "en cola"
+    RUNNING = "en curso"
+    DONE = "terminado"
+    FAILED = "con error"
+    CANCELLED = "cancelado"
+
+    def __init__(self, job_id: int, name: str, widget, on_progress: Optional[Callable[[float], None]] = None):
+        self.id = job_id
+        self.name = name
+        self.state = Job.QUEUED
+        self._widget = widget
+        self._on_progress = on_progress
+        self._cancel_event = threading.Event()
+        self._last_report = 0.0
+        self._pending_fraction: Optional[float] = None
+
+    # ==================== CANCELACIÓN ====================
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel_event.is_set()
+
+    def cancel(self):
+        """Pide cancelar el trabajo; se detiene en su próximo punto de control."""
+        self._cancel_event.set()
+
+    def check_cancelled(self):
+        """Punto de control: lanza JobCancelled si se pidió cancelar."""
+        if self._cancel_event.is_set():
+            raise JobCancelled(f"Trabajo '{self.name}' cancelado.")
+
+    # ==================== COMUNICACIÓN CON LA INTERFAZ ====================
+
+    def progress(self, fraction: float):
+        """
+        Reporta el avance (0..1). Sirve directo como progress_callback de core.
+        Solo llega a la interfaz cada PROGRESS_INTERVAL segundos (y siempre el 100%).
+        """
+        self.check_cancelled()
+        if not self._on_progress:
+            return
+        self._pending_fraction = fraction
+        now = time.monotonic()
+        if fraction >= 1 or now - self._last_report >= PROGRESS_INTERVAL:
+            self._flush_progress(now)
+
+    def _flush_progress(self, now: Optional[float] = None):
+        fraction = self._pending_fraction
+        if fraction is None or not self._on_progress:
+            return
+        self._pending_fraction = None
+        self._last_report = now if now is not None else time.monotonic()
+        self.call_ui(self._on_progress, fraction)
+
+    def call_ui(self, func: Callable, *args):
+        """
+        Ejecuta func(*args) en el hilo de la interfaz. Si la herramienta ya se
+        cerró, no se llama y el trabajo se cancela.
+        """
+        def run():
+            try:
+                alive = self._widget.winfo_exists()
+            except Exception:
+                alive = False
+            if alive:
+                func(*args)
+            else:
+                self.cancel()
+
+        try:
+            self._widget.after(0, run)
+        except Exception:
+            # La aplicación ya se cerró: no hay a quién avisar
+            self.cancel()
+
+
+class JobRunner:
+    """Pool acotado de hilos para los trabajos de las herramientas."""
+
+    def __init__(self, max_workers: int = DEFAULT_MAX_JOBS):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._active: Dict[int, Job] = {}
+
+    def submit(
+        self,
+        widget,
+        func: Callable[..., Any],
+        *args,
+        name: str = "",
+        on_progress: Optional[Callable[[float], None]] = None,
+        on_done: Optional[Callable[[Any], None]] = None,
+        on_error: Optional[Callable[[Exception], None]] = None,
+        on_cancel: Optional[Callable[[], None]] = None,
+        **kwargs,
+    ) -> Job:
+        """
+        Encola func(job, *args, **kwargs). widget es la ventana de la herramienta
+        (se usa su after() para volver al hilo de la interfaz).
+        """
+        job = Job(next(self._ids), name or getattr(func, "__name__", "trabajo"), widget, on_progress)
+        with self._lock:
+            self._active[job.id] = job
+        self._executor.submit(self._run, job, func, args, kwargs, on_done, on_error, on_cancel)
+        return job
+
+    def _run(self, job: Job, func, args, kwargs, on_done, on_error, on_cancel):
+        try:
+            job.check_cancelled()
+            job.state = Job.RUNNING
+            with run_scope(job.name):
+                result = func(job, *args, **kwargs)
+            job._flush_progress()
+            job.state = Job.DONE
+            if on_done:
+                job.call_ui(on_done, result)
+        except JobCancelled:
+            job.state = Job.CANCELLED
+            print(f"[INFO] Trabajo cancelado: {job.name}")
+            if on_cancel:
+                job.call_ui(on_cancel)
+        except Exception as e:
+            job.state = Job.FAILED
+            print(f"[ERROR] Trabajo '{job.name}': {e}")
+            if on_error:
+                job.call_ui(on_error, e)
+        finally:
+            with self._lock:
+                self._active.pop(job.id, None)
+
+    def active_jobs(self) -> List[Job]:
+        """Trabajos en cola o en curso."""
+        with self._lock:
+            return list(self._active.values())
+
+    def cancel_all(self):
+        for job in self.active_jobs():
+            job.cancel()
+
+    def shutdown(self):
+        """Cancela todo y libera el pool (al cerrar la aplicación)."""
+        self.cancel_all()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class UiQueue:
+    """
+    Cola de resultados hacia la interfaz. Los hilos llaman put(); la interfaz
+    la vacía cada interval_ms y llama on_batch(elementos) una vez por vuelta
+    (como máximo max_batch elementos, para no trabar la interfaz).
+    on_tick() se llama en cada vuelta aunque no haya llegado nada (estado que
+    cambia sin resultados nuevos: ritmo, tiempo restante).
+    start() y stop() se llaman desde el hilo de la interfaz.
+    """
+
+    def __init__(
+        self,
+        widget,
+        on_batch: Callable[[List[Any]], None],
+        interval_ms: int = UI_QUEUE_INTERVAL_MS,
+        max_batch: int = UI_QUEUE_MAX_BATCH,
+        on_tick: Optional[Callable[[], None]] = None,
+    ):
+        self._widget = widget
+        self._on_batch = on_batch
+        self._on_tick = on_tick
+        self.interval_ms = interval_ms
+        self.max_batch = max_batch
+        self._items: deque = deque()
+        self._after_id = None
+
+    def put(self, item: Any):
+        """Encola un resultado (desde cualquier hilo)."""
+        self._items.append(item)
+
+    def start(self):
+        if self._after_id is None:
+            self._schedule()
+
+    def stop(self, flush: bool = True):
+        """Deja de vaciar la cola; con flush, entrega antes lo que quedaba."""
+        if self._after_id is not None:
+            try:
+                self._widget.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+        while flush and self._items:
+            self._drain()
+
+    def _schedule(self):
+        try:
+            self._after_id = self._widget.after(self.interval_ms, self._tick)
+        except Exception:
+            # La herramienta ya se cerró
+            self._after_id = None
+
+    def _tick(self):
+        self._after_id = None
+        self._drain()
+        if self._on_tick is not None:
+            self._on_tick()
+        self._schedule()
+
+    def _drain(self):
+        batch = []
+        while self._items and len(batch) < self.max_batch:
+            batch.append(self._items.popleft())
+        if batch:
+            self._on_batch(batch)
+
+
+_runner: Optional[JobRunner] = None
+_runner_lock = threading.Lock()
+
+
+def get_runner() -> JobRunner:
+    """JobRunner compartido por todas las herramientas."""
+    global _runner
+    with _runner_lock:
+        if _runner is None:
+            _runner = JobRunner()
+        return _runner
+
+
+def shutdown_runner():
+    """Cancela los trabajos pendientes si el runner llegó a crearse."""
+    global _runner
+    with _runner_lock:
+        if _runner is not None:
+            _runner.shutdown()
+            _runner = None
@@ -0,0 +1,128 @@
+"""
+Unión de PDFs con memoria acotada.
+
+merge_pdfs arma todo el documento unido en memoria y al final lo guarda con
+garbage=4: con miles de soportes escaneados la memoria crece con el total de
+las entradas. Aquí las entradas se agregan por bloques:
+
+  - se abre una sola entrada a la vez (se cierra apenas se inserta),
+  - cuando lo insertado en el bloque supera memory_limit_mb, el bloque se
+    guarda en un archivo temporal (save incremental: solo se escribe lo nuevo)
+    y el documento se cierra, liberando lo que MuPDF tenía cargado,
+  - al terminar, el temporal se reescribe una vez (sin incrementales, con una
+    sola tabla xref) en la ruta de salida. Los streams se copian sin
+    recomprimir, así que esta pasada tampoco carga todo en memoria.
+
+No se fusionan objetos idénticos entre entradas (eso es garbage=4, que
+necesita tener todo en memoria).
+"""
+import os
+from typing import Callable, List, Optional
+
+import fitz  # PyMuPDF
+
+from core.instrumentation import span
+
+
+# Bytes de entrada que se insertan antes de volcar el bloque a disco
+DEFAULT_MEMORY_LIMIT_MB = 256
+
+
+def total_input_bytes(paths: List[str]) -> int:
+    total = 0
+    for path in paths:
+        try:
+            total += os.path.getsize(path)
+        except OSError:
+            pass
+    return total
+
+
+def merge_pdfs_streaming(
+    paths: List[str],
+    output_path: str,
+    progress_callback: Optional[Callable[[float], None]] = None,
+    memory_limit_mb: int = DEFAULT_MEMORY_LIMIT_MB,
+    errors: Optional[List[str]] = None,
+) -> str:
+    """
+    Une los PDFs en el orden recibido sin tener más de un bloque en memoria.
+    Si se pasa `errors`, las entradas que no se puedan abrir o insertar se
+    omiten y se anota el motivo; si no, el primer error se propaga.
+    El archivo de salida solo aparece si la unión termina bien.
+    """
+    limit = max(1, memory_limit_mb) * 1024 * 1024
+    sizes = [os.path.getsize(p) if os.path.exists(p) else 0 for p in paths]
+    total_bytes = sum(sizes) or 1
+    done_bytes = 0
+
+    partial_path = output_path + ".partial"
+    doc = None
+    started = False          # el temporal ya existe en disco
+    chunk_bytes = 0
+    pages = 0
+
+    def flush():
+        """Guarda el bloque actual en el temporal y libera el documento."""
+        nonlocal doc, started, chunk_bytes
+        if doc is None:
+            return
+        with span("save"):
+            if started:
+                doc.saveIncr()
+            elif doc.page_count:
+                doc.save(partial_path)
+                started = True
+        doc.close()
+        doc = None
+        chunk_bytes = 0
+
+    try:
+        for path, size in zip(paths, sizes):
+            if doc is None:
+                with span("open"):
+                    doc = fitz.open(partial_path) if started else fitz.open()
+
+            try:
+                with span("open"):
+                    src = fitz.open(path)
+                try:
+                    with span("insert_pdf"):
+                        doc.insert_pdf(src)
+                    pages += src.page_count
+                finally:
+                    src.close()
+            except Exception as e:
+                if errors is None:
+                    raise
+                errors.append(f"Error añadiendo '{os.path.basename(path)}': {e}")
+
+            chunk_bytes += size
+            done_bytes += size
+            if chunk_bytes >= limit:
+                flush()
+            if progress_callback:
+                # La reescritura final queda en el último tramo
+                progress_callback(0.95 * done_bytes / total_bytes)
+
+        flush()
+        if pages == 0 or not started:
+            raise ValueError("No se añadieron PDFs válidos.")
+
+        # Una sola xref; garbage=1 quita lo que dejaron los guardados incrementales
+        with span("open"):
+            merged = fitz.open(partial_path)
+        try:
+            with span("save"):
+                merged.save(output_path, garbage=1, deflate=True)
+        finally:
+            merged.close()
+        if progress_callback:
+            progress_callback(1.0)
+    finally:
+        if doc is not None:
+            doc.close()
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+
+    return output_path
@@ -0,0 +1,202 @@
+"""
+Nombres de las páginas a partir de su capa de texto ("Separar Ordenes OPF").
+
+En vez de pegar un nombre por página, se extrae el texto de cada página y se
+busca el documento del paciente o el número de orden con patrones (regex)
+configurables:
+
+  - se prueban en orden; el primero que coincide da el nombre,
+  - el nombre es la concatenación de los grupos capturados (CC + 123456 ->
+    CC123456), o todo el texto coincidente si el patrón no tiene grupos,
+  - las páginas sin coincidencia quedan marcadas como REVISAR_PAG_<n> para que
+    se corrijan a mano (un PDF escaneado sin capa de texto no coincide nunca).
+
+La extracción se reparte entre procesos (cada uno abre el PDF una vez) y el
+texto queda en memoria por archivo: cambiar los patrones y volver a buscar no
+vuelve a leer el PDF.
+"""
+import math
+import multiprocessing
+import os
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, List, Optional, Tuple
+
+import fitz  # PyMuPDF
+
+from core.instrumentation import span
+from core.split_engine import CHUNKS_PER_WORKER, default_workers
+
+
+# Patrones por defecto (si la configuración no define "name_patterns")
+DEFAULT_NAME_PATTERNS = [
+    # Tipo y número de documento: "CC 1234567890", "T.I. 1098765432", "RC: 1122334455"
+    r"\b(CC|TI|RC|CE|PA|PE|PT|MS|AS|CN)\.?\s*(?:No\.?|N°|#)?\s*[:\-]?\s*(\d{5,15})\b",
+    r"\b([CTR])\.([CIE])\.?\s*(?:No\.?|N°|#)?\s*[:\-]?\s*(\d{5,15})\b",
+    # Número de orden: "Orden No. 123456", "N° de orden: 123456"
+    r"(?i)\borden\s*(?:de\s+\w+\s*)?(?:No\.?|N°|#)?\s*[:\-]?\s*(\d{4,})",
+]
+
+# Nombre de las páginas donde ningún patrón coincidió
+UNMATCHED_PREFIX = "REVISAR_PAG_"
+
+# Páginas mínimas para extraer con el pool de procesos
+PARALLEL_MIN_PAGES = 200
+
+# Archivos cuyo texto se conserva en memoria
+TEXT_CACHE_FILES = 4
+
+
+# ==================== EXTRACCIÓN ====================
+
+_worker_doc = None
+
+
+def _init_worker(pdf_path: str):
+    """Abre el PDF una vez por proceso."""
+    global _worker_doc
+    _worker_doc = fitz.open(pdf_path)
+
+
+def _page_texts(doc, start: int, end: int) -> List[str]:
+    return [doc[i].get_text("text") for i in range(start, end)]
+
+
+def _extract_chunk(start: int, end: int) -> Tuple[int, List[str]]:
+    """Tarea del pool: texto de las páginas [start, end)."""
+    return start, _page_texts(_worker_doc, start, end)
+
+
+_text_cache: "OrderedDict[Tuple[str, int, int], List[str]]" = OrderedDict()
+_text_cache_lock = threading.Lock()
+
+
+def extract_page_texts(
+    pdf_path: str,
+    progress_callback: Optional[Callable[[float], None]] = None,
+    max_workers: Optional[int] = None,
+) -> List[str]:
+    """
+    Texto de cada página. Se guarda en memoria por (ruta, tamaño, fecha):
+    la segunda llamada con el mismo archivo no lo vuelve a leer.
+    """
+    st = os.stat(pdf_path)
+    key = (os.path.abspath(pdf_path), st.st_size, st.st_mtime_ns)
+    with _text_cache_lock:
+        cached = _text_cache.get(key)
+        if cached is not None:
+            _text_cache.move_to_end(key)
+    if cached is not None:
+        if progress_callback:
+            progress_callback(1.0)
+        return cached
+
+    with span("extract_text"):
+        texts = _extract_texts(pdf_path, progress_callback, max_workers)
+
+    with _text_cache_lock:
+        _text_cache[key] = texts
+        while len(_text_cache) > TEXT_CACHE_FILES:
+            _text_cache.popitem(last=False)
+    return texts
+
+
+def _extract_texts(pdf_path, progress_callback, max_workers) -> List[str]:
+    with span("open"):
+        doc = fitz.open(pdf_path)
+    try:
+        total = doc.page_count
+        workers = max_workers or default_workers()
+        if total < PARALLEL_MIN_PAGES or workers == 1:
+            texts = []
+            for i in range(total):
+                texts.extend(_page_texts(doc, i, i + 1))
+                if progress_callback:
+                    progress_callback((i + 1) / total)
+            return texts
+    finally:
+        doc.close()
+
+    chunk_size = max(1, math.ceil(total / (workers * CHUNKS_PER_WORKER)))
+    texts: List[Optional[str]] = [None] * total
+    done = 0
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(pdf_path,),
+    ) as executor:
+        futures = [executor.submit(_extract_chunk, start, min(start + chunk_size, total))
+                   for start in range(0, total, chunk_size)]
+        try:
+            for future in as_completed(futures):
+                start, chunk = future.result()
+                texts[start:start + len(chunk)] = chunk
+                done += len(chunk)
+                if progress_callback:
+                    progress_callback(done / total)
+        except BaseException:
+            # Cancelación (o error): no empezar los bloques que faltan
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+    return texts
+
+
+# ==================== NOMBRES ====================
+
+def compile_patterns(patterns: List[str]) -> List["re.Pattern"]:
+    """Compila los patrones; un patrón inválido es un ValueError con su texto."""
+    compiled = []
+    for pattern in patterns:
+        try:
+            compiled.append(re.compile(pattern))
+        except re.error as e:
+            raise ValueError(f"Patrón inválido: {pattern}\n{e}")
+    if not compiled:
+        raise ValueError("No hay patrones para buscar los nombres.")
+    return compiled
+
+
+def name_from_text(text: str, compiled: List["re.Pattern"]) -> Optional[str]:
+    """Nombre de una página según el primer patrón que coincide, o None."""
+    for regex in compiled:
+        match = regex.search(text)
+        if match:
+            groups = [g for g in match.groups() if g]
+            name = "".join(groups) if groups else match.group(0)
+            name = re.sub(r"\s+", "", name)
+            if name:
+                return name
+    return None
+
+
+def auto_names(
+    pdf_path: str,
+    patterns: Optional[List[str]] = None,
+    progress_callback: Optional[Callable[[float], None]] = None,
+    max_workers: Optional[int] = None,
+) -> Tuple[List[str], List[int]]:
+    """
+    Un nombre por página a partir del texto. Retorna (nombres, páginas sin
+    coincidencia 0-based); esas páginas se llaman UNMATCHED_PREFIX + número.
+    """
+    compiled = compile_patterns(patterns or DEFAULT_NAME_PATTERNS)
+    texts = extract_page_texts(pdf_path, progress_callback, max_workers)
+
+    names: List[str] = []
+    unmatched: List[int] = []
+    width = max(4, len(str(len(texts))))
+    for i, text in enumerate(texts):
+        name = name_from_text(text, compiled)
+        if name is None:
+            unmatched.append(i)
+            name = f"{UNMATCHED_PREFIX}{i + 1:0{width}d}"
+        names.append(name)
+    return names, unmatched
+
+
+def unmatched_names(names: List[str]) -> List[str]:
+    """Nombres que siguen marcados como "revisar"."""
+    return [name for name in names if name.startswith(UNMATCHED_PREFIX)]
@@ -0,0 +1,214 @@
+"""
+Escritura de páginas sueltas copiando objetos del PDF original tal cual.
+
+insert_pdf + save(garbage=4, deflate=True) vuelve a recorrer y comprimir las
+fuentes e imágenes compartidas una vez por cada página. Aquí se calcula el
+cierre de objetos de cada página (todo lo que la página referencia, sin
+seguir /Parent ni otras páginas), se leen los streams ya comprimidos con
+xref_stream_raw y se escriben sin tocarlos. Los objetos leídos se guardan en
+caché; los streams, a partir de la segunda página que los usa (recursos
+compartidos), para no guardar imágenes que solo aparecen una vez.
+"""
+import re
+from typing import Dict, List, Optional, Tuple
+
+import fitz  # PyMuPDF
+
+
+# Atributos que una página puede heredar del árbol /Pages
+INHERITABLE_KEYS = ("Resources", "MediaBox", "CropBox", "Rotate")
+
+# Límite de bytes de streams en caché (el texto de los objetos siempre se guarda)
+STREAM_CACHE_BYTES = 128 * 1024 * 1024
+
+_REF_RE = re.compile(r"(\d+)\s+(\d+)\s+R\b")
+_PARENT_RE = re.compile(r"/Parent\s*\d+\s+\d+\s+R")
+_LENGTH_RE = re.compile(r"/Length\s+\d+(?:\s+\d+\s+R)?(?!\d)")
+
+
+class SinglePassPageWriter:
+    """
+    Escribe páginas de un documento abierto como PDFs independientes.
+    Usar una instancia por documento y recorrer las páginas en orden.
+    """
+
+    def __init__(self, doc: fitz.Document):
+        if not doc.is_pdf or doc.is_encrypted or doc.needs_pass:
+            raise ValueError("El documento no admite copia directa de objetos.")
+        self.doc = doc
+        # xref -> (segmentos de texto entre referencias, refs, es stream)
+        self._objects: Dict[int, Tuple[List[bytes], List[int], bool]] = {}
+        # xref -> stream comprimido original (solo los compartidos)
+        self._streams: Dict[int, bytes] = {}
+        self._stream_bytes = 0
+        self._streams_seen = set()
+        self._tree_nodes: Dict[int, bool] = {}
+        self._inherited: Dict[Tuple[int, str], Optional[str]] = {}
+        self._page_xrefs = {self.doc.page_xref(i) for i in range(self.doc.page_count)}
+
+    # ==================== LECTURA (con caché) ====================
+
+    def _is_tree_node(self, xref: int) -> bool:
+        """True para páginas, nodos /Pages y el catálogo (no se copian)."""
+        if xref in self._page_xrefs:
+            return True
+        cached = self._tree_nodes.get(xref)
+        if cached is None:
+            kind, value = self.doc.xref_get_key(xref, "Type")
+            cached = kind == "name" and value in ("/Page", "/Pages", "/Catalog")
+            self._tree_nodes[xref] = cached
+        return cached
+
+    def _read_object(self, xref: int) -> Tuple[List[bytes], List[int], bool]:
+        """
+        Lee el objeto una sola vez y lo separa en segmentos alrededor de cada
+        referencia, así renumerarlo en cada archivo es solo un join.
+        """
+        cached = self._objects.get(xref)
+        if cached is not None:
+            return cached
+
+        text = self.doc.xref_object(xref, compressed=True)
+        is_stream = self.doc.xref_is_stream(xref)
+        if is_stream:
+            # /Length puede ser indirecto; se reemplaza al escribir
+            text = _LENGTH_RE.sub("", text).rstrip()
+        entry = self._split_refs(text) + (is_stream,)
+        self._objects[xref] = entry
+        return entry
+
+    @staticmethod
+    def _split_refs(text: str) -> Tuple[List[bytes], List[int]]:
+        segments: List[bytes] = []
+        refs: List[int] = []
+        last = 0
+        for m in _REF_RE.finditer(text):
+            segments.append(text[last:m.start()].encode("latin-1"))
+            refs.append(int(m.group(1)))
+            last = m.end()
+        segments.append(text[last:].encode("latin-1"))
+        return segments, refs
+
+    def _read_stream(self, xref: int) -> bytes:
+        raw = self._streams.get(xref)
+        if raw is not None:
+            return raw
+        raw = self.doc.xref_stream_raw(xref) or b""
+        if xref not in self._streams_seen:
+            self._streams_seen.add(xref)
+        elif self._stream_bytes + len(raw) <= STREAM_CACHE_BYTES:
+            self._streams[xref] = raw
+            self._stream_bytes += len(raw)
+        return raw
+
+    def _inherited_value(self, node: int, key: str) -> Optional[str]:
+        """Valor de `key` en el nodo /Pages `node` o en sus ancestros."""
+        cache_key = (node, key)
+        if cache_key not in self._inherited:
+            kind, value = self.doc.xref_get_key(node, key)
+            if kind != "null":
+                result = value
+            else:
+                kind, parent = self.doc.xref_get_key(node, "Parent")
+                result = self._inherited_value(int(parent.split()[0]), key) if kind == "xref" else None
+            self._inherited[cache_key] = result
+        return self._inherited[cache_key]
+
+    def _page_dict(self, page_index: int) -> str:
+        """Diccionario de la página sin /Parent y con los atributos heredados."""
+        page_xref = self.doc.page_xref(page_index)
+        text = _PARENT_RE.sub("", self.doc.xref_object(page_xref, compressed=True))
+
+        extra = []
+        kind, parent = self.doc.xref_get_key(page_xref, "Parent")
+        if kind == "xref":
+            parent_xref = int(parent.split()[0])
+            for key in INHERITABLE_KEYS:
+                if f"/{key}" in text:
+                    continue
+                value = self._inherited_value(parent_xref, key)
+                if value is not None:
+                    extra.append(f"/{key} {value}")
+
+        if "MediaBox" not in text and not any(e.startswith("/MediaBox") for e in extra):
+            r = self.doc[page_index].mediabox
+            extra.append(f"/MediaBox[{r.x0:g} {r.y0:g} {r.x1:g} {r.y1:g}]")
+
+        body = text.rstrip()
+        if not body.endswith(">>"):
+            raise ValueError(f"Objeto de página inesperado (xref {page_xref}).")
+        return body[:-2] + "".join(extra) + ">>"
+
+    # ==================== ESCRITURA ====================
+
+    def write_page(self, page_index: int, out_path: str):
+        """Escribe la página page_index como un PDF nuevo en out_path."""
+        page_xref = self.doc.page_xref(page_index)
+        page_text = self._page_dict(page_index)
+
+        page_segments, page_refs = self._split_refs(page_text)
+
+        # Numeración de salida: 1 catálogo, 2 árbol de páginas, 3 página
+        mapping: Dict[int, Optional[int]] = {page_xref: 3}
+        order: List[int] = []
+        pending = list(page_refs)
+        xref_limit = self.doc.xref_length()
+        while pending:
+            xref = pending.pop()
+            if xref in mapping or xref <= 0 or xref >= xref_limit:
+                continue
+            if self._is_tree_node(xref):
+                # Otras páginas (p. ej. destinos de enlaces) no se copian
+                mapping[xref] = None
+                continue
+            mapping[xref] = len(order) + 4
+            order.append(xref)
+            pending.extend(self._read_object(xref)[1])
+
+        def renumber(segments: List[bytes], refs: List[int]) -> bytes:
+            if not refs:
+                return segments[0]
+            out = [segments[0]]
+            for ref, segment in zip(refs, segments[1:]):
+                new = mapping.get(ref)
+                out.append(b"%d 0 R" % new if new else b"null")
+                out.append(segment)
+            return b"".join(out)
+
+        chunks: List[bytes] = [b"%PDF-1.7\n%\xe2\xe3\xcf\xd3\n"]
+        offsets: List[int] = []
+        size = len(chunks[0])
+
+        def emit(num: int, body: bytes, stream: Optional[bytes] = None):
+            # Los streams se agregan como bloques aparte (sin copiarlos)
+            nonlocal size
+            offsets.append(size)
+            if stream is None:
+                parts = (b"%d 0 obj\n%s\nendobj\n" % (num, body),)
+            else:
+                parts = (b"%d 0 obj\n%s\nstream\n" % (num, body), stream, b"\nendstream\nendobj\n")
+            chunks.extend(parts)
+            size += sum(len(part) for part in parts)
+
+        emit(1, b"<</Type/Catalog/Pages 2 0 R>>")
+        emit(2, b"<</Type/Pages/Count 1/Kids[3 0 R]>>")
+        emit(3, renumber(page_segments, page_refs)[:-2] + b"/Parent 2 0 R>>")
+
+        for xref in order:
+            segments, refs, is_stream = self._read_object(xref)
+            body = renumber(segments, refs)
+            if is_stream:
+                raw = self._read_stream(xref)
+                emit(mapping[xref], body[:-2] + b"/Length %d>>" % len(raw), raw)
+            else:
+                emit(mapping[xref], body)
+
+        count = len(offsets) + 1
+        xref_table = [b"xref\n0 %d\n0000000000 65535 f \n" % count]
+        xref_table.extend(b"%010d 00000 n \n" % off for off in offsets)
+        trailer = b"trailer\n<</Size %d/Root 1 0 R>>\nstartxref\n%d\n%%%%EOF\n" % (count, size)
+
+        with open(out_path, "wb") as f:
+            f.writelines(chunks)
+            f.writelines(xref_table)
+            f.write(trailer)
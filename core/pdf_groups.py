@@ -0,0 +1,427 @@
+"""
+Agrupación y unión de PDFs por prefijo (herramienta "Unir grupos de PDFs").
+Sin dependencias de la interfaz gráfica.
+
+Cada unión deja un manifiesto en Grupos/.deshacer/<lote>.jsonl (una línea
+por grupo: PDF creado y de dónde a dónde se movió cada original). Deshacer
+repite exactamente ese manifiesto, sin recorrer la carpeta Grupos. Un lote es
+una unión individual o un "Unir todos"; se conservan los últimos UNDO_LEVELS.
+"""
+import json
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple, Optional
+
+import fitz  # PyMuPDF
+
+from core.folder_index import find_folder_index, get_folder_index, natural_key
+from core.instrumentation import span
+from core.merge_engine import DEFAULT_MEMORY_LIMIT_MB, merge_pdfs_streaming, total_input_bytes
+from core.save_profiles import save_pdf
+from core.split_engine import default_workers
+
+
+# Grupos mínimos para unir con el pool de procesos
+PARALLEL_MIN_GROUPS = 4
+
+# Carpeta de manifiestos (dentro de Grupos) y lotes que se pueden deshacer
+MANIFEST_DIR = ".deshacer"
+UNDO_LEVELS = 20
+
+
+# ==================== UTILIDADES ====================
+
+def create_unique_name(path: Path) -> Path:
+    """Si la ruta existe, añade sufijo _1, _2..."""
+    if not path.exists():
+        return path
+    base = path.stem
+    ext = path.suffix
+    parent = path.parent
+    i = 1
+    while True:
+        candidate = parent / f"{base}_{i}{ext}"
+        if not candidate.exists():
+            return candidate
+        i += 1
+
+
+def get_groups_case_sensitive(folder: str, force: bool = False) -> Dict[str, List[str]]:
+    """
+    Agrupa PDFs por prefijo. Solo grupos con más de 1 PDF.
+    Usa el índice de la carpeta (core.folder_index): si la carpeta no cambió
+    no se vuelve a listar; force=True la vuelve a leer completa.
+    """
+    index = get_folder_index(folder)
+    index.refresh(force=force)
+    return index.groups()
+
+
+def _index_changed(folder, removed: List[str] = (), added: List[str] = ()):
+    """Avisa al índice de la carpeta (si existe) lo que se movió o creó."""
+    index = find_folder_index(str(folder))
+    if index is not None:
+        index.apply_changes(removed, added)
+
+
+# ==================== OPERACIONES PDF ====================
+
+def merge_pdfs_from_paths(
+    paths: List[Path],
+    output_path: Path,
+    memory_limit_mb: int = DEFAULT_MEMORY_LIMIT_MB,
+    save_profile: Optional[str] = None,
+) -> List[str]:
+    """
+    Une los PDFs usando fitz. Si el grupo pesa más de memory_limit_mb se une
+    por bloques (core.merge_engine) para no cargarlo entero en memoria.
+    """
+    errors: List[str] = []
+    paths_sorted = sorted(paths, key=lambda p: natural_key(p.name))
+    str_paths = [str(p) for p in paths_sorted]
+
+    if total_input_bytes(str_paths) > memory_limit_mb * 1024 * 1024:
+        try:
+            merge_pdfs_streaming(str_paths, str(output_path), memory_limit_mb=memory_limit_mb, errors=errors)
+        except ValueError as e:
+            errors.append(str(e))
+        except Exception as e:
+            errors.append(f"Error escribiendo '{output_path.name}': {e}")
+        return errors
+
+    try:
+        merged_doc = fitz.open()
+
+        for p in paths_sorted:
+            try:
+                with span("open"):
+                    src_doc = fitz.open(str(p))
+                with span("insert_pdf"):
+                    merged_doc.insert_pdf(src_doc)
+                src_doc.close()
+            except Exception as e:
+                errors.append(f"Error añadiendo '{p.name}': {e}")
+
+        if merged_doc.page_count == 0:
+            merged_doc.close()
+            errors.append("No se añadieron PDFs válidos.")
+            return errors
+
+        save_pdf(merged_doc, str(output_path), save_profile)
+        merged_doc.close()
+
+    except Exception as e:
+        errors.append(f"Error escribiendo '{output_path.name}': {e}")
+
+    return errors
+
+
+def _partial_output(folder_path: Path, key: str) -> Path:
+    """
+    Archivo temporal de la unión (no termina en .pdf: no aparece como grupo).
+    Se crea con un nombre único: en Windows "ABC" y "abc" son grupos
+    distintos pero el mismo archivo, y se unen a la vez en el pool.
+    """
+    fd, path = tempfile.mkstemp(prefix=f"{key}.", suffix=".pdf.uniendo", dir=folder_path)
+    os.close(fd)
+    return Path(path)
+
+
+def _discard(path: Path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _merge_group_to_partial(folder: str, files: List[str], partial: str, save_profile: Optional[str]) -> List[str]:
+    """
+    Une el grupo en el archivo temporal sin mover nada (también es la tarea
+    del pool de procesos). Retorna los errores; sin errores la unión está completa.
+    """
+    folder_path = Path(folder)
+    missing = [f"No existe: {name}" for name in files if not (folder_path / name).exists()]
+    if missing:
+        return missing
+    return merge_pdfs_from_paths([folder_path / name for name in files], Path(partial), save_profile=save_profile)
+
+
+def _commit_group(
+    folder_path: Path, key: str, files: List[str], partial: Path, batch: str
+) -> Tuple[bool, List[str], Optional[Path]]:
+    """
+    Tras una unión correcta: mueve los originales a Grupos y deja el PDF unido
+    con su nombre. Si algo falla, los originales vuelven a su lugar.
+    """
+    errors: List[str] = []
+    group_dir = folder_path / "Grupos"
+    moved: List[Tuple[Path, Path]] = []
+
+    def rollback():
+        for src, dst in reversed(moved):
+            try:
+                shutil.move(str(dst), str(src))
+            except Exception as e:
+                errors.append(f"Error restaurando '{src.name}': {e}")
+        _discard(partial)
+        return False, errors, None
+
+    try:
+        group_dir.mkdir(parents=True, exist_ok=True)
+    except OSError as e:
+        errors.append(f"No se pudo crear '{group_dir}': {e}")
+        return rollback()
+
+    for name in files:
+        src = folder_path / name
+        dst = create_unique_name(group_dir / name)
+        try:
+            shutil.move(str(src), str(dst))
+            moved.append((src, dst))
+        except Exception as e:
+            errors.append(f"Error moviendo '{name}': {e}")
+            return rollback()
+
+    # El nombre se elige después de mover: key.pdf puede ser uno de los originales
+    output = create_unique_name(folder_path / f"{key}.pdf")
+    try:
+        os.replace(partial, output)
+    except OSError as e:
+        errors.append(f"Error escribiendo '{output.name}': {e}")
+        return rollback()
+
+    _index_changed(folder_path, removed=files, added=[output.name])
+    _append_manifest(folder_path, batch, {
+        "key": key,
+        "output": output.name,
+        "moved": [[src.name, dst.name] for src, dst in moved],
+    })
+    return True, errors, output
+
+
+def merge_group_and_move(
+    folder: str,
+    key: str,
+    files: List[str],
+    save_profile: Optional[str] = None,
+    batch: Optional[str] = None,
+) -> Tuple[bool, List[str], Optional[Path]]:
+    """
+    Une un grupo y mueve originales. Los originales solo se mueven a Grupos
+    si la unión terminó sin errores; si no, la carpeta queda como estaba.
+    batch: lote de deshacer al que se agrega (por defecto, uno nuevo).
+    Retorna (success, errors, output_path)
+    """
+    folder_path = Path(folder)
+    try:
+        partial = _partial_output(folder_path, key)
+    except OSError as e:
+        return False, [f"No se pudo crear el temporal de '{key}': {e}"], None
+    errors = _merge_group_to_partial(folder, files, str(partial), save_profile)
+    if errors:
+        _discard(partial)
+        return False, errors, None
+    return _commit_group(folder_path, key, files, partial, batch or new_batch_id())
+
+
+def merge_groups(
+    folder: str,
+    groups: Dict[str, List[str]],
+    save_profile: Optional[str] = None,
+    progress_callback: Optional[Callable[[float], None]] = None,
+    on_group_done: Optional[Callable[[str, bool, List[str], Optional[Path]], None]] = None,
+    max_workers: Optional[int] = None,
+) -> Dict[str, Tuple[bool, List[str], Optional[Path]]]:
+    """
+    Une varios grupos. Cada grupo es independiente: las uniones se reparten
+    entre procesos y, a medida que terminan, este hilo mueve los originales
+    (solo de las uniones correctas) y llama on_group_done(key, success,
+    errors, output_path). Todos los grupos quedan en un mismo lote de deshacer.
+    Retorna {key: (success, errors, output_path)}.
+    """
+    folder_path = Path(folder)
+    batch = new_batch_id()
+    total = len(groups)
+    results: Dict[str, Tuple[bool, List[str], Optional[Path]]] = {}
+
+    def finish(key: str, result: Tuple[bool, List[str], Optional[Path]]):
+        results[key] = result
+        if on_group_done:
+            on_group_done(key, *result)
+        if progress_callback:
+            progress_callback(len(results) / total)
+
+    workers = min(max_workers or default_workers(), total)
+    if total < PARALLEL_MIN_GROUPS or workers <= 1:
+        for key, files in groups.items():
+            finish(key, merge_group_and_move(folder, key, files, save_profile=save_profile, batch=batch))
+        return results
+
+    partials = {}
+    try:
+        for key in groups:
+            partials[key] = _partial_output(folder_path, key)
+    except OSError:
+        for partial in partials.values():
+            _discard(partial)
+        raise
+    with span("merge_pool"), ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+    ) as executor:
+        futures = {
+            executor.submit(_merge_group_to_partial, folder, files, str(partials[key]), save_profile): key
+            for key, files in groups.items()
+        }
+        try:
+            for future in as_completed(futures):
+                key = futures[future]
+                try:
+                    errors = future.result()
+                except Exception as e:
+                    errors = [f"Error uniendo '{key}': {e}"]
+                if errors:
+                    _discard(partials[key])
+                    finish(key, (False, errors, None))
+                else:
+                    finish(key, _commit_group(folder_path, key, groups[key], partials[key], batch))
+        except BaseException:
+            # Cancelación: se esperan las uniones en curso y se descartan sus
+            # temporales; los originales de esos grupos no se tocaron
+            executor.shutdown(wait=True, cancel_futures=True)
+            for key, partial in partials.items():
+                if key not in results:
+                    _discard(partial)
+            raise
+
+    return results
+
+
+# ==================== DESHACER ====================
+
+def new_batch_id() -> str:
+    """Identificador de lote; el orden alfabético es el cronológico."""
+    return time.strftime("%Y%m%d-%H%M%S") + f"-{time.time_ns() % 10**9:09d}"
+
+
+def _manifest_dir(folder_path: Path) -> Path:
+    return folder_path / "Grupos" / MANIFEST_DIR
+
+
+def _append_manifest(folder_path: Path, batch: str, entry: Dict):
+    """Agrega un grupo al manifiesto del lote (y recorta los lotes más viejos)."""
+    manifest_dir = _manifest_dir(folder_path)
+    path = manifest_dir / f"{batch}.jsonl"
+    try:
+        manifest_dir.mkdir(parents=True, exist_ok=True)
+        is_new = not path.exists()
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    except OSError as e:
+        print(f"[WARN] No se pudo guardar el manifiesto de '{entry['key']}' (no se podrá deshacer): {e}")
+        return
+    if is_new:
+        for old in undo_batches(str(folder_path))[:-UNDO_LEVELS]:
+            _discard(manifest_dir / f"{old}.jsonl")
+
+
+def undo_batches(folder: str) -> List[str]:
+    """Lotes que se pueden deshacer, del más antiguo al más reciente."""
+    try:
+        names = os.listdir(_manifest_dir(Path(folder)))
+    except OSError:
+        return []
+    return sorted(name[:-len(".jsonl")] for name in names if name.endswith(".jsonl"))
+
+
+def read_batch(folder: str, batch: str) -> List[Dict]:
+    """Grupos del lote, en el orden en que se unieron."""
+    path = _manifest_dir(Path(folder)) / f"{batch}.jsonl"
+    entries = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                entries.append(json.loads(line))
+    return entries
+
+
+def _undo_entry(folder_path: Path, entry: Dict) -> Tuple[Optional[Dict], List[str]]:
+    """
+    Deshace un grupo del manifiesto: elimina el PDF unido y devuelve cada
+    original a su nombre. Retorna (lo que quedó pendiente o None, errores).
+    """
+    errors: List[str] = []
+    group_dir = folder_path / "Grupos"
+
+    output = entry.get("output")
+    if output:
+        output_file = folder_path / output
+        if output_file.exists():
+            try:
+                os.remove(output_file)
+                _index_changed(folder_path, removed=[output])
+            except Exception as e:
+                errors.append(f"No se pudo eliminar '{output}': {e}")
+                return entry, errors
+
+    pending = []
+    restored = []
+    for original, moved in entry.get("moved", []):
+        src = group_dir / moved
+        if not src.exists():
+            errors.append(f"No existe en Grupos: {moved}")
+            continue
+        dst = create_unique_name(folder_path / original)
+        try:
+            shutil.move(str(src), str(dst))
+            restored.append(dst.name)
+        except Exception as e:
+            errors.append(f"Error restaurando '{moved}': {e}")
+            pending.append([original, moved])
+    _index_changed(folder_path, added=restored)
+
+    if pending:
+        return {"key": entry.get("key"), "output": None, "moved": pending}, errors
+    return None, errors
+
+
+def undo_batch(folder: str, batch: str) -> Tuple[int, List[str]]:
+    """
+    Deshace un lote con su manifiesto (solo los archivos de esos grupos).
+    Si algo queda pendiente, el manifiesto se reescribe con eso para poder
+    reintentar. Retorna (grupos restaurados, errores).
+    """
+    folder_path = Path(folder)
+    path = _manifest_dir(folder_path) / f"{batch}.jsonl"
+    try:
+        entries = read_batch(folder, batch)
+    except (OSError, ValueError) as e:
+        return 0, [f"No se pudo leer el manifiesto '{path.name}': {e}"]
+
+    restored = 0
+    errors: List[str] = []
+    pending: List[Dict] = []
+    for entry in reversed(entries):
+        left, entry_errors = _undo_entry(folder_path, entry)
+        errors.extend(f"{entry.get('key')}: {error}" for error in entry_errors)
+        if left is None and not entry_errors:
+            restored += 1
+        elif left is not None:
+            pending.append(left)
+
+    try:
+        if pending:
+            with open(path, "w", encoding="utf-8") as f:
+                for entry in reversed(pending):
+                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        else:
+            os.remove(path)
+    except OSError as e:
+        errors.append(f"No se pudo actualizar el manifiesto '{path.name}': {e}")
+    return restored, errors
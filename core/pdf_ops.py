@@ -0,0 +1,493 @@
+"""
+Operaciones PDF sin interfaz gráfica.
+Las usan tanto las herramientas (ventanas customtkinter) como la línea de comandos.
+"""
+import io
+import os
+import re
+import shutil
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional, Tuple
+
+import fitz  # PyMuPDF
+
+from core.copy_writer import DEFAULT_COPY_MODE, DEFAULT_WRITE_WORKERS, write_copies
+from core.instrumentation import span
+from core.merge_engine import DEFAULT_MEMORY_LIMIT_MB, merge_pdfs_streaming, total_input_bytes
+from core.save_profiles import page_save_options, save_pdf
+from core.split_engine import run_split_plan
+
+
+# ==================== UTILIDADES ====================
+
+def clean_filename(name: str) -> str:
+    """Elimina caracteres no permitidos en nombres de archivo."""
+    return re.sub(r'[\\/*?:"<>|]', "", name)
+
+
+def create_unique_path(base_path: str, start: int = 2, existing_paths: Optional[Iterable[str]] = None) -> str:
+    """
+    Crea una ruta única si el archivo ya existe: 'nombre (2).pdf', 'nombre (3).pdf'...
+    existing_paths: rutas ya reservadas en la misma operación (aún sin escribir).
+    """
+    if not isinstance(existing_paths, (set, frozenset)):
+        existing_paths = set(existing_paths or [])
+    if not os.path.exists(base_path) and base_path not in existing_paths:
+        return base_path
+
+    base, ext = os.path.splitext(base_path)
+    counter = start
+
+    while True:
+        new_path = f"{base} ({counter}){ext}"
+        if not os.path.exists(new_path) and new_path not in existing_paths:
+            return new_path
+        counter += 1
+
+
+def ensure_unique_filename(path: str, existing_paths: Optional[Iterable[str]] = None) -> str:
+    """
+    Igual que create_unique_path pero empezando en (1) y evitando también
+    las rutas ya generadas en la misma operación (existing_paths).
+    """
+    if not isinstance(existing_paths, (set, frozenset)):
+        existing_paths = set(existing_paths or [])
+    base, ext = os.path.splitext(path)
+    candidate = path
+    counter = 1
+    while os.path.exists(candidate) or candidate in existing_paths:
+        candidate = f"{base} ({counter}){ext}"
+        counter += 1
+    return candidate
+
+
+def parse_page_ranges(ranges: str, max_page: int) -> Optional[List[int]]:
+    """
+    Parsea un string de rangos como "1-3,5,7-9" a lista de índices 0-based.
+    Retorna None si hay error o índices fuera de límites.
+    """
+    if not ranges.strip():
+        return list(range(max_page))
+
+    page_nums = set()
+    token_re = re.compile(r"^\s*(\d+)(?:\s*-\s*(\d+))?\s*$")
+
+    for part in ranges.split(","):
+        part = part.strip()
+        if not part:
+            continue
+
+        match = token_re.match(part)
+        if not match:
+            return None
+
+        start = int(match.group(1))
+        end = int(match.group(2)) if match.group(2) else start
+
+        if start < 1 or end < start:
+            return None
+
+        for p in range(start - 1, end):
+            if p < 0 or p >= max_page:
+                return None
+            page_nums.add(p)
+
+    return sorted(page_nums)
+
+
+def get_page_count(pdf_path: str) -> int:
+    """Retorna el número de páginas del PDF."""
+    with span("open"):
+        doc = fitz.open(pdf_path)
+    try:
+        return doc.page_count
+    finally:
+        doc.close()
+
+
+# ==================== DIVIDIR (una página por archivo) ====================
+
+def splitter_page_name(index: int, names: Optional[List[str]] = None, prefix: str = "") -> str:
+    """
+    Nombre (sin extensión) de la página `index` según las reglas de "Dividir PDF":
+    sin nombres -> 'Página_N'; con nombres -> 'PREFIJO_nombre'.
+    """
+    if names is not None and index < len(names):
+        body = names[index].strip()
+        # si el usuario pegó el prefijo dentro del nombre, se quita
+        if body and "_" in body and body.split("_", 1)[0] == prefix:
+            body = body.split("_", 1)[1]
+        final_name = f"{prefix}_{body}" if prefix else body
+    else:
+        final_name = f"Página_{index + 1}"
+
+    safe_name = "".join(ch for ch in final_name if ch not in r'\/:*?"<>|').strip()
+    if not safe_name:
+        safe_name = f"Página_{index + 1}"
+    return safe_name
+
+
+def split_pdf_pages(
+    pdf_path: str,
+    output_dir: str,
+    names: Optional[List[str]] = None,
+    prefix: str = "",
+    progress_callback: Optional[Callable[[float], None]] = None,
+    max_workers: Optional[int] = None,
+    single_pass: bool = True,
+    save_profile: Optional[str] = None,
+) -> List[str]:
+    """
+    Divide el PDF en un archivo por página (herramienta "Dividir PDF").
+    Retorna la lista de archivos creados en orden de página.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    num_pages = get_page_count(pdf_path)
+
+    # Nombres calculados antes de escribir (mismo resultado que en serie)
+    plan = []
+    reserved = set()
+    for i in range(num_pages):
+        safe_name = splitter_page_name(i, names, prefix)
+        intended = os.path.join(output_dir, f"{safe_name}.pdf")
+        out_filename = ensure_unique_filename(intended, existing_paths=reserved)
+        reserved.add(out_filename)
+        plan.append((i, out_filename))
+
+    results = run_split_plan(
+        pdf_path, plan,
+        save_kwargs=page_save_options(save_profile),
+        progress_callback=progress_callback,
+        max_workers=max_workers,
+        single_pass=single_pass,
+    )
+    return _collect_created(results)
+
+
+def _collect_created(results) -> List[str]:
+    """Lista de archivos creados; si alguna página falló, lanza RuntimeError."""
+    created_files: List[str] = []
+    failed = []
+    for page_idx, out_path, error in results:
+        if error:
+            print(f"[ERROR] Página {page_idx + 1}: {error}")
+            failed.append(page_idx + 1)
+        else:
+            created_files.append(out_path)
+            print(f"[INFO] Creado: {out_path}")
+
+    if failed:
+        raise RuntimeError(
+            f"No se pudieron escribir {len(failed)} página(s): {', '.join(map(str, failed[:20]))}"
+        )
+    return created_files
+
+
+def split_pdf_by_names(
+    pdf_path: str,
+    output_dir: str,
+    names: List[str],
+    prefix: str = "",
+    progress_callback: Optional[Callable[[float], None]] = None,
+    max_workers: Optional[int] = None,
+    single_pass: bool = True,
+    save_profile: Optional[str] = None,
+) -> List[str]:
+    """
+    Divide el PDF y nombra cada página con PREFIJO + nombre (herramienta "Separar Ordenes OPF").
+    La cantidad de nombres debe coincidir con las páginas.
+    """
+    num_pages = get_page_count(pdf_path)
+    if len(names) != num_pages:
+        raise ValueError(
+            f"La cantidad de nombres ({len(names)}) no coincide con las páginas del PDF ({num_pages})."
+        )
+
+    os.makedirs(output_dir, exist_ok=True)
+
+    plan = []
+    reserved = set()
+    for i, name in enumerate(names):
+        file_name = f"{prefix}{clean_filename(name)}.pdf"
+        file_path = create_unique_path(os.path.join(output_dir, file_name), existing_paths=reserved)
+        reserved.add(file_path)
+        plan.append((i, file_path))
+
+    results = run_split_plan(
+        pdf_path, plan,
+        save_kwargs=page_save_options(save_profile),
+        progress_callback=progress_callback,
+        max_workers=max_workers,
+        single_pass=single_pass,
+    )
+    return _collect_created(results)
+
+
+def split_pdf_fitz(
+    input_path: Path,
+    output_dir: Path,
+    ranges_text: str,
+    progress_callback=None,
+    status_callback=None,
+    max_workers: Optional[int] = None,
+    single_pass: bool = True,
+    save_profile: Optional[str] = None,
+) -> Tuple[int, int, List[Path]]:
+    """
+    Extrae las páginas indicadas en `ranges_text` a archivos individuales
+    (herramienta "Extraer paginas de PDF").
+    Retorna: (success_count, fail_count, created_files)
+    """
+    try:
+        num_pages = get_page_count(str(input_path))
+    except Exception as e:
+        raise RuntimeError(f"No se pudo abrir el PDF: {e}")
+
+    page_indices = parse_page_ranges(ranges_text, num_pages)
+
+    if page_indices is None:
+        raise ValueError("Rangos inválidos o fuera de límites.")
+
+    total = len(page_indices)
+
+    plan = []
+    reserved = set()
+    for page_idx in page_indices:
+        out_name = f"{input_path.stem}_pagina_{page_idx + 1}.pdf"
+        out_path = create_unique_path(str(output_dir / out_name), start=1, existing_paths=reserved)
+        reserved.add(out_path)
+        plan.append((page_idx, out_path))
+
+    def on_progress(fraction):
+        if progress_callback:
+            progress_callback(fraction)
+        if status_callback:
+            status_callback(f"Procesadas {round(fraction * total)}/{total}")
+
+    results = run_split_plan(
+        str(input_path), plan,
+        save_kwargs=page_save_options(save_profile),
+        progress_callback=on_progress,
+        max_workers=max_workers,
+        single_pass=single_pass,
+    )
+
+    success = 0
+    fail = 0
+    created_files: List[Path] = []
+    for page_idx, out_path, error in results:
+        if error:
+            print(f"[ERROR] Página {page_idx + 1}: {error}")
+            fail += 1
+        else:
+            created_files.append(Path(out_path))
+            success += 1
+
+    return success, fail, created_files
+
+
+# ==================== UNIR ====================
+
+def merge_pdfs(
+    paths: List[str],
+    output_path: str,
+    progress_callback: Optional[Callable[[float], None]] = None,
+    streaming: Optional[bool] = None,
+    memory_limit_mb: int = DEFAULT_MEMORY_LIMIT_MB,
+    save_profile: Optional[str] = None,
+) -> str:
+    """
+    Une los PDFs en el orden recibido y guarda el resultado en output_path.
+    streaming=None: se usa la unión por bloques (core.merge_engine) cuando las
+    entradas suman más de memory_limit_mb; True/False la fuerza o la evita.
+    save_profile: perfil de core.save_profiles (None = el predeterminado).
+    """
+    if streaming is None:
+        streaming = total_input_bytes(paths) > memory_limit_mb * 1024 * 1024
+    if streaming:
+        return merge_pdfs_streaming(paths, output_path, progress_callback, memory_limit_mb)
+
+    merged_doc = fitz.open()
+    try:
+        total = len(paths)
+        for idx, pdf_path in enumerate(paths, start=1):
+            with span("open"):
+                src_doc = fitz.open(pdf_path)
+            with span("insert_pdf"):
+                merged_doc.insert_pdf(src_doc)
+            src_doc.close()
+            if progress_callback:
+                progress_callback(idx / total)
+
+        save_pdf(merged_doc, output_path, save_profile)
+    finally:
+        merged_doc.close()
+
+    return output_path
+
+
+# ==================== ELIMINAR PÁGINAS ====================
+
+def edited_output_path(pdf_path: str, output_folder: str = "", file_name: str = "") -> str:
+    """Ruta de salida para el PDF editado, sin sobrescribir archivos existentes."""
+    if not output_folder:
+        output_folder = os.path.dirname(pdf_path)
+
+    if not file_name:
+        file_name = f"{os.path.splitext(os.path.basename(pdf_path))[0]}_editado"
+
+    # Remover extensión si la incluyó el usuario
+    if file_name.lower().endswith('.pdf'):
+        file_name = file_name[:-4]
+
+    return ensure_unique_filename(os.path.join(output_folder, f"{file_name}.pdf"))
+
+
+def delete_pages(
+    pdf_path: str,
+    pages_to_delete: List[int],
+    output_path: str,
+    progress_callback: Optional[Callable[[float], None]] = None,
+    save_profile: Optional[str] = None,
+    incremental: bool = False,
+) -> int:
+    """
+    Guarda en output_path una copia del PDF sin las páginas indicadas (índices 0-based).
+    Las páginas se quitan de una sola vez sobre el documento abierto.
+
+    incremental=True: el original se copia a output_path y solo se le agrega la
+    sección xref con los cambios, así que tarda casi lo mismo que copiar el
+    archivo. El resultado no se achica (las páginas quitadas siguen en el
+    archivo, sin referencias). Si el PDF no lo permite (cifrado, reparado al
+    abrir), se guarda completo con save_profile.
+    Retorna el número de páginas del documento resultante.
+    """
+    with span("open"):
+        doc = fitz.open(pdf_path)
+    try:
+        page_count = doc.page_count
+        to_delete = set(pages_to_delete)
+
+        if not to_delete:
+            raise ValueError("No se indicaron páginas para eliminar.")
+        if any(i < 0 or i >= page_count for i in to_delete):
+            raise ValueError(f"Páginas fuera de rango (el PDF tiene {page_count} páginas).")
+        if len(to_delete) >= page_count:
+            raise ValueError("No se pueden eliminar todas las páginas.\nDebe quedar al menos una página en el PDF.")
+
+        if incremental:
+            if doc.can_save_incrementally():
+                doc.close()
+                doc = None
+                return _delete_pages_incremental(pdf_path, sorted(to_delete), output_path, progress_callback)
+            print("[WARN] El PDF no admite guardado incremental; se guardará completo.")
+
+        with span("delete_pages"):
+            doc.delete_pages(sorted(to_delete))
+        if progress_callback:
+            progress_callback(0.5)
+
+        save_pdf(doc, output_path, save_profile)
+        kept = doc.page_count
+        if progress_callback:
+            progress_callback(1.0)
+    finally:
+        if doc is not None:
+            doc.close()
+
+    return kept
+
+
+def _delete_pages_incremental(
+    pdf_path: str,
+    pages: List[int],
+    output_path: str,
+    progress_callback: Optional[Callable[[float], None]] = None,
+) -> int:
+    """Copia el PDF y guarda el borrado como actualización incremental."""
+    with span("copy"):
+        shutil.copyfile(pdf_path, output_path)
+    try:
+        with span("open"):
+            doc = fitz.open(output_path)
+        try:
+            if progress_callback:
+                progress_callback(0.5)
+            with span("delete_pages"):
+                doc.delete_pages(pages)
+            with span("save"):
+                doc.saveIncr()
+            kept = doc.page_count
+        finally:
+            doc.close()
+    except Exception:
+        # No dejar una copia a medio actualizar
+        if os.path.exists(output_path):
+            os.remove(output_path)
+        raise
+    if progress_callback:
+        progress_callback(1.0)
+    return kept
+
+
+# ==================== MULTIPLICAR SOPORTES ====================
+
+def multiply_pdf(
+    pdf_path: str,
+    names: List[str],
+    output_dir: str,
+    prefix: str = "",
+    progress_callback: Optional[Callable[[float], None]] = None,
+    save_profile: Optional[str] = None,
+    copy_mode: str = DEFAULT_COPY_MODE,
+    write_workers: int = DEFAULT_WRITE_WORKERS,
+    on_created: Optional[Callable[[str], None]] = None,
+) -> List[str]:
+    """
+    Crea una copia del PDF de 1 página por cada nombre: PREFIJO + nombre + .pdf
+    La página se serializa una sola vez; cada copia es solo escritura en disco
+    (ver core.copy_writer para copy_mode y write_workers).
+    on_created(ruta) se llama por cada copia escrita, también si se cancela
+    a mitad (para poder deshacer las que quedaron).
+    """
+    with span("open"):
+        doc = fitz.open(pdf_path)
+    try:
+        if doc.page_count != 1:
+            raise ValueError(
+                f"El PDF debe tener exactamente 1 página.\nEste PDF tiene {doc.page_count} páginas."
+            )
+
+        template = fitz.open()
+        try:
+            with span("insert_pdf"):
+                template.insert_pdf(doc, from_page=0, to_page=0)
+            buffer = io.BytesIO()
+            save_pdf(template, buffer, save_profile)
+        finally:
+            template.close()
+    finally:
+        doc.close()
+
+    os.makedirs(output_dir, exist_ok=True)
+
+    # Rutas reservadas antes de escribir (las copias pueden escribirse en paralelo)
+    paths: List[str] = []
+    reserved = set()
+    for name in names:
+        file_name = f"{prefix}{clean_filename(name)}.pdf"
+        file_path = create_unique_path(os.path.join(output_dir, file_name), existing_paths=reserved)
+        reserved.add(file_path)
+        paths.append(file_path)
+
+    return write_copies(
+        buffer.getvalue(), paths, copy_mode, write_workers,
+        progress_callback=progress_callback,
+        on_created=lambda path: _report_created(path, on_created),
+    )
+
+
+def _report_created(path: str, on_created: Optional[Callable[[str], None]]):
+    print(f"[INFO] Creado: {path}")
+    if on_created:
+        on_created(path)
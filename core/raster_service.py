@@ -0,0 +1,134 @@
+"""
+Servicio de rasterizado de páginas (miniaturas) en un pool de procesos.
+
+Los documentos de fitz no se pueden compartir entre hilos, así que cada
+proceso del pool abre su propio handle del PDF (y lo conserva para los
+siguientes lotes del mismo archivo). Cada tarea renderiza un lote de páginas
+y devuelve los píxeles RGB crudos de cada una (RenderedPage), sin pasar por
+PPM/BytesIO; to_image() los envuelve en una imagen PIL sin copiarlos.
+
+La prioridad la da quien envía los lotes: con pocos lotes en vuelo a la vez
+(uno por proceso), el siguiente lote sale de las páginas que están en
+pantalla en ese momento.
+
+fitz solo se importa dentro de los procesos del pool: el proceso de la
+interfaz no lo carga para las miniaturas.
+"""
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+
+# Documentos abiertos que conserva cada proceso (los más recientes)
+WORKER_OPEN_DOCS = 2
+
+
+class RenderedPage(NamedTuple):
+    """Página renderizada: píxeles RGB (3 bytes por píxel, sin relleno entre filas)."""
+    page: int
+    width: int
+    height: int
+    samples: bytes
+    error: Optional[str] = None
+
+    def to_image(self):
+        """Imagen PIL sobre el mismo buffer, o None si la página falló."""
+        if self.error or not self.samples:
+            return None
+        from PIL import Image
+        return Image.frombuffer("RGB", (self.width, self.height), self.samples, "raw", "RGB", 0, 1)
+
+
+# ==================== TRABAJO POR PROCESO ====================
+
+# (ruta, tamaño, mtime) -> documento abierto en este proceso
+_worker_docs: Dict[Tuple[str, int, int], object] = {}
+
+
+def _open_worker_doc(pdf_path: str):
+    """Documento del proceso para pdf_path; se reabre si el archivo cambió."""
+    import fitz  # PyMuPDF
+
+    st = os.stat(pdf_path)
+    key = (os.path.abspath(pdf_path), st.st_size, st.st_mtime_ns)
+    doc = _worker_docs.pop(key, None)
+    if doc is None:
+        doc = fitz.open(pdf_path)
+    _worker_docs[key] = doc  # al final: el más reciente
+    while len(_worker_docs) > WORKER_OPEN_DOCS:
+        old_key = next(iter(_worker_docs))
+        _worker_docs.pop(old_key).close()
+    return doc
+
+
+def _render_batch(pdf_path: str, pages: List[int], zoom: float) -> List[RenderedPage]:
+    """Tarea del pool: renderiza las páginas con el documento de este proceso."""
+    import fitz  # PyMuPDF
+
+    doc = _open_worker_doc(pdf_path)
+    matrix = fitz.Matrix(zoom, zoom)
+    results = []
+    for page in pages:
+        try:
+            pix = doc[page].get_pixmap(matrix=matrix, colorspace=fitz.csRGB, alpha=False)
+            results.append(RenderedPage(page, pix.width, pix.height, pix.samples))
+        except Exception as e:
+            results.append(RenderedPage(page, 0, 0, b"", str(e)))
+    return results
+
+
+# ==================== API ====================
+
+def default_raster_workers() -> int:
+    """Procesos por defecto: deja un núcleo para la interfaz (máximo 4)."""
+    return max(1, min(4, (os.cpu_count() or 1) - 1))
+
+
+class RasterService:
+    """Pool de procesos para renderizar lotes de páginas. Se crea al primer uso."""
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers or default_raster_workers()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def submit(self, pdf_path: str, pages: List[int], zoom: float) -> "Future[List[RenderedPage]]":
+        """Encola el renderizado de un lote de páginas (índices 0-based)."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor.submit(_render_batch, pdf_path, list(pages), zoom)
+
+    def shutdown(self):
+        """Cierra los procesos; los lotes que no empezaron se descartan."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+_service: Optional[RasterService] = None
+_service_lock = threading.Lock()
+
+
+def get_raster_service() -> RasterService:
+    """Servicio compartido por las herramientas."""
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = RasterService()
+        return _service
+
+
+def shutdown_raster_service():
+    """Cierra el pool si llegó a crearse (al cerrar la aplicación)."""
+    global _service
+    with _service_lock:
+        if _service is not None:
+            _service.shutdown()
+            _service = None
@@ -0,0 +1,231 @@
+"""
+Perfiles de guardado de PDFs.
+
+Todas las herramientas guardaban con save(garbage=4, deflate=True). garbage=4
+fusiona objetos duplicados (fuentes repetidas al unir o al copiar página por
+página), pero en MuPDF ese paso crece mucho más rápido que el documento:
+con 400 páginas de texto tarda ~80 s y con miles de páginas, minutos.
+
+Perfiles (tiempo de save y tamaño; PDF de 100 páginas de texto con una
+fuente por página, "unir" = 10 partes, "eliminar" = quitar 1 de cada 3):
+
+  perfil     opciones                              unir            eliminar
+  fast       garbage=1, deflate                    0.02 s 1.40 MB  0.02 s 3.55 MB
+  balanced   fusión por hash, garbage=2, objstms   0.30 s 0.90 MB  0.21 s 0.61 MB
+  smallest   garbage=4, deflate, objstms           2.20 s 0.90 MB  0.90 s 0.61 MB
+  auto       elige uno de los anteriores con una muestra del documento
+
+Con 1.000 páginas (eliminar): balanced 2.1 s; garbage=3/4 no terminó en 8 min.
+En PDFs escaneados (una imagen por página) los tres dan casi el mismo tamaño
+(6.68 / 6.66 / 6.64 MB al unir 100 páginas) y ninguno pasa de 0.1 s.
+Las opciones aplican a los guardados con fitz; la división por copia directa
+(core.page_writer) y la unión por bloques (core.merge_engine) no las usan.
+
+balanced fusiona los duplicados con merge_duplicate_objects: agrupa los
+objetos por su contenido (texto + hash del stream) en tiempo lineal, redirige
+las referencias al primero de cada grupo y deja que garbage descarte las
+copias. Solo recorre los objetos alcanzables desde el trailer. No compara
+objetos con ciclos de referencias ni páginas/anotaciones.
+"""
+import hashlib
+import re
+from typing import Dict, List, Optional, Tuple
+
+from core.instrumentation import span
+
+
+SAVE_PROFILES: Dict[str, Dict] = {
+    "fast": {"garbage": 1, "deflate": True},
+    "balanced": {"garbage": 2, "deflate": True, "use_objstms": 1},
+    "smallest": {"garbage": 4, "deflate": True, "use_objstms": 1},
+}
+# Perfiles que fusionan duplicados antes de guardar
+DEDUP_PROFILES = ("balanced",)
+
+PROFILE_CHOICES = ("auto",) + tuple(SAVE_PROFILES)
+DEFAULT_SAVE_PROFILE = "auto"
+
+# auto: objetos hasta los que garbage=4 cabe en el presupuesto de tiempo
+# (~0.4 s con 2.000 objetos, ~1.7 s con 4.000, ~13 s con 8.000)
+SMALLEST_MAX_OBJECTS = 2500
+# auto: fracción de bytes duplicados desde la que vale la pena fusionar
+AUTO_MIN_DUPLICATE_RATIO = 0.02
+# auto: objetos que se revisan como máximo (repartidos en todo el documento)
+AUTO_SAMPLE_OBJECTS = 4000
+
+_REF_RE = re.compile(r"(\d+)\s+(\d+)\s+R\b")
+# Objetos que no se fusionan: árbol de páginas, anotaciones, objetos con padre
+_KEEP_RE = re.compile(r"/Type\s*/(?:Pages?|Catalog|Annot|ObjStm|XRef)\b|/Parent\s|/P\s+\d+\s+\d+\s+R")
+
+
+# ==================== FUSIÓN DE DUPLICADOS ====================
+
+def _split_refs(text: str) -> Tuple[Tuple[str, ...], Tuple[int, ...]]:
+    parts = _REF_RE.split(text)
+    # split con 2 grupos: [texto, num, gen, texto, num, gen, ..., texto]
+    return tuple(parts[0::3]), tuple(int(n) for n in parts[1::3])
+
+
+def _replace_refs(text: str, canon: Dict[int, int]) -> str:
+    def sub(m):
+        target = canon.get(int(m.group(1)))
+        return f"{target} 0 R" if target else m.group(0)
+    return _REF_RE.sub(sub, text)
+
+
+def merge_duplicate_objects(doc) -> int:
+    """
+    Redirige las referencias a objetos duplicados hacia una sola copia.
+    Las copias quedan sin referencias: el guardado (garbage >= 1) las quita.
+    Retorna la cantidad de objetos fusionados.
+    """
+    candidates: Dict[int, Tuple[Tuple[str, ...], Tuple[int, ...], Optional[bytes]]] = {}
+    refs_of: Dict[int, Tuple[int, ...]] = {}
+
+    # Solo los objetos alcanzables desde el trailer: los que quedaron sin
+    # referencias (p. ej. páginas eliminadas) no se leen; garbage los quita
+    xref_length = doc.xref_length()
+    pending = [r for r in _split_refs(doc.pdf_trailer(compressed=True))[1] if 0 < r < xref_length]
+    seen = set(pending)
+    while pending:
+        xref = pending.pop()
+        try:
+            text = doc.xref_object(xref, compressed=True)
+        except Exception:
+            continue
+        segments, refs = _split_refs(text)
+        if refs:
+            refs_of[xref] = refs
+            for r in refs:
+                if r not in seen and 0 < r < xref_length:
+                    seen.add(r)
+                    pending.append(r)
+        if text == "null" or _KEEP_RE.search(text):
+            continue
+        digest = None
+        if doc.xref_is_stream(xref):
+            digest = hashlib.md5(doc.xref_stream_raw(xref) or b"").digest()
+        candidates[xref] = (segments, refs, digest)
+
+    # Se repite hasta que no aparezcan duplicados nuevos: al fusionar las
+    # fuentes, sus descriptores quedan iguales, y así hacia arriba
+    canon: Dict[int, int] = {}
+    changed = True
+    while changed:
+        changed = False
+        groups: Dict[Tuple, int] = {}
+        for xref, (segments, refs, digest) in candidates.items():
+            if xref in canon:
+                continue
+            key = (segments, tuple(canon.get(r, r) for r in refs), digest)
+            first = groups.setdefault(key, xref)
+            if first != xref:
+                canon[xref] = first
+                changed = True
+
+    if not canon:
+        return 0
+
+    for xref, refs in refs_of.items():
+        if xref in canon or not any(r in canon for r in refs):
+            continue
+        if doc.xref_is_stream(xref):
+            # update_object descartaría el contenido del stream: se cambia clave por clave
+            for key in doc.xref_get_keys(xref):
+                kind, value = doc.xref_get_key(xref, key)
+                if kind in ("xref", "dict", "array") and _REF_RE.search(value):
+                    new_value = _replace_refs(value, canon)
+                    if new_value != value:
+                        doc.xref_set_key(xref, key, new_value)
+        else:
+            doc.update_object(xref, _replace_refs(doc.xref_object(xref, compressed=True), canon))
+
+    return len(canon)
+
+
+# ==================== ELECCIÓN DEL PERFIL ====================
+
+def duplicate_ratio(doc, sample: int = AUTO_SAMPLE_OBJECTS) -> float:
+    """
+    Fracción estimada de bytes de streams repetidos, con una muestra de
+    objetos repartida en todo el documento. Solo se lee el contenido de los
+    streams cuyo /Length coincide con otro.
+    """
+    total_objects = doc.xref_length() - 1
+    step = max(1, total_objects // sample)
+    by_length: Dict[int, List[int]] = {}
+    total_bytes = 0
+    for xref in range(1, total_objects + 1, step):
+        if not doc.xref_is_stream(xref):
+            continue
+        kind, value = doc.xref_get_key(xref, "Length")
+        length = int(value) if kind == "int" else len(doc.xref_stream_raw(xref) or b"")
+        total_bytes += length
+        by_length.setdefault(length, []).append(xref)
+
+    duplicated = 0
+    for length, xrefs in by_length.items():
+        if len(xrefs) < 2:
+            continue
+        seen = set()
+        for xref in xrefs:
+            digest = hashlib.md5(doc.xref_stream_raw(xref) or b"").digest()
+            if digest in seen:
+                duplicated += length
+            seen.add(digest)
+    return duplicated / total_bytes if total_bytes else 0.0
+
+
+def choose_profile(doc) -> str:
+    """
+    Perfil para "auto":
+      - documento pequeño -> smallest (garbage=4 tarda poco),
+      - sin duplicados que valgan la pena -> fast (fusionar no reduciría nada),
+      - con duplicados -> balanced.
+    """
+    if doc.xref_length() <= SMALLEST_MAX_OBJECTS:
+        return "smallest"
+    if duplicate_ratio(doc) < AUTO_MIN_DUPLICATE_RATIO:
+        return "fast"
+    return "balanced"
+
+
+def resolve_profile(doc, profile: Optional[str]) -> str:
+    profile = profile or DEFAULT_SAVE_PROFILE
+    if profile == "auto":
+        return choose_profile(doc)
+    if profile not in SAVE_PROFILES:
+        raise ValueError(f"Perfil de guardado desconocido: {profile} (use {', '.join(PROFILE_CHOICES)})")
+    return profile
+
+
+def page_save_options(profile: Optional[str]) -> Dict:
+    """
+    Opciones para PDFs de una página (división con insert_pdf): ahí garbage=4
+    tarda poco, así que "auto" equivale a smallest.
+    """
+    if not profile or profile == "auto":
+        profile = "smallest"
+    return save_options(profile)
+
+
+def save_options(profile: str) -> Dict:
+    """Opciones de fitz save() de un perfil fijo (no "auto")."""
+    if profile not in SAVE_PROFILES:
+        raise ValueError(f"Perfil de guardado desconocido: {profile} (use {', '.join(SAVE_PROFILES)})")
+    return dict(SAVE_PROFILES[profile])
+
+
+# ==================== GUARDAR ====================
+
+def save_pdf(doc, path, profile: Optional[str] = None) -> str:
+    """
+    Guarda el documento con el perfil indicado en path (ruta o archivo abierto,
+    p. ej. BytesIO). Retorna el perfil usado.
+    """
+    with span("save"):
+        chosen = resolve_profile(doc, profile)
+        if chosen in DEDUP_PROFILES:
+            merge_duplicate_objects(doc)
+        doc.save(path, **save_options(chosen))
+    return chosen
@@ -0,0 +1,167 @@
+"""
+Motor de división de PDFs en un archivo por página.
+
+Los nombres de salida se calculan antes, en el proceso principal (split
+"plan"), así el resultado es idéntico al de la división en serie. Luego las
+páginas se reparten en bloques contiguos entre un pool de procesos, donde
+cada proceso abre el PDF una sola vez.
+Para PDFs pequeños se trabaja en serie (crear el pool cuesta más que dividir).
+
+Modo single_pass (por defecto): cada página se escribe con
+SinglePassPageWriter, que copia los streams ya comprimidos del original en
+vez de insert_pdf + save(garbage/deflate). Si una página no se puede copiar
+así, se escribe con insert_pdf.
+"""
+import math
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional, Tuple
+
+import fitz  # PyMuPDF
+
+from core.instrumentation import span
+from core.page_writer import SinglePassPageWriter
+
+
+# Páginas mínimas para usar el pool de procesos
+PARALLEL_MIN_PAGES = 100
+
+# Bloques por proceso: más bloques = progreso más fino
+CHUNKS_PER_WORKER = 4
+
+# (índice de página 0-based, ruta de salida)
+SplitPlan = List[Tuple[int, str]]
+
+# (índice de página, ruta de salida, error o None)
+SplitResult = List[Tuple[int, str, Optional[str]]]
+
+
+# ==================== TRABAJO POR PROCESO ====================
+
+_worker_doc = None
+_worker_writer = None
+
+
+def _open_source(pdf_path: str, single_pass: bool):
+    """Abre el PDF y, si corresponde, su escritor de copia directa."""
+    with span("open"):
+        doc = fitz.open(pdf_path)
+    writer = None
+    if single_pass:
+        try:
+            writer = SinglePassPageWriter(doc)
+        except ValueError as e:
+            print(f"[WARN] {e} Se usará insert_pdf.")
+    return doc, writer
+
+
+def _init_worker(pdf_path: str, single_pass: bool):
+    """Abre el PDF una vez por proceso."""
+    global _worker_doc, _worker_writer
+    _worker_doc, _worker_writer = _open_source(pdf_path, single_pass)
+
+
+def _insert_page(doc, page_idx: int, out_path: str, save_kwargs: Dict):
+    new_doc = fitz.open()
+    with span("insert_pdf"):
+        new_doc.insert_pdf(doc, from_page=page_idx, to_page=page_idx)
+    with span("save"):
+        new_doc.save(out_path, **save_kwargs)
+    new_doc.close()
+
+
+def _write_pages(doc, writer, chunk: List[Tuple[int, int, str]], save_kwargs: Dict) -> List[Tuple[int, Optional[str]]]:
+    """Escribe cada página del bloque. Retorna (posición en el plan, error o None)."""
+    results = []
+    for pos, page_idx, out_path in chunk:
+        try:
+            if writer is not None:
+                try:
+                    with span("write_page"):
+                        writer.write_page(page_idx, out_path)
+                except Exception as e:
+                    print(f"[WARN] Página {page_idx + 1}: copia directa falló ({e}); se usa insert_pdf.")
+                    _insert_page(doc, page_idx, out_path, save_kwargs)
+            else:
+                _insert_page(doc, page_idx, out_path, save_kwargs)
+            results.append((pos, None))
+        except Exception as e:
+            results.append((pos, str(e)))
+    return results
+
+
+def _write_chunk(chunk: List[Tuple[int, int, str]], save_kwargs: Dict) -> List[Tuple[int, Optional[str]]]:
+    """Tarea del pool: usa el documento abierto por _init_worker."""
+    return _write_pages(_worker_doc, _worker_writer, chunk, save_kwargs)
+
+
+# ==================== API ====================
+
+def default_workers() -> int:
+    """Procesos por defecto: uno por núcleo (máximo 8)."""
+    return max(1, min(8, os.cpu_count() or 1))
+
+
+def run_split_plan(
+    pdf_path: str,
+    plan: SplitPlan,
+    save_kwargs: Optional[Dict] = None,
+    progress_callback: Optional[Callable[[float], None]] = None,
+    max_workers: Optional[int] = None,
+    single_pass: bool = True,
+) -> SplitResult:
+    """
+    Ejecuta el plan de división. Los resultados vienen en el mismo orden del plan;
+    un error en una página no detiene las demás.
+    save_kwargs solo aplica a las páginas escritas con insert_pdf.
+    """
+    save_kwargs = save_kwargs or {}
+    total = len(plan)
+    if total == 0:
+        return []
+
+    items = [(pos, page_idx, out_path) for pos, (page_idx, out_path) in enumerate(plan)]
+    errors: List[Optional[str]] = [None] * total
+    done = 0
+
+    workers = max_workers or default_workers()
+
+    if total < PARALLEL_MIN_PAGES or workers == 1:
+        # En serie: un bloque por página para reportar progreso
+        doc, writer = _open_source(pdf_path, single_pass)
+        try:
+            for item in items:
+                for pos, error in _write_pages(doc, writer, [item], save_kwargs):
+                    errors[pos] = error
+                done += 1
+                if progress_callback:
+                    progress_callback(done / total)
+        finally:
+            doc.close()
+    else:
+        chunk_size = max(1, math.ceil(total / (workers * CHUNKS_PER_WORKER)))
+        chunks = [items[i:i + chunk_size] for i in range(0, total, chunk_size)]
+
+        # Las etapas de cada página quedan en los procesos del pool; aquí se mide el total
+        with span("split_pool"), ProcessPoolExecutor(
+            max_workers=min(workers, len(chunks)),
+            # "spawn" también en Linux: el hilo de la interfaz no se copia con fork
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(pdf_path, single_pass),
+        ) as executor:
+            futures = [executor.submit(_write_chunk, chunk, save_kwargs) for chunk in chunks]
+            try:
+                for future in as_completed(futures):
+                    for pos, error in future.result():
+                        errors[pos] = error
+                        done += 1
+                    if progress_callback:
+                        progress_callback(done / total)
+            except BaseException:
+                # Cancelación (o error): no empezar los bloques que faltan
+                executor.shutdown(wait=False, cancel_futures=True)
+                raise
+
+    return [(page_idx, out_path, errors[pos]) for pos, (page_idx, out_path) in enumerate(plan)]
@@ -0,0 +1,168 @@
+"""
+Caché en disco de miniaturas de páginas PDF.
+
+Cada miniatura se guarda como PNG con compresión mínima en data/thumbnails/,
+con nombre <hash del contenido>-<página>-<zoom>. Frente a PPM (RGB crudo)
+ocupa 8-16 KB en vez de ~60 KB por página y se lee en ~1 ms en vez de 0.07 ms:
+caben 4-7 veces más PDFs bajo el mismo límite y reabrir 1.000 páginas toma
+~0.4-1.2 s (renderizarlas, 10-13 s).
+El hash es del contenido del archivo, no de la ruta: el mismo PDF copiado o
+renombrado reutiliza sus miniaturas, y un PDF modificado no usa las viejas.
+
+Al superar max_bytes se borran las menos usadas (LRU): cada lectura actualiza
+la fecha de modificación del archivo y se borran primero las más antiguas.
+"""
+import hashlib
+import os
+import threading
+from typing import Dict, Optional, Tuple
+
+from PIL import Image
+
+from core.config import DATA_DIR
+
+
+THUMBNAIL_DIR = os.path.normpath(os.path.join(DATA_DIR, "thumbnails"))
+
+# Tamaño máximo de la caché; al superarlo se recorta hasta TRIM_RATIO del máximo
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+TRIM_RATIO = 0.8
+
+# 1 = compresión rápida; niveles mayores apenas reducen el tamaño de miniaturas
+PNG_COMPRESS_LEVEL = 1
+
+_HASH_BLOCK = 1024 * 1024
+
+
+class ThumbnailCache:
+    """Miniaturas por (hash del PDF, página, zoom). Se puede usar desde varios hilos."""
+
+    def __init__(self, cache_dir: str = THUMBNAIL_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._total_bytes: Optional[int] = None     # se calcula la primera vez que se escribe
+        # (ruta, tamaño, mtime) -> hash, para no releer un PDF que no cambió
+        self._hashes: Dict[Tuple[str, int, int], str] = {}
+
+    # ==================== CLAVES ====================
+
+    def file_key(self, pdf_path: str) -> str:
+        """Hash del contenido del PDF (se recalcula solo si cambió tamaño o fecha)."""
+        st = os.stat(pdf_path)
+        memo_key = (os.path.abspath(pdf_path), st.st_size, st.st_mtime_ns)
+        cached = self._hashes.get(memo_key)
+        if cached:
+            return cached
+
+        digest = hashlib.blake2b(digest_size=16)
+        with open(pdf_path, "rb") as f:
+            for block in iter(lambda: f.read(_HASH_BLOCK), b""):
+                digest.update(block)
+        key = digest.hexdigest()
+        self._hashes[memo_key] = key
+        return key
+
+    def _path(self, file_key: str, page: int, zoom: float) -> str:
+        return os.path.join(self.cache_dir, file_key[:2], f"{file_key}-{page}-{zoom:g}.png")
+
+    # ==================== LECTURA / ESCRITURA ====================
+
+    def get(self, file_key: str, page: int, zoom: float) -> Optional[Image.Image]:
+        """Miniatura guardada, o None si no está (o el archivo está dañado)."""
+        path = self._path(file_key, page, zoom)
+        try:
+            with Image.open(path) as img:
+                img.load()
+            os.utime(path)  # más reciente para el LRU
+            return img
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"[WARN] Miniatura en caché inválida ({os.path.basename(path)}): {e}")
+            self._remove(path)
+            return None
+
+    def put(self, file_key: str, page: int, zoom: float, image: Image.Image):
+        """Guarda la miniatura. Los errores de disco no interrumpen la carga."""
+        path = self._path(file_key, page, zoom)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            image.convert("RGB").save(tmp_path, format="PNG", compress_level=PNG_COMPRESS_LEVEL)
+            os.replace(tmp_path, path)
+            size = os.path.getsize(path)
+        except OSError as e:
+            print(f"[WARN] No se pudo guardar la miniatura en caché: {e}")
+            self._remove(tmp_path)
+            return
+
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = self._scan()[1]
+            else:
+                self._total_bytes += size
+            over = self._total_bytes > self.max_bytes
+        if over:
+            self.trim()
+
+    # ==================== LÍMITE DE TAMAÑO ====================
+
+    def _scan(self):
+        """(lista de (mtime, tamaño, ruta), total de bytes) de la caché."""
+        entries = []
+        total = 0
+        for folder, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if not name.endswith(".png"):
+                    continue
+                path = os.path.join(folder, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+                total += st.st_size
+        return entries, total
+
+    def trim(self, target_bytes: Optional[int] = None):
+        """Borra las miniaturas menos usadas hasta quedar en target_bytes."""
+        if target_bytes is None:
+            target_bytes = int(self.max_bytes * TRIM_RATIO)
+        with self._lock:
+            entries, total = self._scan()
+            entries.sort()
+            removed = 0
+            for _, size, path in entries:
+                if total <= target_bytes:
+                    break
+                if self._remove(path):
+                    total -= size
+                    removed += 1
+            self._total_bytes = total
+        if removed:
+            print(f"[INFO] Caché de miniaturas: {removed} archivos eliminados ({total / 2**20:.1f} MB)")
+
+    def clear(self):
+        self.trim(0)
+
+    @staticmethod
+    def _remove(path: str) -> bool:
+        try:
+            os.remove(path)
+            return True
+        except OSError:
+            return False
+
+
+_cache: Optional[ThumbnailCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_thumbnail_cache() -> ThumbnailCache:
+    """Caché compartida por las herramientas."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ThumbnailCache()
+        return _cache
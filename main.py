@@ -1,5 +1,9 @@
+import multiprocessing
+
 from core.app import App
 
 if __name__ == "__main__":
+    # Necesario para el pool de procesos en el ejecutable de PyInstaller
+    multiprocessing.freeze_support()
     app = App()
     app.mainloop()
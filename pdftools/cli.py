@@ -0,0 +1,492 @@
+"""
+Línea de comandos de PDF Tools (sin interfaz gráfica).
+
+Uso:
+    python -m pdftools <herramienta> [opciones]
+    python -m pdftools --help
+    python -m pdftools <herramienta> --help
+
+No importa customtkinter: cada herramienta usa las mismas funciones de core/
+que la ventana correspondiente.
+"""
+import argparse
+import os
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+
+# ==================== UTILIDADES ====================
+
+def _read_names(args) -> List[str]:
+    """Nombres desde --names (uno por argumento) o --names-file (uno por línea)."""
+    names: List[str] = list(args.names or [])
+    if args.names_file:
+        with open(args.names_file, "r", encoding="utf-8") as f:
+            names.extend(line.strip() for line in f if line.strip())
+    return names
+
+
+def _print_progress(fraction: float):
+    """Progreso en una sola línea de consola."""
+    print(f"\r[INFO] Progreso: {int(fraction * 100)}%", end="", file=sys.stderr, flush=True)
+    if fraction >= 1:
+        print(file=sys.stderr)
+
+
+# ==================== COMANDOS PDF ====================
+
+def cmd_merge(args) -> int:
+    """Une los PDFs indicados (en el orden recibido o alfabético con --sort)."""
+    from core.pdf_ops import merge_pdfs
+
+    inputs = sorted(args.inputs, key=lambda p: os.path.basename(p)) if args.sort else args.inputs
+    if len(inputs) < 2:
+        print("[ERROR] Indica al menos 2 archivos PDF para unir.", file=sys.stderr)
+        return 1
+
+    extra = {"memory_limit_mb": args.memory_limit} if args.memory_limit else {}
+    merge_pdfs(
+        inputs, args.output, progress_callback=_print_progress, streaming=args.streaming,
+        save_profile=args.save_profile, **extra
+    )
+    print(f"[INFO] PDF unido creado: {args.output}")
+    return 0
+
+
+def cmd_merge_groups(args) -> int:
+    """Une los PDFs de una carpeta agrupados por prefijo y los mueve a Grupos/."""
+    from core.pdf_groups import get_groups_case_sensitive, merge_groups, undo_batch, undo_batches
+
+    if args.undo:
+        batches = undo_batches(args.folder)
+        if not batches:
+            print("[WARN] No hay uniones para deshacer en esta carpeta.")
+            return 0
+        restored, errors = undo_batch(args.folder, batches[-1])
+        print(f"[INFO] Grupos restaurados: {restored}")
+        for error in errors:
+            print(f"[ERROR] {error}", file=sys.stderr)
+        return 1 if errors else 0
+
+    groups = get_groups_case_sensitive(args.folder)
+    if args.groups:
+        groups = {k: v for k, v in groups.items() if k in args.groups}
+
+    if not groups:
+        print("[WARN] No se encontraron grupos con más de un PDF.")
+        return 0
+
+    failed = 0
+
+    def on_group_done(key, success, errors, output_path):
+        nonlocal failed
+        if success:
+            print(f"[INFO] Grupo '{key}' ({len(groups[key])} archivos) -> {output_path}")
+        else:
+            failed += 1
+            print(f"[ERROR] Grupo '{key}': {'; '.join(errors)}", file=sys.stderr)
+
+    merge_groups(args.folder, groups, save_profile=args.save_profile,
+                 on_group_done=on_group_done, max_workers=args.workers)
+    return 1 if failed else 0
+
+
+def cmd_split(args) -> int:
+    """Divide el PDF en un archivo por página (herramienta "Dividir PDF")."""
+    from core.pdf_ops import split_pdf_pages
+
+    names = _read_names(args) or None
+    output_dir = args.output_dir or os.path.dirname(os.path.abspath(args.input))
+
+    created = split_pdf_pages(
+        args.input, output_dir, names=names, prefix=args.prefix, single_pass=args.single_pass,
+        save_profile=args.save_profile
+    )
+    print(f"[INFO] {len(created)} archivos creados en: {output_dir}")
+
+    if args.remove_original:
+        os.remove(args.input)
+        print(f"[INFO] Original eliminado: {args.input}")
+    return 0
+
+
+def cmd_extract_pages(args) -> int:
+    """Extrae páginas por rangos a archivos individuales ("Extraer paginas de PDF")."""
+    from core.pdf_ops import split_pdf_fitz
+
+    input_path = Path(args.input)
+    output_dir = Path(args.output_dir) if args.output_dir else input_path.parent
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    success, fail, _ = split_pdf_fitz(
+        input_path, output_dir, args.ranges, progress_callback=_print_progress,
+        single_pass=args.single_pass, save_profile=args.save_profile
+    )
+    print(f"[INFO] Exitosos: {success}  Fallidos: {fail}  Carpeta: {output_dir}")
+    return 1 if fail else 0
+
+
+def cmd_split_orders(args) -> int:
+    """Divide el PDF nombrando cada página con PREFIJO + nombre ("Separar Ordenes OPF")."""
+    from core.pdf_ops import split_pdf_by_names
+
+    if args.auto_names:
+        from core.config import get_name_patterns
+        from core.page_names import auto_names
+
+        names, unmatched = auto_names(args.input, args.pattern or get_name_patterns() or None)
+        if unmatched:
+            pages = ", ".join(str(i + 1) for i in unmatched)
+            print(f"[WARN] {len(unmatched)} páginas sin coincidencia (quedan como REVISAR_PAG_n): {pages}",
+                  file=sys.stderr)
+            if args.strict:
+                return 1
+        if args.dry_run:
+            for i, name in enumerate(names, start=1):
+                print(f"{i}\t{name}")
+            return 0
+    else:
+        names = _read_names(args)
+    if not names:
+        print("[ERROR] Indica los nombres con --names, --names-file o --auto-names.", file=sys.stderr)
+        return 1
+
+    output_dir = args.output_dir or os.path.dirname(os.path.abspath(args.input))
+    created = split_pdf_by_names(
+        args.input, output_dir, names, args.prefix,
+        single_pass=args.single_pass, save_profile=args.save_profile
+    )
+    print(f"[INFO] {len(created)} archivos creados en: {output_dir}")
+    return 0
+
+
+def cmd_multiply(args) -> int:
+    """Crea una copia del PDF de 1 página por cada nombre ("Multiplicar Soportes")."""
+    from core.pdf_ops import multiply_pdf
+
+    names = _read_names(args)
+    if not names:
+        print("[ERROR] Indica los nombres con --names o --names-file.", file=sys.stderr)
+        return 1
+
+    output_dir = args.output_dir or os.path.dirname(os.path.abspath(args.input))
+    created = multiply_pdf(args.input, names, output_dir, args.prefix, save_profile=args.save_profile,
+                           copy_mode=args.copy_mode, write_workers=args.write_workers)
+    print(f"[INFO] {len(created)} archivos creados en: {output_dir}")
+    return 0
+
+
+def cmd_delete_pages(args) -> int:
+    """Guarda una copia del PDF sin las páginas indicadas ("Eliminar páginas")."""
+    from core.pdf_ops import delete_pages, edited_output_path, get_page_count, parse_page_ranges
+
+    page_count = get_page_count(args.input)
+    pages = parse_page_ranges(args.pages, page_count) if args.pages.strip() else None
+    if not pages:
+        print(f"[ERROR] Páginas inválidas (el PDF tiene {page_count} páginas).", file=sys.stderr)
+        return 1
+
+    output_path = args.output or edited_output_path(args.input, args.output_dir or "", args.name or "")
+    kept = delete_pages(args.input, pages, output_path, save_profile=args.save_profile,
+                        incremental=args.incremental)
+    print(f"[INFO] {kept} páginas guardadas en: {output_path}")
+    return 0
+
+
+# ==================== COMANDOS EXCEL / API ====================
+
+def cmd_validate_emails(args) -> int:
+    """Valida los correos de un Excel ("Validar Correos")."""
+    from core.email_validator import EmailValidator, read_email_column, validate_emails
+
+    validator = EmailValidator()
+    email_column, columns, emails = read_email_column(args.input, validator)
+    if not email_column:
+        print("[ERROR] No se encontró una columna de correos.", file=sys.stderr)
+        print(f"[INFO] Columnas disponibles: {', '.join(map(str, columns))}", file=sys.stderr)
+        return 1
+
+    errors = validate_emails(emails, validator, max_workers=args.workers)
+    for e in sorted(errors, key=lambda e: e.row):
+        print(f"Fila {e.row}: '{e.email}' [{e.error_type}] {e.detail}")
+
+    print(f"[INFO] {len(errors)} errores de {len(emails)} correos")
+    return 1 if errors else 0
+
+
+def cmd_horus(args) -> int:
+    """Consulta afiliados en Horus Health y exporta los resultados a Excel o CSV."""
+    from core import horus as horus_api
+    from core.affiliate_cache import get_affiliate_cache, ttl_seconds
+    from core.horus_engine import query_affiliates
+    from core.horus_journal import BatchJournal, find_unfinished, latest_batch
+
+    if args.export_only:
+        # Sin consultar: las filas salen de la bitácora (p. ej. tras un cierre inesperado)
+        if not args.output:
+            print("[ERROR] --export-only necesita -o/--output.", file=sys.stderr)
+            return 1
+        journal = latest_batch()
+        if journal is None:
+            print("[ERROR] No hay consultas guardadas para exportar.", file=sys.stderr)
+            return 1
+        rows = journal.rows()
+        horus_api.export_results(rows, args.output)
+        print(f"[INFO] {len(rows)} de {len(journal.documents)} resultados de {journal.batch_id} exportados: {args.output}")
+        return 0
+
+    if args.resume:
+        journal = find_unfinished()
+        if journal is None:
+            print("[ERROR] No hay una consulta sin terminar para reanudar.", file=sys.stderr)
+            return 1
+        documents = journal.documents
+        print(f"[INFO] Reanudando {journal.batch_id}: faltan {journal.pending_count()} de {len(documents)}")
+    else:
+        documents: List[str] = list(args.documents or [])
+        if args.excel:
+            loaded, _ = horus_api.read_documents_from_excel(args.excel, set(documents))
+            documents.extend(loaded)
+
+        if not documents:
+            print("[ERROR] Indica documentos o un archivo --excel.", file=sys.stderr)
+            return 1
+        journal = None
+
+    if not args.email:
+        print("[ERROR] Indica el correo de acceso (--email).", file=sys.stderr)
+        return 1
+    password = args.password or os.environ.get("HORUS_PASSWORD", "")
+    client = horus_api.HorusClient()
+    if not client.login(args.email, password):
+        print("[ERROR] Credenciales inválidas.", file=sys.stderr)
+        return 1
+    if journal is None:
+        # Cada resultado queda en disco: si se corta, --resume continúa desde ahí
+        journal = BatchJournal.create(documents)
+
+    def on_result(index, row, completed, total):
+        print("\t".join(row))
+        _print_progress(completed / total)
+
+    limits = {
+        "rate_per_second": args.rate, "burst": args.burst, "max_in_flight": args.max_in_flight,
+        "min_in_flight": args.min_in_flight, "latency_target": args.latency_target,
+    }
+    stats = {}
+    query_affiliates(
+        client, documents, on_result=on_result, limits=limits,
+        cache=None if args.no_cache else get_affiliate_cache(),
+        max_age=ttl_seconds(args.cache_days), force_refresh=args.refresh, stats=stats,
+        journal=journal,
+    )
+    if stats.get("cached"):
+        print(f"[INFO] {stats['cached']} de {len(documents)} desde la caché")
+
+    if args.output:
+        horus_api.export_results(journal.rows(), args.output)
+        print(f"[INFO] Resultados exportados: {args.output}")
+    return 0
+
+
+def cmd_carnet(args) -> int:
+    """Genera la base CARNET VIRTUAL a partir del Excel de la jornada."""
+    from core.carnet import CarnetProcessor
+
+    processor = CarnetProcessor()
+    processor.detect_vaccines_in_file(args.input)
+    if not processor.vaccines_detected:
+        print("[ERROR] No se detectaron vacunas en el archivo.", file=sys.stderr)
+        return 1
+
+    # Lotes y vencimientos: --lote VACUNA=LOTE --vencimiento VACUNA=DD/MM/AAAA
+    lotes = dict(item.split("=", 1) for item in args.lote or [])
+    vencimientos = dict(item.split("=", 1) for item in args.vencimiento or [])
+
+    missing = []
+    for vaccine_id in processor.vaccines_detected:
+        lote = lotes.get(vaccine_id, "").strip().upper().replace(" ", "")
+        venc = processor.parse_and_format_date(vencimientos.get(vaccine_id, ""))
+        if not lote or not venc:
+            missing.append(vaccine_id)
+            continue
+        processor.lotes[vaccine_id] = lote
+        processor.vencimientos[vaccine_id] = venc
+
+    if missing:
+        print(
+            f"[ERROR] Falta lote o vencimiento válido para: {', '.join(missing)}",
+            file=sys.stderr
+        )
+        return 1
+
+    result = processor.process(args.input, args.output_dir or "")
+    print(f"[INFO] Pacientes: {result['total_rows']}  Aplicaciones: {result['total_applications']}")
+    print(f"[INFO] Archivo generado: {result['created']}")
+    return 0
+
+
+# ==================== PARSER ====================
+
+def _add_names_args(parser: argparse.ArgumentParser):
+    parser.add_argument("--names", nargs="+", help="Nombres, uno por argumento")
+    parser.add_argument("--names-file", help="Archivo de texto con un nombre por línea")
+
+
+def _add_split_mode_arg(parser: argparse.ArgumentParser):
+    parser.add_argument("--insert-pdf", dest="single_pass", action="store_false",
+                        help="Escribir cada página con insert_pdf en vez de copiar los objetos originales")
+
+
+def _add_save_profile_arg(parser: argparse.ArgumentParser):
+    from core.save_profiles import DEFAULT_SAVE_PROFILE, PROFILE_CHOICES
+    parser.add_argument("--save-profile", choices=PROFILE_CHOICES, default=DEFAULT_SAVE_PROFILE,
+                        help="Perfil de guardado: fast (rápido), balanced, smallest (más pequeño) "
+                             "o auto (según el PDF; por defecto)")
+
+
+def _add_copy_args(parser: argparse.ArgumentParser):
+    from core.copy_writer import COPY_MODES, DEFAULT_COPY_MODE, DEFAULT_WRITE_WORKERS
+    parser.add_argument("--copy-mode", choices=COPY_MODES, default=DEFAULT_COPY_MODE,
+                        help="auto: reflink si el disco lo permite, si no escribir; "
+                             "hardlink: enlaces a la primera copia (comparten contenido)")
+    parser.add_argument("--write-workers", type=int, default=DEFAULT_WRITE_WORKERS,
+                        help="Hilos que escriben las copias (1 = en serie)")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="pdftools",
+        description="Herramientas PDF en modo por lotes (sin interfaz gráfica)."
+    )
+    parser.add_argument("--timings", action="store_true",
+                        help="Mostrar al final el tiempo por etapa (abrir, insertar, guardar...)")
+    parser.add_argument("--profile", action="store_true",
+                        help="Guardar un perfil cProfile (.pstats) de la ejecución en data/profiles/ "
+                             "(también con PDFTOOLS_PROFILE=1)")
+    sub = parser.add_subparsers(dest="tool", metavar="<herramienta>", required=True)
+
+    p = sub.add_parser("merge", help="Unir varios PDFs en uno solo")
+    p.add_argument("inputs", nargs="+", help="PDFs a unir")
+    p.add_argument("-o", "--output", required=True, help="PDF resultante")
+    p.add_argument("--sort", action="store_true", help="Ordenar alfabéticamente (como la ventana)")
+    p.add_argument("--streaming", action="store_true", default=None,
+                   help="Unir por bloques con memoria acotada (automático si las entradas superan --memory-limit)")
+    p.add_argument("--in-memory", dest="streaming", action="store_false",
+                   help="Unir todo en memoria y guardar con garbage=4, aunque las entradas sean grandes")
+    p.add_argument("--memory-limit", type=int, metavar="MB",
+                   help="MB de entradas por bloque en la unión por bloques (por defecto 256)")
+    _add_save_profile_arg(p)
+    p.set_defaults(func=cmd_merge)
+
+    p = sub.add_parser("merge-groups", help="Unir PDFs de una carpeta agrupados por prefijo")
+    p.add_argument("folder", help="Carpeta con los PDFs")
+    p.add_argument("--groups", nargs="+", help="Solo estos prefijos")
+    p.add_argument("--workers", type=int, help="Procesos para unir grupos en paralelo (por defecto, uno por núcleo)")
+    p.add_argument("--undo", action="store_true", help="Deshacer la última unión de la carpeta (según su manifiesto)")
+    _add_save_profile_arg(p)
+    p.set_defaults(func=cmd_merge_groups)
+
+    p = sub.add_parser("split", help="Dividir un PDF en un archivo por página")
+    p.add_argument("input", help="PDF de entrada")
+    p.add_argument("-d", "--output-dir", help="Carpeta de salida (por defecto, la del PDF)")
+    p.add_argument("--prefix", default="", help="Prefijo de los nombres")
+    _add_names_args(p)
+    _add_split_mode_arg(p)
+    p.add_argument("--remove-original", action="store_true", help="Eliminar el PDF original al terminar")
+    _add_save_profile_arg(p)
+    p.set_defaults(func=cmd_split)
+
+    p = sub.add_parser("extract-pages", help="Extraer páginas por rangos (ej: 1-3,5)")
+    p.add_argument("input", help="PDF de entrada")
+    p.add_argument("ranges", nargs="?", default="", help="Rangos; vacío = todas las páginas")
+    p.add_argument("-d", "--output-dir", help="Carpeta de salida (por defecto, la del PDF)")
+    _add_split_mode_arg(p)
+    _add_save_profile_arg(p)
+    p.set_defaults(func=cmd_extract_pages)
+
+    p = sub.add_parser("split-orders", help="Separar órdenes nombrando cada página")
+    p.add_argument("input", help="PDF de entrada")
+    p.add_argument("-d", "--output-dir", help="Carpeta de salida (por defecto, la del PDF)")
+    p.add_argument("--prefix", default="", help="Prefijo de los nombres")
+    _add_names_args(p)
+    p.add_argument("--auto-names", action="store_true",
+                   help="Tomar los nombres del texto de cada página (documento o número de orden)")
+    p.add_argument("--pattern", action="append",
+                   help="Regex para --auto-names (se puede repetir; por defecto, los de la configuración)")
+    p.add_argument("--strict", action="store_true", help="Con --auto-names, no dividir si alguna página no coincide")
+    p.add_argument("--dry-run", action="store_true", help="Con --auto-names, solo mostrar los nombres encontrados")
+    _add_split_mode_arg(p)
+    _add_save_profile_arg(p)
+    p.set_defaults(func=cmd_split_orders)
+
+    p = sub.add_parser("multiply", help="Copiar un PDF de 1 página por cada nombre")
+    p.add_argument("input", help="PDF de 1 página")
+    p.add_argument("-d", "--output-dir", help="Carpeta de salida (por defecto, la del PDF)")
+    p.add_argument("--prefix", default="", help="Prefijo de los nombres")
+    _add_names_args(p)
+    _add_copy_args(p)
+    _add_save_profile_arg(p)
+    p.set_defaults(func=cmd_multiply)
+
+    p = sub.add_parser("delete-pages", help="Eliminar páginas de un PDF")
+    p.add_argument("input", help="PDF de entrada")
+    p.add_argument("pages", help="Páginas a eliminar (ej: 2,4-6)")
+    p.add_argument("-o", "--output", help="PDF resultante")
+    p.add_argument("-d", "--output-dir", help="Carpeta de salida (si no se indica --output)")
+    p.add_argument("--name", help="Nombre del PDF resultante (sin extensión)")
+    p.add_argument("--incremental", action="store_true",
+                   help="Copiar el PDF y agregar solo los cambios (muy rápido; el archivo no se achica)")
+    _add_save_profile_arg(p)
+    p.set_defaults(func=cmd_delete_pages)
+
+    p = sub.add_parser("validate-emails", help="Validar correos de un Excel")
+    p.add_argument("input", help="Archivo Excel")
+    p.add_argument("--workers", type=int, default=10, help="Hilos de validación")
+    p.set_defaults(func=cmd_validate_emails)
+
+    p = sub.add_parser("horus", help="Consultar afiliados en Horus Health")
+    p.add_argument("documents", nargs="*", help="Documentos TIPO+NÚMERO (ej: CC123456789)")
+    p.add_argument("--excel", help="Excel con documentos (fila 3, columnas C y D)")
+    p.add_argument("--email", help="Correo de acceso (obligatorio salvo con --export-only)")
+    p.add_argument("--password", help="Contraseña (o variable HORUS_PASSWORD)")
+    p.add_argument("-o", "--output", help="Excel (.xlsx) o CSV (.csv) de resultados")
+    p.add_argument("--rate", type=float, help="Consultas por segundo (por defecto, config.json o 2)")
+    p.add_argument("--burst", type=int, help="Consultas seguidas permitidas (por defecto 2)")
+    p.add_argument("--max-in-flight", type=int, help="Máximo de consultas esperando respuesta a la vez (por defecto 4)")
+    p.add_argument("--min-in-flight", type=int, help="Mínimo al que baja la concurrencia si la API se satura (por defecto 1)")
+    p.add_argument("--latency-target", type=float, help="Segundos: una respuesta más lenta baja la concurrencia (por defecto 3)")
+    p.add_argument("--cache-days", type=float, help="Días que se reutiliza una consulta guardada (por defecto, config.json o 30)")
+    p.add_argument("--refresh", action="store_true", help="Consultar todo aunque esté en la caché (y actualizarla)")
+    p.add_argument("--no-cache", action="store_true", help="No leer ni guardar la caché de afiliados")
+    p.add_argument("--resume", action="store_true", help="Continuar la última consulta que quedó sin terminar")
+    p.add_argument("--export-only", action="store_true", help="Exportar la última consulta desde su bitácora, sin consultar (requiere -o)")
+    p.set_defaults(func=cmd_horus)
+
+    p = sub.add_parser("carnet", help="Generar base CARNET VIRTUAL")
+    p.add_argument("input", help="Excel de la jornada")
+    p.add_argument("-d", "--output-dir", help="Carpeta de salida (por defecto, la del Excel)")
+    p.add_argument("--lote", nargs="+", metavar="VACUNA=LOTE", help="Lote por vacuna")
+    p.add_argument("--vencimiento", nargs="+", metavar="VACUNA=FECHA", help="Vencimiento por vacuna")
+    p.set_defaults(func=cmd_carnet)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from core.instrumentation import format_stats, profiling_enabled, run_scope
+
+    args = build_parser().parse_args(argv)
+    profile = args.profile or profiling_enabled()
+    stages = {}
+    try:
+        with run_scope(args.tool, profile=profile) as stages:
+            return args.func(args)
+    except (ValueError, RuntimeError, OSError) as e:
+        print(f"[ERROR] {e}", file=sys.stderr)
+        return 1
+    finally:
+        # Con perfil las etapas ya se mostraron junto a él
+        if args.timings and stages and not profile:
+            print(f"[INFO] Etapas de '{args.tool}':\n{format_stats(stages)}", file=sys.stderr)
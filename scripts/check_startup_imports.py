@@ -0,0 +1,84 @@
+"""
+Control del costo de arranque: importa core.app (lo mismo que main.py antes de
+mostrar la ventana) en un proceso limpio y falla si:
+
+  - se cargó alguna dependencia pesada que solo deben usar las herramientas
+    (fitz, pandas, openpyxl, dns, requests...), o
+  - el tiempo total de importación supera el presupuesto.
+
+Uso (desde la raíz del repositorio):
+    python scripts/check_startup_imports.py
+    python scripts/check_startup_imports.py --budget-ms 800
+
+Código de salida 0 si todo está dentro del presupuesto, 1 si no.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Módulos que no deben cargarse al arrancar (PIL no está: lo importa customtkinter)
+FORBIDDEN_MODULES = [
+    "fitz",
+    "pymupdf",
+    "pandas",
+    "numpy",
+    "openpyxl",
+    "dns",
+    "requests",
+]
+
+DEFAULT_BUDGET_MS = 1500
+
+_PROBE = """
+import json, sys, time
+t0 = time.perf_counter()
+import core.app
+elapsed = (time.perf_counter() - t0) * 1000
+print(json.dumps({"elapsed_ms": elapsed, "modules": sorted(sys.modules)}))
+"""
+
+
+def measure_startup_imports():
+    """Ejecuta la importación en un intérprete nuevo. Retorna (ms, módulos cargados)."""
+    result = subprocess.run(
+        [sys.executable, "-c", _PROBE],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    data = json.loads(result.stdout.strip().splitlines()[-1])
+    return data["elapsed_ms"], data["modules"]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Presupuesto de importaciones al arrancar")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS,
+                        help=f"Tiempo máximo de importación (por defecto {DEFAULT_BUDGET_MS} ms)")
+    args = parser.parse_args(argv)
+
+    elapsed_ms, modules = measure_startup_imports()
+    loaded = set(modules)
+    heavy = [m for m in FORBIDDEN_MODULES if m in loaded]
+
+    print(f"[INFO] Importación de core.app: {elapsed_ms:.0f} ms ({len(modules)} módulos)")
+
+    ok = True
+    if heavy:
+        print(f"[ERROR] Dependencias pesadas cargadas al arrancar: {', '.join(heavy)}")
+        ok = False
+    if elapsed_ms > args.budget_ms:
+        print(f"[ERROR] Se superó el presupuesto: {elapsed_ms:.0f} ms > {args.budget_ms:.0f} ms")
+        ok = False
+
+    if ok:
+        print("[INFO] Arranque dentro del presupuesto.")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,48 +1,11 @@
 import customtkinter as ctk
 from tkinter import filedialog, messagebox
-import pandas as pd
-from datetime import datetime
-import re
 import os
-from threading import Thread
+import threading
 from tools.vaccine_catalog import VACCINE_CATALOG
 
-# Nombres de meses en español
-MESES_ESP = {
-    1: "ENE", 2: "FEB", 3: "MAR", 4: "ABR", 5: "MAY", 6: "JUN",
-    7: "JUL", 8: "AGO", 9: "SEP", 10: "OCT", 11: "NOV", 12: "DIC"
-}
-
-# Columnas que deben ser numéricas en el Excel de salida
-NUMERIC_COLUMNS = [
-    'documento',
-    'telefono',
-    'c_desplazamiento',
-    'c_discapacidad',
-    'c_usuaria',
-    'dosis_aplicada',
-    'lote_jeringa',
-    'evento_postvacunal'
-]
-
-# Diccionario para normalización del nombre del brazo
-ARM_DICTIONARY = {
-    # Left arm variations / Variaciones brazo izquierdo
-    'IZQUIERDO': 'IZQUIERDO',
-    'IZQUIERDA': 'IZQUIERDO',
-    'IZQ': 'IZQUIERDO',
-    'IZ': 'IZQUIERDO',
-    'I': 'IZQUIERDO',
-    'IQ': 'IZQUIERDO',
-    
-    # Right arm variations / Variaciones brazo derecho
-    'DERECHO': 'DERECHO',
-    'DERECHA': 'DERECHO',
-    'DER': 'DERECHO',
-    'DE': 'DERECHO',
-    'D': 'DERECHO',
-    'DR': 'DERECHO',
-}
+from core.carnet import CarnetProcessor
+from core.jobs import get_runner
 
 
 class CarnetVirtualApp(ctk.CTkFrame):
@@ -54,19 +17,15 @@ class CarnetVirtualApp(ctk.CTkFrame):
         self.input_file_path = ""
         self.output_folder_path = ""
         
-        # Diccionarios dinámicos para lotes y vencimientos
-        self.lotes = {}
-        self.vencimientos = {}
-        
-        # Contadores dinámicos para estadísticas
-        self.vaccine_counts = {}
-        
-        # Vacunas detectadas en el archivo
-        self.vaccines_detected = []
+        # Lotes, vencimientos, contadores y vacunas detectadas
+        self.processor = CarnetProcessor(log=self._log_message)
         
         # Historial para deshacer
         self.last_operation = None
         
+        # Trabajo en segundo plano (core.jobs)
+        self.current_job = None
+        
         # Widgets dinámicos por vacuna
         self.vaccine_widgets = {}
         self.vaccine_entries = {}
@@ -179,18 +138,18 @@ class CarnetVirtualApp(ctk.CTkFrame):
         current_row = 2
         
         # Espaciador y título de biológicos
-        if self.vaccines_detected:
+        if self.processor.vaccines_detected:
             spacer = ctk.CTkFrame(self.top_frame, height=2)
             spacer.grid(row=current_row, column=0, columnspan=3)
             
-            if self.vaccines_detected[0] not in self.vaccine_widgets:
-                self.vaccine_widgets[self.vaccines_detected[0]] = []
-            self.vaccine_widgets[self.vaccines_detected[0]].append(spacer)
+            if self.processor.vaccines_detected[0] not in self.vaccine_widgets:
+                self.vaccine_widgets[self.processor.vaccines_detected[0]] = []
+            self.vaccine_widgets[self.processor.vaccines_detected[0]].append(spacer)
             
             current_row += 1
         
         # Crear campos para cada vacuna detectada
-        for vaccine_id in self.vaccines_detected:
+        for vaccine_id in self.processor.vaccines_detected:
             vaccine_info = VACCINE_CATALOG.get(vaccine_id)
             
             if not vaccine_info:
@@ -246,8 +205,8 @@ class CarnetVirtualApp(ctk.CTkFrame):
         # Espaciador
         spacer = ctk.CTkFrame(self.top_frame, height=2)
         spacer.grid(row=current_row, column=0, columnspan=3)
-        if self.vaccines_detected:
-            self.vaccine_widgets[self.vaccines_detected[0]].append(spacer)
+        if self.processor.vaccines_detected:
+            self.vaccine_widgets[self.processor.vaccines_detected[0]].append(spacer)
         current_row += 1
         
         # Botones de acción
@@ -255,8 +214,9 @@ class CarnetVirtualApp(ctk.CTkFrame):
         btn_frame.grid(row=current_row, column=0, columnspan=3, sticky="we", padx=6, pady=(0, 4))
         btn_frame.grid_columnconfigure(0, weight=1)
         btn_frame.grid_columnconfigure(1, weight=1)
-        if self.vaccines_detected:
-            self.vaccine_widgets[self.vaccines_detected[0]].append(btn_frame)
+        btn_frame.grid_columnconfigure(2, weight=1)
+        if self.processor.vaccines_detected:
+            self.vaccine_widgets[self.processor.vaccines_detected[0]].append(btn_frame)
         
         self.process_button = ctk.CTkButton(
             btn_frame,
@@ -275,79 +235,16 @@ class CarnetVirtualApp(ctk.CTkFrame):
         )
         self.undo_button.grid(row=0, column=1, padx=6, pady=4, sticky="we")
         self.undo_button.configure(state="disabled")
-    
-    # ==================== DETECCIÓN DE VACUNAS ====================
-    
-    def _identify_vaccine(self, vaccine_text):
-        """Identifica la vacuna a partir del texto usando el catálogo."""
-        vaccine_text_upper = self._clean_text(vaccine_text)
         
-        for vaccine_id, vaccine_info in VACCINE_CATALOG.items():
-            for keyword in vaccine_info['keywords']:
-                if keyword in vaccine_text_upper:
-                    return vaccine_id
-        
-        return 'UNKNOWN'
+        self.cancel_button = ctk.CTkButton(
+            btn_frame,
+            text="✖ Cancelar",
+            command=self._on_cancel,
+            fg_color="#d9534f"
+        )
+        self.cancel_button.grid(row=0, column=2, padx=6, pady=4, sticky="we")
+        self.cancel_button.configure(state="normal" if self.current_job else "disabled")
     
-    def _detect_vaccines_in_file(self, file_path):
-        """Detecta qué vacunas están presentes en el archivo Excel."""
-        try:
-            df = pd.read_excel(file_path)
-            
-            # Log de columnas encontradas para debugging
-            # self._log_message(f"📋 Columnas del archivo: {len(df.columns)}")
-            
-            # Buscar columna de vacunas
-            column_mapping = self._map_columns(df.columns.tolist())
-            
-            if 'vacuna' not in column_mapping:
-                self._log_message("⚠️ No se encontró columna de vacunas")
-                # Mostrar columnas disponibles para ayudar al usuario
-                self._log_message(f"   Columnas disponibles: {', '.join(df.columns.tolist()[:10])}...")
-                return
-            
-            vacuna_col = column_mapping['vacuna']
-            
-            # Revisar todas las vacunas en el archivo
-            vaccines_found = set()
-            
-            for value in df[vacuna_col].dropna():
-                # Parsear el texto para obtener TODAS las vacunas de la celda
-                biologicos = self._parse_biologicos(str(value))
-                
-                for biologico in biologicos:
-                    vaccine_id = self._identify_vaccine(biologico)
-                    if vaccine_id != 'UNKNOWN':
-                        vaccines_found.add(vaccine_id)
-            
-            # Ordenar por prioridad
-            self.vaccines_detected = sorted(list(vaccines_found))
-            
-            # Inicializar contadores
-            self.vaccine_counts = {v_id: 0 for v_id in self.vaccines_detected}
-            
-            # Log de detección
-            if self.vaccines_detected:
-                vaccine_names = [
-                    VACCINE_CATALOG[v_id]['display_name'] 
-                    for v_id in self.vaccines_detected
-                ]
-                self._log_message(f"🔍 Vacunas detectadas: {', '.join(vaccine_names)}")
-                
-                # Verificar columnas de brazo detectadas
-                for v_id in self.vaccines_detected:
-                    brazo_key = f'brazo_{v_id.lower()}'
-                    if brazo_key in column_mapping:
-                        pass
-                        # self._log_message(f"   ✅ Columna brazo {VACCINE_CATALOG[v_id]['display_name']}: '{column_mapping[brazo_key]}'")
-                    else:
-                        self._log_message(f"   ⚠️ Sin columna brazo para {VACCINE_CATALOG[v_id]['display_name']} (usará: {VACCINE_CATALOG[v_id]['default_arm']})")
-            else:
-                self._log_message("⚠️ No se detectaron vacunas conocidas en el archivo")
-            
-        except Exception as e:
-            self._log_message(f"⚠️ Error al detectar vacunas: {str(e)}")
-            self.vaccines_detected = []
     # ==================== MANEJADORES DE EVENTOS ====================
     
     def _on_select_input(self):
@@ -370,7 +267,7 @@ class CarnetVirtualApp(ctk.CTkFrame):
             self._log_message(f"📂 Archivo de entrada: {os.path.basename(file_path)}")
             
             # Detectar vacunas en el archivo
-            self._detect_vaccines_in_file(file_path)
+            self.processor.detect_vaccines_in_file(file_path)
             
             # Crear campos dinámicos
             self._create_vaccine_fields()
@@ -394,7 +291,7 @@ class CarnetVirtualApp(ctk.CTkFrame):
                 self._log_message(f"📂 Archivo cargado: {os.path.basename(typed_path)}")
                 
                 # Detectar vacunas
-                self._detect_vaccines_in_file(typed_path)
+                self.processor.detect_vaccines_in_file(typed_path)
                 
                 # Crear campos dinámicos
                 self._create_vaccine_fields()
@@ -423,7 +320,7 @@ class CarnetVirtualApp(ctk.CTkFrame):
             return
         
         # Capturar valores de lotes y vencimientos
-        for vaccine_id in self.vaccines_detected:
+        for vaccine_id in self.processor.vaccines_detected:
             lote_text = self.vaccine_entries[vaccine_id]['lote'].get().strip().upper()
             
             # Eliminar todos los espacios del lote
@@ -431,7 +328,7 @@ class CarnetVirtualApp(ctk.CTkFrame):
             
             venc_text = self.vaccine_entries[vaccine_id]['vencimiento'].get().strip()
             
-            venc_parsed = self._parse_and_format_date(venc_text)
+            venc_parsed = self.processor.parse_and_format_date(venc_text)
             
             if not venc_parsed:
                 vaccine_name = VACCINE_CATALOG[vaccine_id]['display_name']
@@ -439,19 +336,28 @@ class CarnetVirtualApp(ctk.CTkFrame):
                 self._log_message(f"❌ Error: Fecha de vencimiento {vaccine_name} inválida")
                 return
             
-            self.lotes[vaccine_id] = lote_text
-            self.vencimientos[vaccine_id] = venc_parsed
-        
-        # Reiniciar contadores
-        for vaccine_id in self.vaccines_detected:
-            self.vaccine_counts[vaccine_id] = 0
+            self.processor.lotes[vaccine_id] = lote_text
+            self.processor.vencimientos[vaccine_id] = venc_parsed
         
         # Deshabilitar botón
         self.process_button.configure(state="disabled", text="⏳ Procesando...")
-        
-        # Ejecutar en hilo separado
-        thread = Thread(target=self._process_data)
-        thread.start()
+        self.cancel_button.configure(state="normal")
+        
+        # Ejecutar en segundo plano
+        self.current_job = get_runner().submit(
+            self, self._process_data, self.input_file_path, self.output_entry.get().strip(),
+            name="Carnet Virtual",
+            on_progress=lambda value: self._update_progress(value, ""),
+            on_done=self._on_process_done,
+            on_error=self._on_process_error,
+            on_cancel=self._on_process_cancelled,
+        )
+    
+    def _on_cancel(self):
+        """Cancela el procesamiento en curso."""
+        if self.current_job:
+            self.current_job.cancel()
+            self.cancel_button.configure(state="disabled")
     
     def _on_undo(self):
         """Deshace la última operación eliminando el archivo creado."""
@@ -493,10 +399,10 @@ class CarnetVirtualApp(ctk.CTkFrame):
         if not self.input_entry.get().strip():
             errors.append("• Debe seleccionar un archivo de entrada")
         
-        if not self.vaccines_detected:
+        if not self.processor.vaccines_detected:
             errors.append("• No se detectaron vacunas en el archivo")
         
-        for vaccine_id in self.vaccines_detected:
+        for vaccine_id in self.processor.vaccines_detected:
             vaccine_name = VACCINE_CATALOG[vaccine_id]['display_name']
             
             if not self.vaccine_entries[vaccine_id]['lote'].get().strip():
@@ -514,7 +420,7 @@ class CarnetVirtualApp(ctk.CTkFrame):
         if not date_text:
             return
         
-        formatted_date = self._parse_and_format_date(date_text)
+        formatted_date = self.processor.parse_and_format_date(date_text)
         
         if formatted_date:
             entry_widget.delete(0, "end")
@@ -524,48 +430,13 @@ class CarnetVirtualApp(ctk.CTkFrame):
             entry_widget.configure(border_color="red")
             self._log_message(f"⚠️ Fecha inválida detectada: {date_text}")
     
-    def _parse_and_format_date(self, date_text):
-        """Parsea y formatea una fecha en múltiples formatos aceptados."""
-        if not date_text:
-            return None
-        
-        date_text = date_text.strip()
-        normalized = re.sub(r'[/\-\.]', ' ', date_text)
-        
-        formats_to_try = [
-            '%d %m %Y',
-            '%d/%m/%Y',
-            '%d-%m-%Y',
-            '%d %m %y',
-            '%d/%m/%y',
-            '%d-%m-%y',
-        ]
-        
-        try:
-            parsed_date = datetime.strptime(normalized, '%d %m %Y')
-            return parsed_date.strftime('%d/%m/%Y')
-        except ValueError:
-            pass
-        
-        try:
-            parsed_date = datetime.strptime(normalized, '%d %m %y')
-            return parsed_date.strftime('%d/%m/%Y')
-        except ValueError:
-            pass
-        
-        for fmt in formats_to_try:
-            try:
-                parsed_date = datetime.strptime(date_text, fmt)
-                return parsed_date.strftime('%d/%m/%Y')
-            except ValueError:
-                continue
-        
-        return None
-    
     # ==================== UTILIDADES DE UI ====================
     
     def _log_message(self, message):
-        """Agrega un mensaje al registro."""
+        """Agrega un mensaje al registro (desde cualquier hilo)."""
+        if threading.current_thread() is not threading.main_thread():
+            self.after(0, self._log_message, message)
+            return
         self.log_text.insert("end", f"{message}\n")
         self.log_text.see("end")
     
@@ -583,528 +454,72 @@ class CarnetVirtualApp(ctk.CTkFrame):
 
     # ==================== PROCESAMIENTO DE DATOS ====================
     
-    def _process_data(self):
-        """Procesa los datos de vacunación."""
-        try:
-            self._log_message("🚀 Iniciando procesamiento de datos...")
-            self._update_progress(0.1, "📂 Leyendo archivo de entrada...")
-            
-            df_input = pd.read_excel(self.input_file_path)
-            total_rows = len(df_input)
-            self._log_message(f"✅ Archivo leído correctamente. Total de registros: {total_rows}")
-            
-            self._update_progress(0.2, "🔍 Mapeando columnas...")
-            
-            column_mapping = self._map_columns(df_input.columns.tolist())
-            self._log_message(f"📋 Columnas mapeadas: {len(column_mapping)}")
-            
-            first_date = None
-            if 'fecha_atencion' in column_mapping and len(df_input) > 0:
-                first_date = df_input.iloc[0].get(column_mapping['fecha_atencion'], None)
-                self._log_message(f"📅 Fecha identificada: {first_date}")
-            
-            self._update_progress(0.3, "🔄 Procesando registros...")
-            
-            processed_rows = []
-            
-            for index, row in df_input.iterrows():
-                progress = 0.3 + (0.5 * (index + 1) / total_rows)
-                self._update_progress(progress, f"🔄 Procesando registro {index + 1} de {total_rows}...")
-                
-                rows = self._process_row(row, column_mapping)
-                processed_rows.extend(rows)
-            
-            self._log_message(f"✅ Registros procesados: {len(processed_rows)}")
-            
-            self._update_progress(0.85, "💾 Generando archivo de salida...")
-            
-            output_path = self._generate_output_filename(
-                self.input_file_path,
-                first_date
-            )
-            self._log_message(f"📁 Generando: {os.path.basename(output_path)}")
-            
-            output_columns = [
-                'fecha_vacunacion', 'tipo_documento', 'documento', 'fecha_nacimiento',
-                'sexo', 'primer_apellido', 'segundo_apellido', 'nombres', 'regimen',
-                'aseguradora', 'municipio', 'area_residencia', 'barrio', 'direccion',
-                'eps', 'telefono', 'grupo_etnico', 'c_desplazamiento', 'c_discapacidad',
-                'correo', 'c_usuaria', 'fecha_parto', 'tipo_poblacion', 'dosis_aplicada',
-                'biologico', 'lote_biologico', 'jeringa', 'lote_jeringa',
-                'evento_postvacunal', 'vacunador', 'municipio_reporta', 'novedad',
-                'desc_novedad', 'modalidad_vacunacion', 'nota_enfermeria', 'jornada'
-            ]
-            
-            df_output = pd.DataFrame(processed_rows, columns=output_columns)
-            
-            self._create_excel_file(df_output, output_path)
-            
-            self._update_progress(1.0, "✅ ¡Proceso completado exitosamente!")
-            
-            # Guardar para deshacer
-            self.last_operation = {
-                'created': output_path,
-                'total_rows': total_rows,
-                'total_applications': len(df_output)
-            }
-            self.undo_button.configure(state="normal")
-            
-            # Mostrar resumen
-            self._log_message("=" * 60)
-            self._log_message("📊 RESUMEN DEL PROCESO:")
-            self._log_message(f"   • Pacientes procesados: {total_rows}")
-            self._log_message(f"   • Total aplicaciones: {len(df_output)}")
-            
-            summary_parts = []
-            for vaccine_id, count in self.vaccine_counts.items():
-                if count > 0:
-                    vaccine_name = VACCINE_CATALOG[vaccine_id]['keywords'][0]
-                    self._log_message(f"   • {vaccine_name}: {count}")
-                    summary_parts.append(f"{vaccine_name}: {count}")
-            
-            self._log_message(f"   • Archivo generado: {os.path.basename(output_path)}")
-            self._log_message("=" * 60)
-            self._log_message("✅ ¡PROCESO COMPLETADO EXITOSAMENTE!")
-            
-            # Mensaje de resumen
-            summary_text = "\n   • ".join(summary_parts) if summary_parts else "Sin vacunas procesadas"
-            
-            self.after(0, lambda: messagebox.showinfo(
-                "Proceso Completado",
-                f"¡El archivo se ha generado correctamente!\n\n"
-                f"👥 Pacientes procesados: {total_rows}\n"
-                f"💉 Total aplicaciones: {len(df_output)}\n\n"
-                f"   • {summary_text}\n\n"
-                f"📁 Archivo:\n{os.path.basename(output_path)}\n\n"
-                f"📍 Ubicación:\n{os.path.dirname(output_path)}"
-            ))
-            
-        except FileNotFoundError:
-            self._log_message(f"❌ Error: No se encontró el archivo de entrada")
-            self.after(0, lambda: messagebox.showerror("Error", "No se encontró el archivo de entrada"))
-        except Exception as e:
-            self._log_message(f"❌ Error durante el procesamiento: {str(e)}")
-            self.after(0, lambda: messagebox.showerror("Error", f"Error durante el procesamiento:\n{str(e)}"))
-        finally:
-            self.after(0, lambda: self.process_button.configure(
-                state="normal",
-                text="🚀 Procesar Datos"
-            ))
-    
-    def _generate_output_filename(self, input_path, date_from_data):
-        """Genera el nombre del archivo de salida basado en la fecha y vacunas detectadas."""
-        output_dir = self.output_entry.get().strip()
-        if not output_dir:
-            output_dir = os.path.dirname(input_path)
-        
-        try:
-            if isinstance(date_from_data, datetime):
-                day = date_from_data.day
-                month = date_from_data.month
-            elif isinstance(date_from_data, str):
-                date_from_data = str(date_from_data).strip()
-                
-                for fmt in ['%d/%m/%Y', '%d-%m-%Y', '%Y-%m-%d', '%d %m %Y']:
-                    try:
-                        parsed_date = datetime.strptime(date_from_data, fmt)
-                        day = parsed_date.day
-                        month = parsed_date.month
-                        break
-                    except ValueError:
-                        continue
-                else:
-                    day = datetime.now().day
-                    month = datetime.now().month
-            else:
-                day = datetime.now().day
-                month = datetime.now().month
-        except Exception:
-            day = datetime.now().day
-            month = datetime.now().month
-        
-        month_name = MESES_ESP.get(month, "MES")
-        
-        # Generar nombre según vacunas detectadas
-        vaccine_names = [
-            VACCINE_CATALOG[v_id]['keywords'][0] 
-            for v_id in self.vaccines_detected
-        ]
-        
-        vaccine_str = " - ".join(vaccine_names) if vaccine_names else "VACUNAS"
-        
-        filename = f"BASE CARNET VIRTUAL [{vaccine_str}] DIA {day} {month_name}.xlsx"
-        full_path = os.path.join(output_dir, filename)
-        
-        return full_path
-    
-    def _create_excel_file(self, df, output_path):
-        """Crea archivo Excel con formato correcto."""
-        from openpyxl import Workbook
-        from openpyxl.styles import Font, Alignment, Border, Side
-        
-        self._log_message("📝 Creando archivo Excel...")
-        
-        workbook = Workbook()
-        worksheet = workbook.active
-        worksheet.title = "Datos Vacunación"
-        
-        header_font = Font(name='Calibri', size=11, bold=True)
-        header_alignment = Alignment(horizontal='left', vertical='center', wrap_text=False)
-        
-        cell_font = Font(name='Calibri', size=10)
-        cell_alignment = Alignment(horizontal='left', vertical='center')
-        
-        thin_border = Border(
-            left=Side(style='thin'),
-            right=Side(style='thin'),
-            top=Side(style='thin'),
-            bottom=Side(style='thin')
-        )
-        
-        headers = df.columns.tolist()
-        for col_idx, header in enumerate(headers, 1):
-            cell = worksheet.cell(row=1, column=col_idx, value=header)
-            cell.font = header_font
-            cell.alignment = header_alignment
-            cell.border = thin_border
-        
-        numeric_col_indices = set()
-        for idx, header in enumerate(headers, 1):
-            if header in NUMERIC_COLUMNS:
-                numeric_col_indices.add(idx)
-        
-        for row_idx, row in enumerate(df.values, 2):
-            for col_idx, value in enumerate(row, 1):
-                if col_idx in numeric_col_indices and value:
-                    try:
-                        numeric_value = int(re.sub(r'[^\d]', '', str(value)))
-                        cell = worksheet.cell(row=row_idx, column=col_idx, value=numeric_value)
-                    except (ValueError, TypeError):
-                        cell = worksheet.cell(row=row_idx, column=col_idx, value=value)
-                else:
-                    cell = worksheet.cell(row=row_idx, column=col_idx, value=value)
-                
-                cell.font = cell_font
-                cell.alignment = cell_alignment
-                cell.border = thin_border
-        
-        column_widths = {
-            'fecha_vacunacion': 15, 'tipo_documento': 12, 'documento': 15,
-            'fecha_nacimiento': 15, 'sexo': 12, 'primer_apellido': 18,
-            'segundo_apellido': 18, 'nombres': 25, 'regimen': 15,
-            'aseguradora': 20, 'municipio': 12, 'area_residencia': 12,
-            'barrio': 20, 'direccion': 30, 'eps': 20, 'telefono': 15,
-            'grupo_etnico': 12, 'c_desplazamiento': 14, 'c_discapacidad': 14,
-            'correo': 35, 'c_usuaria': 10, 'fecha_parto': 12,
-            'tipo_poblacion': 12, 'dosis_aplicada': 12, 'biologico': 20,
-            'lote_biologico': 15, 'jeringa': 20, 'lote_jeringa': 12,
-            'evento_postvacunal': 16, 'vacunador': 15, 'municipio_reporta': 15,
-            'novedad': 12, 'desc_novedad': 15, 'modalidad_vacunacion': 18,
-            'nota_enfermeria': 80, 'jornada': 25
+    def _process_data(self, job, input_path, output_dir):
+        """Procesa los datos de vacunación (trabajo en segundo plano)."""
+        return self.processor.process(input_path, output_dir, progress_callback=job.progress)
+    
+    def _job_finished(self):
+        """Restablece el botón al terminar el trabajo."""
+        self.current_job = None
+        self.process_button.configure(state="normal", text="🚀 Procesar Datos")
+        self.cancel_button.configure(state="disabled")
+    
+    def _on_process_done(self, result):
+        """Muestra el resumen del proceso."""
+        self._job_finished()
+        
+        output_path = result['created']
+        total_rows = result['total_rows']
+        total_applications = result['total_applications']
+        
+        # Guardar para deshacer
+        self.last_operation = {
+            'created': output_path,
+            'total_rows': total_rows,
+            'total_applications': total_applications
         }
-        
-        for col_idx, header in enumerate(headers, 1):
-            col_letter = worksheet.cell(row=1, column=col_idx).column_letter
-            width = column_widths.get(header, 15)
-            worksheet.column_dimensions[col_letter].width = width
-        
-        worksheet.freeze_panes = 'A2'
-        
-        workbook.save(output_path)
-        
-        self._log_message(f"✅ Archivo Excel creado: {os.path.basename(output_path)}")
-    
-    # ==================== PROCESAMIENTO DE FILAS ====================
-    
-    def _map_columns(self, input_columns):
-        """Mapea nombres de columnas de entrada a nombres esperados."""
-        column_mapping = {}
-        
-        for col in input_columns:
-            col_upper = str(col).upper().strip()
-            
-            if 'FECHA' in col_upper and 'ATENCION' in col_upper:
-                column_mapping['fecha_atencion'] = col
-            elif 'TIPO' in col_upper and 'DOCUMENTO' in col_upper:
-                column_mapping['tipo_documento'] = col
-            elif 'NUMERO' in col_upper and 'DOCUMENTO' in col_upper:
-                column_mapping['numero_documento'] = col
-            elif 'PRIMER NOMBRE' in col_upper or col_upper == 'PRIMER NOMBRE':
-                column_mapping['primer_nombre'] = col
-            elif 'SEGUNDO NOMBRE' in col_upper or col_upper == 'SEGUNDO NOMBRE':
-                column_mapping['segundo_nombre'] = col
-            elif 'PRIMER APELLIDO' in col_upper or col_upper == 'PRIMER APELLIDO':
-                column_mapping['primer_apellido'] = col
-            elif 'SEGUNDO APELLIDO' in col_upper or col_upper == 'SEGUNDO APELLIDO':
-                column_mapping['segundo_apellido'] = col
-            elif 'FECHA' in col_upper and 'NACIMIENTO' in col_upper:
-                column_mapping['fecha_nacimiento'] = col
-            elif 'TELEFON' in col_upper or 'NUMERO TELEFONICO' in col_upper:
-                column_mapping['telefono'] = col
-            elif 'CORREO' in col_upper:
-                column_mapping['correo'] = col
-            elif 'DIRECC' in col_upper:
-                column_mapping['direccion'] = col
-            elif 'BARRIO' in col_upper:
-                column_mapping['barrio'] = col
-            elif col_upper == 'EPS':
-                column_mapping['eps'] = col
-            elif 'SEXO' in col_upper:
-                column_mapping['sexo'] = col
-            elif 'VACUNA' in col_upper and 'NOMBRE' in col_upper:
-                column_mapping['vacuna'] = col
-            elif 'JORNADA' in col_upper or 'LUGAR' in col_upper:
-                column_mapping['jornada'] = col
-        
-        # Mapear columnas de brazo dinámicamente buscando coincidencias con keywords del catálogo
-        for col in input_columns:
-            col_upper = str(col).upper().strip()
-            
-            # Buscar en cada vacuna del catálogo
-            for vaccine_id, vaccine_info in VACCINE_CATALOG.items():
-                # Ya encontramos esta columna de brazo, saltar
-                if f'brazo_{vaccine_id.lower()}' in column_mapping:
-                    continue
-                
-                # Buscar coincidencia con cualquier keyword de la vacuna
-                for keyword in vaccine_info['keywords']:
-                    # La columna contiene el keyword de la vacuna
-                    if keyword in col_upper:
-                        # Verificar que NO sea la columna principal de vacunas
-                        if 'NOMBRE' not in col_upper and 'VACUNA' not in col_upper:
-                            column_mapping[f'brazo_{vaccine_id.lower()}'] = col
-                            # self._log_message(f"   📍 Columna brazo detectada: '{col}' → {vaccine_info['display_name']}")
-                            break
-                
-                # Si ya encontramos, salir del loop de keywords
-                if f'brazo_{vaccine_id.lower()}' in column_mapping:
-                    break
-        
-        return column_mapping
-    
-    def _process_row(self, row, column_mapping):
-        """Procesa una fila y retorna una o más filas de salida."""
-        vacuna_texto = row.get(column_mapping.get('vacuna', ''), '')
-        biologicos = self._parse_biologicos(vacuna_texto)
-        
-        if not biologicos:
-            biologicos = ['SIN ESPECIFICAR']
-        
-        # Datos comunes del paciente
-        fecha_vac = self._format_date(row.get(column_mapping.get('fecha_atencion', ''), ''))
-        tipo_doc = self._clean_text(row.get(column_mapping.get('tipo_documento', ''), ''))
-        documento = self._clean_document(row.get(column_mapping.get('numero_documento', ''), ''))
-        fecha_nac = self._format_date(row.get(column_mapping.get('fecha_nacimiento', ''), ''))
-        
-        sexo_raw = row.get(column_mapping.get('sexo', ''), '')
-        sexo = self._translate_sex(sexo_raw)
-        
-        primer_apellido = self._clean_text(row.get(column_mapping.get('primer_apellido', ''), ''))
-        segundo_apellido = self._clean_text(row.get(column_mapping.get('segundo_apellido', ''), ''))
-        nombres = self._get_full_name(
-            row.get(column_mapping.get('primer_nombre', ''), ''),
-            row.get(column_mapping.get('segundo_nombre', ''), '')
-        )
-        barrio = self._clean_text(row.get(column_mapping.get('barrio', ''), ''))
-        direccion = self._clean_text(row.get(column_mapping.get('direccion', ''), ''))
-        eps = self._clean_text(row.get(column_mapping.get('eps', ''), ''))
-        telefono = self._clean_document(row.get(column_mapping.get('telefono', ''), ''))
-        correo = self._clean_text(row.get(column_mapping.get('correo', ''), ''))
-        jornada = self._clean_text(row.get(column_mapping.get('jornada', ''), ''))
-        
-        output_rows = []
-        
-        for biologico_raw in biologicos:
-            biologico_raw = self._clean_text(biologico_raw)
-            vaccine_id = self._identify_vaccine(biologico_raw)
-            
-            if vaccine_id == 'UNKNOWN':
-                continue
-            
-            vaccine_info = VACCINE_CATALOG.get(vaccine_id)
-            
-            if not vaccine_info:
-                continue
-            
-            # Obtener lote y vencimiento
-            lote = self.lotes.get(vaccine_id, '')
-            vencimiento = self.vencimientos.get(vaccine_id, '')
-            
-            # Obtener brazo
-            brazo_col = column_mapping.get(f'brazo_{vaccine_id.lower()}')
-            if brazo_col:
-                brazo_raw = row.get(brazo_col, vaccine_info['default_arm'])
-                brazo = self._normalize_arm(brazo_raw)
-            else:
-                brazo = vaccine_info['default_arm']
-            
-            # Nombre del biológico
-            biologico_display = vaccine_info['display_name']
-            
-            # Jeringa
-            jeringa = vaccine_info.get('jeringa', 'JERINGA PRELLENADA')
-            
-            # Incrementar contador
-            self.vaccine_counts[vaccine_id] += 1
-            
-            # Generar nota de enfermería
-            nota = self._generate_nursing_note(vaccine_id, lote, vencimiento, brazo)
-            
-            output_row = {
-                'fecha_vacunacion': fecha_vac,
-                'tipo_documento': tipo_doc,
-                'documento': documento,
-                'fecha_nacimiento': fecha_nac,
-                'sexo': sexo,
-                'primer_apellido': primer_apellido,
-                'segundo_apellido': segundo_apellido,
-                'nombres': nombres,
-                'regimen': '',
-                'aseguradora': '',
-                'municipio': 'CALI',
-                'area_residencia': 'URBANA',
-                'barrio': barrio,
-                'direccion': direccion,
-                'eps': eps,
-                'telefono': telefono,
-                'grupo_etnico': 'NINGUNO',
-                'c_desplazamiento': '0',
-                'c_discapacidad': '0',
-                'correo': correo,
-                'c_usuaria': '0',
-                'fecha_parto': 'NINGUNO',
-                'tipo_poblacion': 'ADULTO',
-                'dosis_aplicada': '1',
-                'biologico': biologico_display,
-                'lote_biologico': lote,
-                'jeringa': jeringa,
-                'lote_jeringa': '0',
-                'evento_postvacunal': '0',
-                'vacunador': '* AUXILIAR',
-                'municipio_reporta': 'CALI',
-                'novedad': 'NINGUNO',
-                'desc_novedad': 'SIN NOVEDAD',
-                'modalidad_vacunacion': 'EXTRAMURAL',
-                'nota_enfermeria': nota,
-                'jornada': jornada
-            }
-            
-            output_rows.append(output_row)
-        
-        return output_rows
-    
-    def _generate_nursing_note(self, vaccine_id, lote, vencimiento, brazo):
-        """Genera la nota de enfermería usando información del catálogo."""
-        vaccine_info = VACCINE_CATALOG.get(vaccine_id, {})
-        vaccine_desc = vaccine_info.get('description', 'vacuna no especificada')
-        brazo_text = brazo.upper() if brazo else "IZQUIERDO"
-        
-        note = (
-            f"Asiste usuario para aplicación de vacuna contra {vaccine_desc}, "
-            f"jeringa prellenada, lote {lote}, con fecha de vencimiento {vencimiento}. "
-            f"Se brinda explicación del procedimiento y se informa sobre posibles efectos posvacunales. "
-            f"Se realiza administración del biológico en región deltoides de brazo {brazo_text.lower()} sin incidencias. "
-            f"Se entrega carnet de vacunas debidamente diligenciado. "
-            f"Paciente refiere haber comprendido la información proporcionada."
+        self.undo_button.configure(state="normal")
+        
+        # Mostrar resumen
+        self._log_message("=" * 60)
+        self._log_message("📊 RESUMEN DEL PROCESO:")
+        self._log_message(f"   • Pacientes procesados: {total_rows}")
+        self._log_message(f"   • Total aplicaciones: {total_applications}")
+        
+        summary_parts = []
+        for vaccine_id, count in result['vaccine_counts'].items():
+            if count > 0:
+                vaccine_name = VACCINE_CATALOG[vaccine_id]['keywords'][0]
+                self._log_message(f"   • {vaccine_name}: {count}")
+                summary_parts.append(f"{vaccine_name}: {count}")
+        
+        self._log_message(f"   • Archivo generado: {os.path.basename(output_path)}")
+        self._log_message("=" * 60)
+        self._log_message("✅ ¡PROCESO COMPLETADO EXITOSAMENTE!")
+        
+        # Mensaje de resumen
+        summary_text = "\n   • ".join(summary_parts) if summary_parts else "Sin vacunas procesadas"
+        
+        messagebox.showinfo(
+            "Proceso Completado",
+            f"¡El archivo se ha generado correctamente!\n\n"
+            f"👥 Pacientes procesados: {total_rows}\n"
+            f"💉 Total aplicaciones: {total_applications}\n\n"
+            f"   • {summary_text}\n\n"
+            f"📁 Archivo:\n{os.path.basename(output_path)}\n\n"
+            f"📍 Ubicación:\n{os.path.dirname(output_path)}"
         )
-        
-        return note
-    
-    # ==================== UTILIDADES DE PROCESAMIENTO ====================
-    
-    def _clean_text(self, text):
-        """Elimina espacios extra y convierte a mayúsculas."""
-        if pd.isna(text) or text is None:
-            return ""
-        text = str(text).strip()
-        text = re.sub(r'\s+', ' ', text)
-        return text.upper()
-    
-    def _clean_document(self, documento):
-        """Limpia número de documento y retorna como string numérico."""
-        if pd.isna(documento) or documento is None:
-            return ""
-        doc_clean = re.sub(r'[^\d]', '', str(documento))
-        return doc_clean
     
-    def _normalize_arm(self, arm_text):
-        """Normaliza nombre del brazo usando diccionario."""
-        if pd.isna(arm_text) or arm_text is None:
-            return "IZQUIERDO"
-        
-        arm_clean = self._clean_text(arm_text)
-        
-        if not arm_clean:
-            return "IZQUIERDO"
-        
-        if arm_clean in ARM_DICTIONARY:
-            return ARM_DICTIONARY[arm_clean]
-        
-        for key, value in ARM_DICTIONARY.items():
-            if key in arm_clean or arm_clean in key:
-                return value
-        
-        return arm_clean
-    
-    def _translate_sex(self, sexo):
-        """Traduce sexo de MASCULINO/FEMENINO a HOMBRE/MUJER."""
-        sexo_upper = self._clean_text(sexo)
-        
-        if 'MASCULINO' in sexo_upper or sexo_upper == 'M':
-            return 'HOMBRE'
-        elif 'FEMENINO' in sexo_upper or sexo_upper == 'F':
-            return 'MUJER'
+    def _on_process_error(self, e):
+        self._job_finished()
+        if isinstance(e, FileNotFoundError):
+            self._log_message(f"❌ Error: No se encontró el archivo de entrada")
+            messagebox.showerror("Error", "No se encontró el archivo de entrada")
         else:
-            return sexo_upper
-    
-    def _format_date(self, date_value):
-        """Formatea fecha a DD/MM/YYYY."""
-        if pd.isna(date_value) or date_value is None:
-            return ""
-        
-        try:
-            if isinstance(date_value, datetime):
-                return date_value.strftime('%d/%m/%Y')
-            elif isinstance(date_value, str):
-                formatted = self._parse_and_format_date(date_value)
-                if formatted:
-                    return formatted
-                return date_value
-            return str(date_value)
-        except Exception:
-            return str(date_value)
-    
-    def _get_full_name(self, primer_nombre, segundo_nombre):
-        """Combina primer y segundo nombre."""
-        primer = self._clean_text(primer_nombre)
-        segundo = self._clean_text(segundo_nombre)
-        
-        if segundo:
-            return f"{primer} {segundo}"
-        return primer
+            self._log_message(f"❌ Error durante el procesamiento: {str(e)}")
+            messagebox.showerror("Error", f"Error durante el procesamiento:\n{str(e)}")
     
-    def _parse_biologicos(self, vacuna_texto):
-        """Analiza texto de vacuna para extraer biológicos individuales."""
-        if pd.isna(vacuna_texto) or vacuna_texto is None:
-            return []
-        
-        vacuna_texto = self._clean_text(vacuna_texto)
-        
-        if " - " in vacuna_texto:
-            parts = vacuna_texto.split(" - ")
-        elif "-" in vacuna_texto and not vacuna_texto.startswith("-"):
-            parts = vacuna_texto.split("-")
-        elif "/" in vacuna_texto:
-            parts = vacuna_texto.split("/")
-        elif "," in vacuna_texto:
-            parts = vacuna_texto.split(",")
-        else:
-            parts = [vacuna_texto]
-        
-        biologicos = []
-        for part in parts:
-            part = part.strip()
-            if part:
-                biologicos.append(part)
-        
-        return biologicos
+    def _on_process_cancelled(self):
+        self._job_finished()
+        self._update_progress(0, "")
+        self._log_message("⏹️ Proceso cancelado")
@@ -1,13 +1,14 @@
 import customtkinter as ctk
 from tkinter import ttk, messagebox, filedialog
 import tkinter as tk
-import requests
-import threading
-import time
-import random
-from openpyxl import load_workbook, Workbook
 import os
 
+from core import horus as horus_api
+from core.affiliate_cache import get_affiliate_cache, ttl_seconds
+from core.horus_engine import load_limits, query_affiliates
+from core.horus_journal import BatchJournal, find_unfinished
+from core.jobs import Job, UiQueue, get_runner
+
 class HorusApp(ctk. CTkFrame):
     """
     Aplicación para consulta de afiliados en Horus Health. 
@@ -15,17 +16,25 @@ class HorusApp(ctk. CTkFrame):
     """
     
     # Constantes de la API
-    DOC_TYPES = {"CC": 1, "TI": 2, "RC": 3}
-    LOGIN_URL = "https://backend.horus-health.com/api/auth/validar-usuario"
-    BASE_URL = "https://backend.horus-health.com/api/afiliados/consultar-afiliado"
+    DOC_TYPES = horus_api.DOC_TYPES
+    LOGIN_URL = horus_api.LOGIN_URL
+    BASE_URL = horus_api.BASE_URL
     
     def __init__(self, master, go_home=None):
         super().__init__(master)
         
         # ===== ESTADO DE LA APLICACIÓN =====
         self. token = None
+        self.client = horus_api.HorusClient()  # Sesión HTTP compartida (keep-alive + reintentos)
         self.excel_docs = []
+        self.excel_doc_set = set()  # Los mismos documentos, para omitir duplicados al importar
+        self.results = horus_api.ResultStore()  # Resultados por columnas (importar / exportar)
         self. is_processing = False
+        self.current_job = None
+        self.query_stats = {}  # "cached" / "queried" de la última consulta
+        self.journal = None    # Bitácora en disco del lote actual (core.horus_journal)
+        self.results_queue = None  # Filas que llegan de las consultas (se insertan por lotes)
+        self.results_count = 0
         
         # Variables observables
         self.input_mode_var = ctk.StringVar(value="Manual")
@@ -154,6 +163,27 @@ class HorusApp(ctk. CTkFrame):
         )
         self.clear_button.grid(row=0, column=2, padx=6, pady=4, sticky="we")
         
+        self.cancel_button = ctk.CTkButton(
+            btn_frame,
+            text="Cancelar",
+            command=self._on_cancel,
+            fg_color="#d9534f"
+        )
+        self.cancel_button.grid(row=0, column=3, padx=6, pady=4, sticky="we")
+        self.cancel_button.configure(state="disabled")
+        
+        # Consultar todo aunque esté en la caché (core.affiliate_cache)
+        self.force_refresh_var = ctk.BooleanVar(value=False)
+        chk_force_refresh = ctk.CTkCheckBox(
+            btn_frame,
+            text="Ignorar caché",
+            variable=self.force_refresh_var,
+            font=ctk.CTkFont(size=11),
+            checkbox_width=18,
+            checkbox_height=18
+        )
+        chk_force_refresh.grid(row=0, column=4, padx=6, pady=4, sticky="w")
+        
         input_frame.grid_columnconfigure(1, weight=1)
         
         # ===== PANEL DE ENTRADA DE DOCUMENTOS =====
@@ -338,40 +368,15 @@ class HorusApp(ctk. CTkFrame):
     def _load_excel_file(self, file_path):
         """Carga documentos desde archivo Excel."""
         try:
-            wb = load_workbook(filename=file_path, read_only=True, data_only=True)
-            ws = wb.active
-            
-            loaded = []
-            skipped = 0
-            
-            # Crear conjunto de documentos existentes para evitar duplicados
-            existing_set = set()
-            existing_set.update([d.strip() for d in self.excel_docs if d and d.strip()])
-            
-            # Incluir documentos en la tabla
-            try:
-                for item in self.results_table.get_children():
-                    vals = self.results_table.item(item, "values")
-                    if vals and vals[0]: 
-                        existing_set.add(str(vals[0]).strip())
-            except Exception: 
-                pass
+            # Documentos ya importados o con resultado: se omiten (sin recorrer la tabla)
+            existing_set = self.excel_doc_set.union(self.results.documents)
             
             # Leer filas del Excel (desde fila 3, columnas C y D)
-            for row in ws.iter_rows(min_row=3, values_only=True):
-                col_c = "" if len(row) < 3 or row[2] is None else str(row[2])
-                col_d = "" if len(row) < 4 or row[3] is None else str(row[3])
-                val = f"{col_c}{col_d}".strip()
-                
-                if val:
-                    if val in existing_set:
-                        skipped += 1
-                    else:
-                        loaded. append(val)
-                        existing_set.add(val)
+            loaded, skipped = horus_api.read_documents_from_excel(file_path, existing_set)
             
             # Agregar nuevos documentos
             self.excel_docs.extend(loaded)
+            self.excel_doc_set.update(loaded)
             
             # Actualizar label de archivo
             self.excel_file_label.configure(
@@ -411,6 +416,9 @@ class HorusApp(ctk. CTkFrame):
         
         # Limpiar estado
         self.excel_docs.clear()
+        self.excel_doc_set.clear()
+        self.results.clear()
+        self.journal = None
         self.excel_file_label.configure(text="(ninguno)", text_color="gray")
         self.counter_label.configure(text="0 registros")
         self.progressbar.set(0)
@@ -429,14 +437,11 @@ class HorusApp(ctk. CTkFrame):
             messagebox. showwarning("Campos incompletos", "Debes ingresar correo y contraseña.")
             return
         
-        payload = {"email": email, "password": password}
-        
         try: 
-            response = requests.post(self.LOGIN_URL, json=payload, timeout=10)
-            data = response.json()
+            token = self.client.login(email, password)
             
-            if "token" in data:
-                self. token = data["token"]
+            if token:
+                self.token = token
                 self.status_label.configure(text="🟢 CONECTADO", text_color="green")
                 messagebox.showinfo("Conectado", "✓ Inicio de sesión exitoso.")
             else:
@@ -446,6 +451,7 @@ class HorusApp(ctk. CTkFrame):
                 
         except Exception as e:
             self.token = None
+            self.client.set_token(None)
             self. status_label.configure(text="⚫ DESCONECTADO", text_color="red")
             messagebox.showerror("Error", f"No se pudo conectar:\n{str(e)}")
     
@@ -463,53 +469,7 @@ class HorusApp(ctk. CTkFrame):
     
     def _query_affiliate(self, document):
         """Consulta un afiliado individual en la API."""
-        if not self.token:
-            return document, "DESCONECTADO", "", ""
-        
-        # Extraer tipo y número del documento
-        doc_type = ''.join([c for c in document if c. isalpha()]).upper()
-        doc_number = ''.join([c for c in document if c.isdigit()])
-        
-        type_id = self.DOC_TYPES.get(doc_type)
-        if not type_id or not doc_number:
-            return document, "REVISAR (formato inválido)", "", ""
-        
-        headers = {
-            "Authorization": f"Bearer {self.token}",
-            "Accept": "application/json"
-        }
-        url = f"{self.BASE_URL}/{doc_number}/{type_id}"
-        
-        try:
-            response = requests.get(url, headers=headers, timeout=10)
-            
-            if response.status_code == 401:
-                self.status_label.configure(text="⚫ DESCONECTADO", text_color="red")
-                return document, "TOKEN INVÁLIDO", "", ""
-            
-            if response.status_code == 200:
-                data = response.json()
-                
-                # Construir nombre completo
-                name = " ".join(filter(None, [
-                    data.get("primer_nombre"),
-                    data.get("segundo_nombre"),
-                    data. get("primer_apellido"),
-                    data.get("segundo_apellido")
-                ])).strip()
-                
-                if not name:
-                    name = "REVISAR (sin nombre)"
-                
-                status = data.get("estado_afiliado", {}).get("nombre", "REVISAR")
-                ips = data.get("ips", {}).get("nombre", "REVISAR")
-                
-                return document, name, status, ips
-            
-            return document, f"REVISAR ({response.status_code})", "", ""
-            
-        except Exception as e:
-            return document, f"ERROR ({str(e)})", "", ""
+        return self.client.query_affiliate(document)
     
     def _on_query(self):
         """Ejecuta la consulta de afiliados."""
@@ -517,114 +477,221 @@ class HorusApp(ctk. CTkFrame):
             messagebox.showwarning("Sin conexión", "Debes iniciar sesión antes de consultar.")
             return
         
-        documents = self._get_document_list()
+        # Reanudar un lote que quedó a medias (aplicación cerrada, token vencido, red caída)
+        journal = find_unfinished()
+        if journal is not None:
+            done = len(journal.documents) - journal.pending_count()
+            resume = messagebox.askyesnocancel(
+                "Consulta sin terminar",
+                f"Hay una consulta sin terminar: {done} de {len(journal.documents)} documentos listos.\n\n"
+                f"¿Continuarla?  (No: se descarta y se consulta la lista actual)"
+            )
+            if resume is None:
+                return
+            if not resume:
+                journal.discard()
+                journal = None
+        
+        documents = journal.documents if journal is not None else self._get_document_list()
         
         if not documents:
             messagebox.showwarning("Sin documentos", "Debes ingresar o importar documentos.")
             return
         
+        if journal is None:
+            try:
+                journal = BatchJournal.create(documents)
+            except Exception as e:
+                messagebox.showerror("Error", f"No se pudo crear la bitácora de la consulta:\n{str(e)}")
+                return
+        self.journal = journal
+        
         # Limpiar tabla anterior
         for item in self.results_table.get_children():
             self.results_table.delete(item)
+        self.results.clear()
         
         # Deshabilitar botones durante el proceso
         self.query_button.configure(state="disabled")
         self.export_button.configure(state="disabled")
         self.clear_button.configure(state="disabled")
+        self.cancel_button.configure(state="normal")
         self.is_processing = True
         
-        def query_task():
-            total = len(documents)
-            
-            for idx, doc in enumerate(documents):
-                # Consultar afiliado
-                d, n, e, i = self._query_affiliate(doc)
-                
-                # Insertar en tabla (desde hilo principal)
-                self.after(0, lambda vals=(d, n, e, i): self.results_table.insert("", "end", values=vals))
-                
-                # Actualizar progreso
-                progress = (idx + 1) / total
-                self.after(0, lambda p=progress, c=idx+1, t=total: self._update_progress(p, c, t))
-                
-                # Esperar entre consultas (evitar saturar la API)
-                time.sleep(random.uniform(2, 3))
+        total = len(documents)
+        force_refresh = self.force_refresh_var.get()
+        # config.json se lee aquí (hilo de la interfaz), no desde el hilo de consultas
+        limits = load_limits()
+        max_age = ttl_seconds()
+        self.query_stats = {}
+        
+        # Las filas se insertan por lotes en cada vuelta de la cola (no un after() por fila);
+        # el ritmo y el tiempo restante se refrescan en cada vuelta aunque no lleguen filas
+        self.results_count = 0
+        self.results_queue = UiQueue(
+            self,
+            lambda items: self._insert_results(items, total),
+            on_tick=lambda: self._update_progress(self.results_count / total, self.results_count, total),
+        )
+        self.results_queue.start()
+        
+        def work(job):
+            def on_result(index, row, completed, count):
+                """Llega desde el hilo de consultas a medida que termina cada documento."""
+                job.check_cancelled()
+                self.results_queue.put((index, row))
             
-            # Finalizar
-            self.after(0, self._on_query_complete)
+            # Consultas en paralelo con límite de ritmo (core.horus_engine)
+            return query_affiliates(
+                self.client, documents, on_result=on_result, limits=limits,
+                cache=get_affiliate_cache(), max_age=max_age, force_refresh=force_refresh, stats=self.query_stats,
+                journal=journal, check_cancelled=job.check_cancelled
+            )
         
-        # Iniciar hilo de consulta
-        threading.Thread(target=query_task, daemon=True).start()
+        def on_error(e):
+            self._on_query_complete()
+            messagebox.showerror("Error", f"Error durante la consulta:\n{str(e)}")
+        
+        self.current_job = get_runner().submit(
+            self,
+            work,
+            name="Consultar afiliados Horus",
+            on_done=lambda _: self._on_query_complete(),
+            on_error=on_error,
+            on_cancel=lambda: self._on_query_complete(cancelled=True),
+        )
+        # Mientras el trabajo esté en cola o en curso, la bitácora no se ofrece
+        # para reanudar ni se borra (otra consulta escribiría el mismo archivo)
+        job = self.current_job
+        journal.claim(lambda: job.state in (Job.QUEUED, Job.RUNNING))
+    
+    def _on_cancel(self):
+        """Detiene la consulta; lo que ya llegó queda en la bitácora para continuarla."""
+        if self.current_job:
+            self.current_job.cancel()
+            self.cancel_button.configure(state="disabled")
+    
+    def destroy(self):
+        """Al cambiar de herramienta, la consulta en curso se detiene."""
+        if self.current_job:
+            self.current_job.cancel()
+        if self.results_queue is not None:
+            self.results_queue.stop(flush=False)
+            self.results_queue = None
+        super().destroy()
+    
+    def _insert_results(self, items, total):
+        """Inserta un lote de (índice, fila) en el orden de la lista; el progreso lo refresca on_tick."""
+        for index, row in items:
+            if row[1] == "TOKEN INVÁLIDO":
+                self.status_label.configure(text="⚫ DESCONECTADO", text_color="red")
+            at = self.results.add(row, index)
+            self.results_table.insert("", "end" if at == len(self.results) - 1 else at, values=row)
+        self.results_count += len(items)
     
     def _update_progress(self, progress, current, total):
-        """Actualiza la barra de progreso y el estado."""
+        """Actualiza la barra de progreso y el estado (ritmo y tiempo restante del control adaptativo)."""
         self.progressbar.set(progress)
-        self.process_status_label.configure(
-            text=f"⏳ Consultando...  {current}/{total} ({int(progress*100)}%)",
-            text_color="orange"
-        )
+        text = f"⏳ Consultando...  {current}/{total} ({int(progress*100)}%)"
+        rate = self.query_stats.get("rate")
+        if rate and current < total:
+            text += f"  ·  {rate:.1f} consultas/s, {self.query_stats.get('in_flight', 1)} en paralelo"
+            eta = self.query_stats.get("eta")
+            if eta is not None:
+                text += f"  ·  faltan {self._format_eta(eta)}"
+        self.process_status_label.configure(text=text, text_color="orange")
         self.counter_label.configure(text=f"{current} registros")
     
-    def _on_query_complete(self):
-        """Maneja la finalización de las consultas."""
+    @staticmethod
+    def _format_eta(seconds):
+        """'1 h 05 min', '12 min 30 s' o '45 s'."""
+        seconds = int(seconds)
+        hours, rest = divmod(seconds, 3600)
+        minutes, secs = divmod(rest, 60)
+        if hours:
+            return f"{hours} h {minutes:02d} min"
+        if minutes:
+            return f"{minutes} min {secs:02d} s"
+        return f"{secs} s"
+    
+    def _on_query_complete(self, cancelled=False):
+        """Maneja la finalización (o cancelación) de las consultas."""
+        if self.results_queue is not None:
+            self.results_queue.stop(flush=True)
+            self.results_queue = None
         self.is_processing = False
+        self.current_job = None
         self.query_button.configure(state="normal")
         self.export_button.configure(state="normal")
         self.clear_button.configure(state="normal")
-        
-        total = len(self.results_table.get_children())
+        self.cancel_button.configure(state="disabled")
+        
+        total = len(self.results)
+        cached = self.query_stats.get("cached", 0)
+        cache_note = f" ({cached} desde la caché)" if cached else ""
+        if cancelled:
+            self.process_status_label.configure(
+                text=f"⏹ Consulta cancelada. {total} registros procesados{cache_note}.",
+                text_color="orange"
+            )
+            messagebox.showinfo(
+                "Cancelado",
+                f"Se canceló la consulta con {total} registros procesados{cache_note}.\n"
+                f"Al consultar de nuevo podrá continuarla."
+            )
+            return
         self.progressbar.set(1)
         self.process_status_label.configure(
-            text=f"✅ Consultas finalizadas. {total} registros procesados.",
+            text=f"✅ Consultas finalizadas. {total} registros procesados{cache_note}.",
             text_color="green"
         )
         
-        messagebox.showinfo("Completado", f"✓ Consultas finalizadas.\n{total} registros procesados.")
+        messagebox.showinfo("Completado", f"✓ Consultas finalizadas.\n{total} registros procesados{cache_note}.")
     
     # ==================== EXPORTAR EXCEL ====================
     
     def _on_export_excel(self):
-        """Exporta los resultados a un archivo Excel."""
-        if not self.results_table.get_children():
+        """Exporta los resultados a Excel (o CSV) en segundo plano."""
+        if not len(self.results):
             messagebox.showwarning("Sin datos", "No hay datos para exportar.")
             return
         
         file_path = filedialog.asksaveasfilename(
             defaultextension=".xlsx",
-            filetypes=[("Archivos Excel", "*.xlsx")],
+            filetypes=[("Archivos Excel", "*.xlsx"), ("CSV", "*.csv")],
             title="Guardar como"
         )
         
         if not file_path:
             return
         
-        try:
-            wb = Workbook()
-            ws = wb.active
-            ws.title = "Afiliados"
-            
-            # Encabezados
-            ws. append(["Tipo Doc", "Número", "Nombre", "Estado", "IPS"])
-            
-            # Procesar filas
-            for item in self.results_table.get_children():
-                doc, nombre, estado, ips = self. results_table.item(item, "values")
-                
-                # Separar tipo y número
-                tipo = "". join([c for c in doc if c.isalpha()]).upper()
-                numero = "". join([c for c in doc if c.isdigit()])
-                
-                ws.append([tipo, numero, nombre, estado, ips])
-            
-            wb. save(file_path)
-            
+        self._set_export_busy(True)
+        
+        def on_done(path):
+            self._set_export_busy(False)
             messagebox.showinfo(
                 "Exportado",
-                f"✓ Los datos fueron exportados correctamente.\n\n{file_path}"
+                f"✓ Los datos fueron exportados correctamente.\n\n{path}"
             )
-            
-        except Exception as e: 
+        
+        def on_error(e):
+            self._set_export_busy(False)
             messagebox.showerror("Error", f"No se pudo exportar:\n{str(e)}")
-
         
-        
\ No newline at end of file
+        # Las filas salen del ResultStore (no de la tabla): 100.000 afiliados en segundos
+        results = self.results
+        get_runner().submit(
+            self,
+            lambda job: horus_api.export_results(results, file_path),
+            name="Exportar afiliados Horus",
+            on_done=on_done,
+            on_error=on_error,
+            on_cancel=lambda: self._set_export_busy(False),
+        )
+    
+    def _set_export_busy(self, busy):
+        """Mientras se exporta no se puede consultar ni limpiar (cambiarían los resultados)."""
+        state = "disabled" if busy else "normal"
+        self.query_button.configure(state=state)
+        self.export_button.configure(state=state)
+        self.clear_button.configure(state=state)
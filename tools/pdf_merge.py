@@ -1,9 +1,12 @@
 import os
-import fitz  # PyMuPDF
 import customtkinter as ctk
 import tkinter as tk
 from tkinter import filedialog, messagebox
 
+from core.config import get_save_profile
+from core.jobs import get_runner
+from core.pdf_ops import merge_pdfs
+
 class PDFMergerApp(ctk.CTkFrame):
     """
     Aplicación para unir múltiples archivos PDF en uno solo.
@@ -21,6 +24,9 @@ class PDFMergerApp(ctk.CTkFrame):
         # Historial para deshacer
         self.last_operation = None
         
+        # Trabajo en segundo plano (core.jobs)
+        self.current_job = None
+        
         # ===== CONSTRUIR UI =====
         self._create_widgets()
     
@@ -64,6 +70,7 @@ class PDFMergerApp(ctk.CTkFrame):
         btn_frame.grid_columnconfigure(1, weight=1)
         btn_frame.grid_columnconfigure(2, weight=1)
         btn_frame.grid_columnconfigure(3, weight=1)
+        btn_frame.grid_columnconfigure(4, weight=1)
         
         self.merge_button = ctk.CTkButton(
             btn_frame,
@@ -97,6 +104,15 @@ class PDFMergerApp(ctk.CTkFrame):
         )
         self.deselect_all_button. grid(row=0, column=3, padx=6, pady=4, sticky="we")
         
+        self.cancel_button = ctk.CTkButton(
+            btn_frame,
+            text="✖ Cancelar",
+            command=self._on_cancel,
+            fg_color="#d9534f"
+        )
+        self.cancel_button.grid(row=0, column=4, padx=6, pady=4, sticky="we")
+        self.cancel_button.configure(state="disabled")
+        
         top_frame.grid_columnconfigure(1, weight=1)
         
         # ===== PANEL DE ARCHIVOS PDF =====
@@ -118,6 +134,11 @@ class PDFMergerApp(ctk.CTkFrame):
             height=400
         )
         self.scroll_frame.pack(fill="both", expand=True, padx=4, pady=2)
+        
+        # Barra de progreso (la unión corre en segundo plano)
+        self.progressbar = ctk.CTkProgressBar(self, height=12, corner_radius=5)
+        self.progressbar.pack(fill="x", padx=6, pady=(2, 6))
+        self.progressbar.set(0)
     
     # ==================== MANEJADORES DE EVENTOS ====================
     
@@ -218,31 +239,58 @@ class PDFMergerApp(ctk.CTkFrame):
         if not output_path:
             return
         
-        try:
-            # Crear documento nuevo con fitz
-            merged_doc = fitz.open()
-            
-            for filename in selected_files:
-                pdf_path = os.path.join(folder, filename)
-                src_doc = fitz.open(pdf_path)
-                merged_doc.insert_pdf(src_doc)
-                src_doc.close()
-            
-            # Guardar documento unido
-            merged_doc.save(output_path, garbage=4, deflate=True)
-            merged_doc.close()
-            
+        paths = [os.path.join(folder, f) for f in selected_files]
+        save_profile = get_save_profile("Unir PDFs")
+        
+        def on_done(_):
             # Guardar estado para deshacer
             self.last_operation = {
                 'created': output_path,
                 'source_files': selected_files. copy()
             }
             self.undo_button.configure(state="normal")
+            self._set_busy(False)
+            self.progressbar.set(1)
             
             messagebox.showinfo("Éxito", f"PDF unido creado:\n{output_path}")
-            
-        except Exception as e:
+        
+        def on_error(e):
+            self._set_busy(False)
             messagebox. showerror("Error", f"Error durante la unión:\n{str(e)}")
+        
+        def on_cancel():
+            self._set_busy(False)
+            self.progressbar.set(0)
+            messagebox.showinfo("Cancelado", "Se canceló la unión. No se creó ningún archivo.")
+        
+        # Unir y guardar documento en segundo plano
+        self._set_busy(True)
+        self.current_job = get_runner().submit(
+            self,
+            lambda job: merge_pdfs(
+                paths, output_path, progress_callback=job.progress, save_profile=save_profile
+            ),
+            name="Unir PDFs",
+            on_progress=self.progressbar.set,
+            on_done=on_done,
+            on_error=on_error,
+            on_cancel=on_cancel,
+        )
+    
+    def _set_busy(self, busy):
+        """Habilita/deshabilita los botones mientras corre el trabajo."""
+        if busy:
+            self.progressbar.set(0)
+        else:
+            self.current_job = None
+        self.merge_button.configure(state="disabled" if busy else "normal")
+        self.cancel_button.configure(state="normal" if busy else "disabled")
+    
+    def _on_cancel(self):
+        """Cancela la unión en curso."""
+        if self.current_job:
+            self.current_job.cancel()
+            self.cancel_button.configure(state="disabled")
     
     def _on_undo(self):
         """Deshace la última operación eliminando el archivo creado."""
@@ -1,174 +1,15 @@
 
 import os
-import re
-import shutil
-import fitz  # PyMuPDF
 import customtkinter as ctk
 import tkinter as tk
 from tkinter import filedialog, messagebox
-from pathlib import Path
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, List
 
-
-# ==================== UTILIDADES ====================
-
-def natural_key(s: str):
-    """Clave para ordenamiento natural."""
-    parts = re.split(r'(\d+)', s)
-    return [int(p) if p.isdigit() else p for p in parts]
-
-
-def create_unique_name(path: Path) -> Path:
-    """Si la ruta existe, añade sufijo _1, _2.. ."""
-    if not path.exists():
-        return path
-    base = path.stem
-    ext = path.suffix
-    parent = path.parent
-    i = 1
-    while True:
-        candidate = parent / f"{base}_{i}{ext}"
-        if not candidate. exists():
-            return candidate
-        i += 1
-
-
-def extract_prefix(filename: str) -> str:
-    """Extrae el prefijo antes del primer espacio o punto."""
-    name_no_ext = re.sub(r'\.pdf$', '', filename, flags=re.IGNORECASE)
-    match = re.search(r'[.\s]', name_no_ext)
-    if match:
-        return name_no_ext[:match.start()]
-    return name_no_ext
-
-
-def get_groups_case_sensitive(folder: str) -> Dict[str, List[str]]:
-    """Agrupa PDFs por prefijo.  Solo grupos con más de 1 PDF."""
-    temp:  Dict[str, List[str]] = {}
-    try:
-        names = sorted(os.listdir(folder), key=natural_key)
-    except Exception: 
-        names = os.listdir(folder)
-    
-    for name in names: 
-        if not name.lower().endswith(".pdf"):
-            continue
-        key = extract_prefix(name)
-        temp.setdefault(key, []).append(name)
-    
-    groups = {k: v for k, v in temp.items() if len(v) > 1}
-    return dict(sorted(groups.items(), key=lambda kv: natural_key(kv[0])))
-
-
-# ==================== OPERACIONES PDF ====================
-
-def move_files_to_group_folder(folder: Path, files: List[str], group_dir: Path) -> Tuple[List[Path], List[str]]:
-    """Mueve los archivos a la carpeta de grupo."""
-    moved_paths:  List[Path] = []
-    errors: List[str] = []
-    group_dir.mkdir(parents=True, exist_ok=True)
-    
-    for name in files:
-        src = folder / name
-        if not src.exists():
-            errors. append(f"No existe: {name}")
-            continue
-        dst = group_dir / name
-        if dst.exists():
-            dst = create_unique_name(dst)
-        try:
-            shutil.move(str(src), str(dst))
-            moved_paths.append(dst)
-        except Exception as e: 
-            errors.append(f"Error moviendo '{name}': {e}")
-    
-    return moved_paths, errors
-
-
-def merge_pdfs_from_paths(paths: List[Path], output_path: Path) -> List[str]:
-    """Une los PDFs usando fitz."""
-    errors: List[str] = []
-    paths_sorted = sorted(paths, key=lambda p: natural_key(p. name))
-    
-    try:
-        merged_doc = fitz.open()
-        
-        for p in paths_sorted:
-            try:
-                src_doc = fitz.open(str(p))
-                merged_doc.insert_pdf(src_doc)
-                src_doc.close()
-            except Exception as e:
-                errors.append(f"Error añadiendo '{p.name}': {e}")
-        
-        if merged_doc.page_count == 0:
-            merged_doc.close()
-            errors.append("No se añadieron PDFs válidos.")
-            return errors
-        
-        merged_doc.save(str(output_path), garbage=4, deflate=True)
-        merged_doc.close()
-        
-    except Exception as e:
-        errors.append(f"Error escribiendo '{output_path. name}': {e}")
-    
-    return errors
-
-
-def merge_group_and_move(folder:  str, key: str, files: List[str]) -> Tuple[bool, List[str], Optional[Path]]:
-    """
-    Une un grupo y mueve originales. 
-    Retorna (success, errors, output_path)
-    """
-    errors: List[str] = []
-    folder_path = Path(folder)
-    group_dir = folder_path / "Grupos"
-    
-    moved_paths, move_errors = move_files_to_group_folder(folder_path, files, group_dir)
-    errors.extend(move_errors)
-    
-    if not moved_paths:
-        return False, errors, None
-    
-    output = folder_path / f"{key}.pdf"
-    output_unique = create_unique_name(output) if output.exists() else output
-    
-    merge_errors = merge_pdfs_from_paths(moved_paths, output_unique)
-    errors.extend(merge_errors)
-    
-    success = len(move_errors) == 0 and len(merge_errors) == 0
-    return success, errors, output_unique if success else None
-
-
-def undo_merge(folder: str, key: str, output_file: Path) -> Tuple[bool, List[str]]:
-    """
-    Deshace la unión:  elimina el PDF unido y restaura los originales.
-    """
-    errors: List[str] = []
-    folder_path = Path(folder)
-    group_dir = folder_path / "Grupos"
-    
-    # Eliminar PDF unido
-    if output_file and output_file.exists():
-        try:
-            os.remove(output_file)
-        except Exception as e:
-            errors.append(f"No se pudo eliminar '{output_file.name}': {e}")
-            return False, errors
-    
-    # Restaurar archivos desde carpeta Grupos
-    if group_dir.exists():
-        for file_path in group_dir.iterdir():
-            if file_path.name.startswith(key) or extract_prefix(file_path.name) == key:
-                dst = folder_path / file_path. name
-                if dst.exists():
-                    dst = create_unique_name(dst)
-                try:
-                    shutil.move(str(file_path), str(dst))
-                except Exception as e:
-                    errors.append(f"Error restaurando '{file_path.name}': {e}")
-    
-    return len(errors) == 0, errors
+from core.config import get_save_profile
+from core.jobs import get_runner
+from core.pdf_groups import (
+    get_groups_case_sensitive, merge_group_and_move, merge_groups, read_batch, undo_batch, undo_batches,
+)
 
 
 # ==================== COMPONENTE ACORDEÓN COMPACTO ====================
@@ -216,14 +57,14 @@ class AccordionItem(ctk.CTkFrame):
         info_label.pack(side="left", fill="x", expand=True)
         
         # Badge compacto
-        badge_label = ctk.CTkLabel(
+        self.badge_label = ctk.CTkLabel(
             header_frame,
             text="✓",
             font=ctk.CTkFont(size=11, weight="bold"),
             text_color="#10b981",
             width=20
         )
-        badge_label.pack(side="left", padx=4)
+        self.badge_label.pack(side="left", padx=4)
         
         # Botón unir compacto
         merge_button = ctk.CTkButton(
@@ -260,6 +101,10 @@ class AccordionItem(ctk.CTkFrame):
     
     def _on_merge_click(self):
         self.on_merge_callback(self.group_key, self.files)
+    
+    def set_status(self, text: str, color: str):
+        """Estado del grupo durante "Unir todos" (en cola, unido, con error)."""
+        self.badge_label.configure(text=text, text_color=color)
 
 
 # ==================== APLICACIÓN PRINCIPAL ====================
@@ -273,7 +118,8 @@ class PDFMergerGroupApp(ctk.CTkFrame):
         self.folder_path = ""
         self.groups: Dict[str, List[str]] = {}
         self.accordion_items: List[AccordionItem] = []
-        self.last_operation:  Optional[Dict] = None  # Para deshacer
+        self.undo_levels: List[str] = []  # Lotes con manifiesto en Grupos/.deshacer (para deshacer)
+        self.current_job = None
         
         self._create_widgets()
     
@@ -313,6 +159,7 @@ class PDFMergerGroupApp(ctk.CTkFrame):
         btn_frame.grid_columnconfigure(1, weight=1)
         btn_frame.grid_columnconfigure(2, weight=1)
         btn_frame.grid_columnconfigure(3, weight=1)
+        btn_frame.grid_columnconfigure(4, weight=1)
         
         self.merge_all_button = ctk.CTkButton(
             btn_frame,
@@ -335,7 +182,7 @@ class PDFMergerGroupApp(ctk.CTkFrame):
         self.refresh_button = ctk.CTkButton(
             btn_frame,
             text="🔄 Refrescar",
-            command=self._refresh
+            command=lambda: self._refresh(force=True)
         )
         self.refresh_button.grid(row=0, column=2, padx=6, pady=4, sticky="we")
         
@@ -346,6 +193,15 @@ class PDFMergerGroupApp(ctk.CTkFrame):
         )
         self.expand_all_button.grid(row=0, column=3, padx=6, pady=4, sticky="we")
         
+        self.cancel_button = ctk.CTkButton(
+            btn_frame,
+            text="✖ Cancelar",
+            command=self._on_cancel,
+            fg_color="#d9534f"
+        )
+        self.cancel_button.grid(row=0, column=4, padx=6, pady=4, sticky="we")
+        self.cancel_button.configure(state="disabled")
+        
         top_frame.grid_columnconfigure(1, weight=1)
         
         # ===== PANEL DE GRUPOS =====
@@ -375,6 +231,11 @@ class PDFMergerGroupApp(ctk.CTkFrame):
         self.scroll_frame = ctk.CTkScrollableFrame(self.groups_frame, height=400)
         self.scroll_frame.pack(fill="both", expand=True, padx=4, pady=2)
         
+        # Barra de progreso ("Unir todos" corre en segundo plano)
+        self.progressbar = ctk.CTkProgressBar(self, height=12, corner_radius=5)
+        self.progressbar.pack(fill="x", padx=6, pady=(2, 6))
+        self.progressbar.set(0)
+        
         self._show_empty_message()
     
     # ==================== MENSAJES ====================
@@ -411,15 +272,16 @@ class PDFMergerGroupApp(ctk.CTkFrame):
             messagebox.showerror("Error", "Carpeta no válida")
             return
         self.folder_path = folder
-        self._refresh()
+        self._refresh(force=True)
     
-    def _refresh(self):
+    def _refresh(self, force: bool = False):
+        """Vuelve a leer los grupos. force=True lista la carpeta completa."""
         if not self.folder_path:
             messagebox.showinfo("Sin carpeta", "Selecciona primero una carpeta.")
             return
         
         try:
-            self.groups = get_groups_case_sensitive(self.folder_path)
+            self.groups = get_groups_case_sensitive(self.folder_path, force=force)
             self._rebuild_accordion()
             
             count = len(self.groups)
@@ -427,6 +289,8 @@ class PDFMergerGroupApp(ctk.CTkFrame):
             
         except Exception as e:
             messagebox.showerror("Error", f"No se pudo leer la carpeta:\n{e}")
+        
+        self._update_undo_button(busy=self.current_job is not None)
     
     def _rebuild_accordion(self):
         for widget in self.scroll_frame.winfo_children():
@@ -460,6 +324,8 @@ class PDFMergerGroupApp(ctk.CTkFrame):
     # ==================== OPERACIONES ====================
     
     def _on_merge_group(self, key: str, files: List[str]):
+        if self.current_job:
+            return
         response = messagebox.askyesno(
             "Confirmar",
             f"¿Unir {len(files)} PDFs del grupo '{key}'?"
@@ -467,16 +333,11 @@ class PDFMergerGroupApp(ctk.CTkFrame):
         if not response:
             return
         
-        success, errors, output_path = merge_group_and_move(self.folder_path, key, files)
+        success, errors, output_path = merge_group_and_move(
+            self.folder_path, key, files, save_profile=get_save_profile("Unir grupos de PDFs")
+        )
         
         if success: 
-            self. last_operation = {
-                'type': 'single',
-                'key': key,
-                'files': files. copy(),
-                'output': output_path
-            }
-            self. undo_button.configure(state="normal")
             messagebox.showinfo("Éxito", f"Grupo '{key}' unido.\nArchivo:  {output_path. name}")
         else:
             error_msg = "\n".join(errors[: 3]) if errors else "Error desconocido"
@@ -485,6 +346,8 @@ class PDFMergerGroupApp(ctk.CTkFrame):
         self._refresh()
     
     def _on_merge_all(self):
+        if self.current_job:
+            return
         if not self.groups:
             messagebox.showinfo("Sin grupos", "No hay grupos para unir.")
             return
@@ -496,76 +359,125 @@ class PDFMergerGroupApp(ctk.CTkFrame):
         if not response:
             return
         
+        folder = self.folder_path
+        groups = {key: files.copy() for key, files in self.groups.items()}
+        items = {item.group_key: item for item in self.accordion_items}
         merged_count = 0
-        merged_outputs = []
         all_errors = []
         
-        for key, files in self.groups.items():
-            success, errors, output_path = merge_group_and_move(self.folder_path, key, files)
+        for item in self.accordion_items:
+            item.set_status("⏳", "gray")
+        
+        def on_group_done(key, success, errors, output_path):
+            """Un grupo terminó (llega en el hilo de la interfaz)."""
+            nonlocal merged_count
+            item = items.get(key)
+            if item is not None and item.winfo_exists():
+                item.set_status("✓" if success else "✗", "#10b981" if success else "#d9534f")
             if success:
                 merged_count += 1
-                merged_outputs. append({'key': key, 'files':  files. copy(), 'output': output_path})
-            all_errors.extend(errors)
-        
-        if merged_outputs:
-            self.last_operation = {
-                'type': 'all',
-                'merged':  merged_outputs
-            }
-            self.undo_button.configure(state="normal")
+            else:
+                all_errors.extend(f"{key}: {error}" for error in errors)
         
-        self._refresh()
+        def finish(title, note=""):
+            self._set_busy(False)
+            self._refresh()
+            
+            msg = f"Se unieron {merged_count} de {len(groups)} grupos."
+            if note:
+                msg = f"{note}\n{msg}"
+            if all_errors:
+                msg += f"\n\nErrores ({len(all_errors)}):\n" + "\n".join(all_errors[:3])
+            messagebox.showinfo(title, msg)
+        
+        def on_error(e):
+            self._set_busy(False)
+            self._refresh()
+            messagebox.showerror("Error", f"Error durante la unión:\n{str(e)}")
+        
+        # La configuración se lee aquí (hilo de la interfaz), no desde el trabajo
+        save_profile = get_save_profile("Unir grupos de PDFs")
+        
+        def work(job):
+            return merge_groups(
+                folder, groups,
+                save_profile=save_profile,
+                progress_callback=job.progress,
+                on_group_done=lambda *result: job.call_ui(on_group_done, *result),
+            )
         
-        msg = f"Se unieron {merged_count} de {len(self.groups)} grupos."
-        if all_errors: 
-            msg += f"\n\nErrores:\n" + "\n".join(all_errors[: 3])
-        messagebox.showinfo("Resultado", msg)
+        self._set_busy(True)
+        self.current_job = get_runner().submit(
+            self,
+            work,
+            name="Unir grupos de PDFs",
+            on_progress=self.progressbar.set,
+            on_done=lambda _: finish("Resultado"),
+            on_error=on_error,
+            on_cancel=lambda: finish("Cancelado", "Se canceló la unión; los grupos pendientes no se tocaron."),
+        )
+    
+    def _set_busy(self, busy):
+        """Habilita/deshabilita los botones mientras corre "Unir todos"."""
+        if busy:
+            self.progressbar.set(0)
+        else:
+            self.current_job = None
+        state = "disabled" if busy else "normal"
+        self.merge_all_button.configure(state=state)
+        self.refresh_button.configure(state=state)
+        self._update_undo_button(busy)
+        self.cancel_button.configure(state="normal" if busy else "disabled")
+    
+    def _on_cancel(self):
+        """Cancela "Unir todos": las uniones en curso terminan y se descartan."""
+        if self.current_job:
+            self.current_job.cancel()
+            self.cancel_button.configure(state="disabled")
+    
+    def _update_undo_button(self, busy: bool = False):
+        """Lee los lotes que se pueden deshacer de la carpeta actual."""
+        self.undo_levels = undo_batches(self.folder_path) if self.folder_path else []
+        count = len(self.undo_levels)
+        self.undo_button.configure(
+            text=f"↶ Deshacer ({count})" if count > 1 else "↶ Deshacer",
+            state="normal" if count and not busy else "disabled"
+        )
     
     def _on_undo(self):
-        if not self.last_operation:
+        self._update_undo_button()
+        if not self.undo_levels:
             messagebox.showinfo("Info", "No hay operación para deshacer.")
             return
         
-        op_type = self.last_operation. get('type')
+        batch = self.undo_levels[-1]
+        try:
+            entries = read_batch(self.folder_path, batch)
+        except Exception as e:
+            messagebox.showerror("Error", f"No se pudo leer el manifiesto de deshacer:\n{e}")
+            return
         
-        if op_type == 'single':
-            key = self. last_operation['key']
-            output = self.last_operation['output']
-            
-            response = messagebox.askyesno(
-                "Confirmar Deshacer",
-                f"¿Deshacer la unión del grupo '{key}'?\n\n"
-                f"Se eliminará '{output.name}' y se restaurarán los originales."
+        if len(entries) == 1 and entries[0].get('output'):
+            question = (
+                f"¿Deshacer la unión del grupo '{entries[0]['key']}'?\n\n"
+                f"Se eliminará '{entries[0]['output']}' y se restaurarán los originales."
             )
-            if not response:
-                return
-            
-            success, errors = undo_merge(self.folder_path, key, output)
-            
-            if success: 
-                messagebox.showinfo("Deshacer completado", f"Grupo '{key}' restaurado.")
-            else:
-                messagebox.showerror("Error", f"No se pudo deshacer:\n" + "\n".join(errors))
+        else:
+            question = f"¿Deshacer la unión de {len(entries)} grupos?"
         
-        elif op_type == 'all':
-            merged = self.last_operation.get('merged', [])
-            
-            response = messagebox.askyesno(
-                "Confirmar Deshacer",
-                f"¿Deshacer la unión de {len(merged)} grupos?"
+        response = messagebox.askyesno("Confirmar Deshacer", question)
+        if not response:
+            return
+        
+        restored, errors = undo_batch(self.folder_path, batch)
+        
+        if not errors:
+            messagebox.showinfo("Deshacer completado", f"Se restauraron {restored} de {len(entries)} grupos.")
+        else:
+            messagebox.showerror(
+                "Error",
+                f"Se restauraron {restored} de {len(entries)} grupos.\n\n"
+                f"No se pudo deshacer:\n" + "\n".join(errors[:5])
             )
-            if not response:
-                return
-            
-            restored = 0
-            for item in merged:
-                success, _ = undo_merge(self. folder_path, item['key'], item['output'])
-                if success:
-                    restored += 1
-            
-            messagebox.showinfo("Deshacer completado", f"Se restauraron {restored} de {len(merged)} grupos.")
         
-        self. last_operation = None
-        self. undo_button.configure(state="disabled")
         self._refresh()
-
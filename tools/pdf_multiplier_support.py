@@ -1,11 +1,14 @@
 import os
-import re
 import fitz  # PyMuPDF
 import customtkinter as ctk
 import tkinter as tk
 from tkinter import filedialog, messagebox
 from typing import Optional, List, Dict
 
+from core.config import get_save_profile
+from core.jobs import get_runner
+from core.pdf_ops import multiply_pdf
+
 
 # ==================== CONSTANTES ====================
 
@@ -67,28 +70,6 @@ class CTkTextboxWithPlaceholder(ctk.CTkTextbox):
         self._show_placeholder()
 
 
-# ==================== UTILIDADES ====================
-
-def clean_filename(name: str) -> str:
-    """Elimina caracteres no permitidos en nombres de archivo."""
-    return re.sub(r'[\\/*?:"<>|]', "", name)
-
-
-def create_unique_path(base_path: str) -> str:
-    """Crea una ruta única si el archivo ya existe."""
-    if not os.path.exists(base_path):
-        return base_path
-    
-    base, ext = os.path.splitext(base_path)
-    counter = 2
-    
-    while True:
-        new_path = f"{base} ({counter}){ext}"
-        if not os.path.exists(new_path):
-            return new_path
-        counter += 1
-
-
 # ==================== APLICACIÓN PRINCIPAL ====================
 
 class PDFMultiplierSupportApp(ctk.CTkFrame):
@@ -105,6 +86,7 @@ class PDFMultiplierSupportApp(ctk.CTkFrame):
         self.pdf_path:  Optional[str] = None
         self.last_operation: Optional[Dict] = None
         self.page_count = 0
+        self.current_job = None           # Trabajo en segundo plano (core.jobs)
         
         # ===== CONSTRUIR UI =====
         self._create_widgets()
@@ -188,6 +170,7 @@ class PDFMultiplierSupportApp(ctk.CTkFrame):
         btn_frame.grid_columnconfigure(0, weight=1)
         btn_frame.grid_columnconfigure(1, weight=1)
         btn_frame.grid_columnconfigure(2, weight=1)
+        btn_frame.grid_columnconfigure(3, weight=1)
         
         self.process_button = ctk.CTkButton(
             btn_frame,
@@ -214,6 +197,15 @@ class PDFMultiplierSupportApp(ctk.CTkFrame):
         )
         self.clear_button.grid(row=0, column=2, padx=6, pady=4, sticky="we")
         
+        self.cancel_button = ctk.CTkButton(
+            btn_frame,
+            text="✖ Cancelar",
+            command=self._on_cancel,
+            fg_color="#d9534f"
+        )
+        self.cancel_button.grid(row=0, column=3, padx=6, pady=4, sticky="we")
+        self.cancel_button.configure(state="disabled")
+        
         top_frame.grid_columnconfigure(1, weight=1)
         
         # ===== PANEL DE NOMBRES =====
@@ -260,6 +252,11 @@ class PDFMultiplierSupportApp(ctk.CTkFrame):
         
         # Binding para actualizar contador
         self.names_textbox.bind("<KeyRelease>", self._update_counter)
+        
+        # Barra de progreso (las copias se crean en segundo plano)
+        self.progressbar = ctk.CTkProgressBar(self, height=12, corner_radius=5)
+        self.progressbar.pack(fill="x", padx=6, pady=(2, 6))
+        self.progressbar.set(0)
     
     # ==================== EVENTOS ====================
     
@@ -432,38 +429,23 @@ class PDFMultiplierSupportApp(ctk.CTkFrame):
         if not response: 
             return
         
-        # Procesar - Multiplicar el PDF
-        try:
-            doc = fitz.open(pdf_path)
-            created_files:  List[str] = []
-            
-            for name in names:
-                # Crear nuevo documento con la única página
-                new_doc = fitz.open()
-                new_doc.insert_pdf(doc, from_page=0, to_page=0)
-                
-                # Generar nombre del archivo (SIN ESPACIO en la extensión)
-                clean_name = clean_filename(name)
-                file_name = f"{prefix}{clean_name}.pdf"
-                file_path = os.path.join(output_dir, file_name)
-                file_path = create_unique_path(file_path)
-                
-                # Guardar
-                new_doc.save(file_path, garbage=4, deflate=True)
-                new_doc.close()
-                
-                created_files.append(file_path)
-                print(f"[INFO] Creado: {file_path}")
-            
-            doc.close()
-            
+        # Copias escritas hasta ahora (las agrega el trabajo): si se cancela, se pueden deshacer
+        created_so_far = []
+        
+        def remember(created_files):
             # Guardar estado para deshacer (NO eliminamos el original)
             self.last_operation = {
                 'original_path': pdf_path,
                 'original_removed': False,
-                'created_files': created_files.copy()
+                'created_files': list(created_files)
             }
-            self.undo_button.configure(state="normal")
+            self.undo_button.configure(state="normal" if created_files else "disabled")
+        
+        # Procesar - Multiplicar el PDF en segundo plano
+        def on_done(created_files):
+            self._job_finished()
+            self.progressbar.set(1)
+            remember(created_files)
             
             # Mensaje de éxito
             messagebox.showinfo(
@@ -471,10 +453,51 @@ class PDFMultiplierSupportApp(ctk.CTkFrame):
                 f"✅ Se han creado {len(created_files)} copias del PDF.\n\n"
                 f"El archivo original se mantiene intacto."
             )
-            
-        except Exception as e:
+        
+        def on_error(e):
+            self._job_finished()
+            remember(created_so_far)
             messagebox.showerror("Error", f"Hubo un error:\n{e}")
-            print(f"[ERROR] {e}")
+        
+        def on_cancel():
+            self._job_finished()
+            self.progressbar.set(0)
+            remember(created_so_far)
+            messagebox.showinfo(
+                "Cancelado",
+                f"Se canceló el proceso. Las {len(created_so_far)} copias ya creadas se mantienen"
+                + (" (puede eliminarlas con Deshacer)." if created_so_far else ".")
+            )
+        
+        self.process_button.configure(state="disabled")
+        self.cancel_button.configure(state="normal")
+        self.progressbar.set(0)
+        save_profile = get_save_profile("Multiplicar Soportes CRC")
+        self.current_job = get_runner().submit(
+            self,
+            lambda job: multiply_pdf(
+                pdf_path, names, output_dir, prefix,
+                progress_callback=job.progress, save_profile=save_profile,
+                on_created=created_so_far.append
+            ),
+            name="Multiplicar Soportes",
+            on_progress=self.progressbar.set,
+            on_done=on_done,
+            on_error=on_error,
+            on_cancel=on_cancel,
+        )
+    
+    def _job_finished(self):
+        """Restablece los botones al terminar el trabajo."""
+        self.current_job = None
+        self.process_button.configure(state="normal")
+        self.cancel_button.configure(state="disabled")
+    
+    def _on_cancel(self):
+        """Cancela el proceso en curso."""
+        if self.current_job:
+            self.current_job.cancel()
+            self.cancel_button.configure(state="disabled")
     
     def _on_undo(self):
         """Deshace la última operación eliminando los archivos creados."""
@@ -1,11 +1,51 @@
 import os
+import sys
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import FIRST_COMPLETED, wait
 import fitz
 import customtkinter as ctk
 import tkinter as tk
 from tkinter import filedialog, messagebox
 from PIL import Image
-from io import BytesIO
-import threading
+
+from core.config import get_save_profile
+from core.jobs import get_runner
+from core.pdf_ops import delete_pages, edited_output_path
+from core.raster_service import get_raster_service
+from core.thumbnail_cache import get_thumbnail_cache
+
+
+# Páginas por tarea del pool de rasterizado (se envía un lote por proceso)
+RASTER_BATCH = 4
+
+# Escala de las miniaturas (también forma parte de la clave de la caché)
+THUMBNAIL_ZOOM = 0.2
+
+# Espacio de la miniatura en la tarjeta (ancho, alto); las más grandes se reducen
+THUMBNAIL_BOX = (130, 180)
+
+# Alto de cada fila del grid (tarjeta + márgenes)
+ROW_HEIGHT = 236
+
+# Filas con tarjeta por encima y por debajo de las visibles
+BUFFER_ROWS = 2
+
+# Miniaturas que se mantienen en memoria (el resto se relee de la caché de disco)
+THUMBNAIL_MEMORY = 300
+
+
+class _PageCard:
+    """Tarjeta reutilizable del grid: se asigna a una página u otra al desplazarse."""
+
+    def __init__(self, frame, window_id, image_label, number_label, var):
+        self.frame = frame
+        self.window_id = window_id        # ítem del canvas que la contiene
+        self.image_label = image_label
+        self.number_label = number_label
+        self.var = var
+        self.page = None
+        self.image = None                 # CTkImage mostrada (se conserva la referencia)
 
 
 class PDFPageDeleterApp(ctk.CTkFrame):
@@ -18,16 +58,15 @@ class PDFPageDeleterApp(ctk.CTkFrame):
         super().__init__(master)
         
         # ===== ESTADO DE LA APLICACIÓN =====
-        # Archivo y documento
+        # Archivo
         self.pdf_path = ""
-        self.pdf_doc = None
         
         # Páginas y selección
         self.page_count = 0
-        self.check_vars = []              # Variables observables para checkboxes
-        self.checkboxes = []              # Widgets de checkbox
-        self.thumbnails = []              # Cache de imágenes CTkImage
-        self.page_cards = []              # Cards de cada página
+        self.selected_pages = set()       # Páginas marcadas para eliminar
+        self.thumbnails = OrderedDict()   # página -> imagen PIL (LRU de THUMBNAIL_MEMORY)
+        self.page_cards = {}              # página -> tarjeta visible (_PageCard)
+        self.free_cards = []              # Tarjetas sin página, para reutilizar
         
         # Configuración de layout
         self.num_columns = 5
@@ -35,7 +74,16 @@ class PDFPageDeleterApp(ctk.CTkFrame):
         
         # Operación y historial
         self.last_operation = None        # {'original': path, 'created': path, 'deleted_pages': [... ]}
-        self.is_loading = False
+        
+        # Trabajos en segundo plano (core.jobs)
+        self.load_job = None              # Miniaturas pendientes del PDF actual
+        self.current_job = None           # Eliminación en curso
+        
+        # Cola de miniaturas por renderizar (compartida con el trabajo de fondo)
+        self.render_lock = threading.Lock()
+        self.render_queue = deque()
+        self.load_token = 0               # Cambia con cada PDF: descarta resultados viejos
+        self.refresh_pending = False
         
         # ===== CONSTRUIR UI =====
         self._create_widgets()
@@ -102,9 +150,17 @@ class PDFPageDeleterApp(ctk.CTkFrame):
         )
         self.name_entry.grid(row=3, column=1, columnspan=2, padx=(0, 6), pady=4, sticky="we")
         
-        # Fila 4: Espaciador pequeño (compacto)
-        spacer = ctk.CTkFrame(top_frame, height=2)
-        spacer.grid(row=4, column=0, columnspan=3)
+        # Fila 4: Opciones de guardado
+        self.incremental_var = ctk.BooleanVar(value=False)
+        chk_incremental = ctk.CTkCheckBox(
+            top_frame,
+            text="Guardado rápido (incremental: copia el PDF y agrega solo los cambios; no reduce el tamaño)",
+            variable=self.incremental_var,
+            font=ctk.CTkFont(size=11),
+            checkbox_width=18,
+            checkbox_height=18
+        )
+        chk_incremental.grid(row=4, column=1, columnspan=2, padx=(0, 6), pady=(0, 4), sticky="w")
         
         # Fila 5: Botones de acción (Eliminar, Deshacer, Limpiar selección)
         btn_frame = ctk.CTkFrame(top_frame)
@@ -112,6 +168,7 @@ class PDFPageDeleterApp(ctk.CTkFrame):
         btn_frame.grid_columnconfigure(0, weight=1)
         btn_frame.grid_columnconfigure(1, weight=1)
         btn_frame.grid_columnconfigure(2, weight=1)
+        btn_frame.grid_columnconfigure(3, weight=1)
         
         self.delete_button = ctk.CTkButton(
             btn_frame,
@@ -138,6 +195,15 @@ class PDFPageDeleterApp(ctk.CTkFrame):
         )
         self.clear_button.grid(row=0, column=2, padx=6, pady=4, sticky="we")
         
+        self.cancel_button = ctk.CTkButton(
+            btn_frame,
+            text="✖ Cancelar",
+            command=self._on_cancel,
+            fg_color="#d9534f"
+        )
+        self.cancel_button.grid(row=0, column=3, padx=6, pady=4, sticky="we")
+        self.cancel_button.configure(state="disabled")
+        
         top_frame.grid_columnconfigure(1, weight=1)
         
         # ===== PANEL DE PÁGINAS (sin título, márgenes compactos) =====
@@ -162,17 +228,39 @@ class PDFPageDeleterApp(ctk.CTkFrame):
         )
         self.counter_label.grid(row=0, column=1, sticky="e", padx=4, pady=(2, 4))
         
-        # ScrollableFrame para las páginas (grid responsivo)
-        self.scroll_frame = ctk.CTkScrollableFrame(
-            self.pages_frame,
-            height=360
+        # Grid virtual: canvas con scroll y solo las tarjetas de las filas visibles
+        grid_frame = ctk.CTkFrame(self.pages_frame)
+        grid_frame.grid(row=1, column=0, columnspan=2, sticky="nsew", padx=4, pady=2)
+        
+        self.canvas = tk.Canvas(
+            grid_frame,
+            height=360,
+            highlightthickness=0,
+            bg=grid_frame._apply_appearance_mode(grid_frame.cget("fg_color")),
+            yscrollincrement=ROW_HEIGHT // 6
         )
-        self.scroll_frame.grid(row=1, column=0, columnspan=2, sticky="nsew", padx=4, pady=2)
+        self.canvas.pack(side="left", fill="both", expand=True)
+        
+        scrollbar = ctk.CTkScrollbar(grid_frame, command=self._on_scrollbar)
+        scrollbar.pack(side="right", fill="y")
+        self.canvas.configure(yscrollcommand=scrollbar.set)
+        
+        self.canvas.bind("<Configure>", lambda e: self._schedule_refresh())
+        self._bind_mouse_wheel(self.canvas)
         
         self.pages_frame.grid_rowconfigure(1, weight=1)
         self.pages_frame.grid_columnconfigure(0, weight=1)
         
-        self._update_grid_columns()
+        # Barra de progreso (la eliminación corre en segundo plano)
+        self.progressbar = ctk.CTkProgressBar(self, height=12, corner_radius=5)
+        self.progressbar.pack(fill="x", padx=6, pady=(2, 6))
+        self.progressbar.set(0)
+        
+        # Imagen de las páginas cuya miniatura todavía no está
+        self.placeholder = ctk.CTkImage(
+            light_image=Image.new("RGB", THUMBNAIL_BOX, (64, 64, 64)),
+            size=THUMBNAIL_BOX
+        )
     
     # ==================== MANEJADORES DE EVENTOS ====================
     
@@ -239,15 +327,37 @@ class PDFPageDeleterApp(ctk.CTkFrame):
             new_columns = 7
         
         # Si cambió, reorganizar
-        if new_columns != self.num_columns and self.checkboxes:
+        if new_columns != self.num_columns:
             self. num_columns = new_columns
-            self._reorganize_grid()
+            self._schedule_refresh()
+    
+    def _on_scrollbar(self, *args):
+        self.canvas.yview(*args)
+        self._schedule_refresh()
+    
+    def _on_mouse_wheel(self, event):
+        """Desplaza el grid (Windows/macOS: delta; Linux: botones 4 y 5)."""
+        if event.num == 4:
+            units = -1
+        elif event.num == 5:
+            units = 1
+        elif sys.platform == "darwin":
+            units = -event.delta
+        else:
+            units = -int(event.delta / 120) or (-1 if event.delta > 0 else 1)
+        self.canvas.yview_scroll(units * 2, "units")
+        self._schedule_refresh()
+    
+    def _bind_mouse_wheel(self, widget):
+        """La rueda desplaza el grid también sobre las tarjetas y sus hijos."""
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            tk.Misc.bind(widget, sequence, self._on_mouse_wheel, "+")
+        for child in widget.winfo_children():
+            self._bind_mouse_wheel(child)
     
     def _on_clear_selection(self):
         """Limpia todas las selecciones de checkboxes."""
-        for var in self.check_vars:
-            var.set(False)
-        self._update_counter()
+        self._clear_selection()
         messagebox.showinfo("Limpiar selección", "Se han deseleccionado todas las páginas.")
     
     # ==================== CARGA DE PDF ====================
@@ -257,8 +367,9 @@ class PDFPageDeleterApp(ctk.CTkFrame):
         self.pdf_path = file_path
         
         try:
-            self.pdf_doc = fitz.open(file_path)
-            self.page_count = len(self.pdf_doc)
+            # Solo se cuenta las páginas; las miniaturas las renderiza core.raster_service
+            with fitz.open(file_path) as doc:
+                self.page_count = len(doc)
             file_size_mb = os.path.getsize(file_path) / (1024 * 1024)
             
             # Actualizar entry de ruta
@@ -281,157 +392,294 @@ class PDFPageDeleterApp(ctk.CTkFrame):
             #     text_color="#10b981"
             # )
             
-            # Cargar páginas en hilo separado
-            threading.Thread(target=self._load_pages, daemon=True).start()
+            # Miniaturas en segundo plano; las tarjetas se crean en el hilo de la interfaz
+            self._load_pages()
             
         except Exception as e: 
             messagebox.showerror("Error", f"No se pudo abrir el PDF:\n{str(e)}")
             print(f"[ERROR] Cargar PDF: {e}")
     
-    def _generate_thumbnail(self, page_number):
-        """Genera miniatura de una página del PDF."""
+    def _render_thumbnails(self, job, pdf_path, token):
+        """
+        Trabajo en segundo plano: toma páginas de render_queue (primero las
+        visibles) y envía sus miniaturas por lotes a la interfaz.
+        Las que están en la caché de disco se leen aquí; el resto se renderiza
+        en el pool de procesos, con a lo sumo un lote por proceso en vuelo para
+        que las páginas que aparecen al desplazarse pasen primero.
+        Termina cuando la cola queda vacía; al desplazarse se encola otro trabajo.
+        """
+        cache = get_thumbnail_cache()
+        file_key = cache.file_key(pdf_path)
+        service = get_raster_service()
+        in_flight = {}  # futuro -> páginas del lote
         try:
-            page = self.pdf_doc[page_number]
-            pix = page.get_pixmap(matrix=fitz.Matrix(0.2, 0.2))
-            img_data = pix.tobytes("ppm")
-            
-            image = Image.open(BytesIO(img_data))
-            return image
-        except Exception as e:
-            print(f"[WARN] Error generando miniatura página {page_number}: {e}")
-            return None
+            while True:
+                job.check_cancelled()
+                pages = []
+                while len(in_flight) < service.max_workers:
+                    pages = self._next_render_pages(job, token, RASTER_BATCH, finish=not in_flight)
+                    if not pages:
+                        break
+                    ready, missing = [], []
+                    for page in pages:
+                        img = cache.get(file_key, page, THUMBNAIL_ZOOM)
+                        if img is None:
+                            missing.append(page)
+                        else:
+                            ready.append((page, img))
+                    if ready:
+                        job.call_ui(self._on_thumbnails_ready, token, ready)
+                    if missing:
+                        in_flight[service.submit(pdf_path, missing, THUMBNAIL_ZOOM)] = missing
+                
+                if not in_flight:
+                    if pages is None:
+                        break  # cola vacía o PDF reemplazado
+                    continue
+                
+                done, _ = wait(in_flight, timeout=0.2, return_when=FIRST_COMPLETED)
+                for future in done:
+                    del in_flight[future]
+                    batch = []
+                    for rendered in future.result():
+                        img = rendered.to_image()
+                        if img is None:
+                            print(f"[WARN] Error generando miniatura página {rendered.page}: {rendered.error}")
+                        else:
+                            cache.put(file_key, rendered.page, THUMBNAIL_ZOOM, img)
+                        batch.append((rendered.page, img))
+                    job.call_ui(self._on_thumbnails_ready, token, batch)
+        finally:
+            for future in in_flight:
+                future.cancel()
+            # Si el trabajo falló (pool roto, error de disco) no debe quedar como
+            # "en curso": la próxima petición de miniaturas encola uno nuevo
+            with self.render_lock:
+                if job is self.load_job:
+                    self.load_job = None
+    
+    def _next_render_pages(self, job, token, count, finish):
+        """
+        Hasta `count` páginas de la cola. Si la cola está vacía retorna [] o,
+        con finish=True, None (y el trabajo termina). None también si el PDF cambió.
+        """
+        with self.render_lock:
+            if token != self.load_token or job is not self.load_job:
+                return None
+            if self.render_queue:
+                return [self.render_queue.popleft() for _ in range(min(count, len(self.render_queue)))]
+            if finish:
+                self.load_job = None
+                return None
+            return []
+    
+    def _request_thumbnails(self, pages):
+        """Reemplaza la cola de miniaturas y encola el trabajo si no hay uno en curso."""
+        with self.render_lock:
+            self.render_queue = deque(pages)
+            if self.render_queue and self.load_job is None:
+                # Se asigna con el lock tomado: el trabajo no avanza hasta entonces
+                self.load_job = get_runner().submit(
+                    self, self._render_thumbnails, self.pdf_path, self.load_token,
+                    name="Miniaturas",
+                    on_error=self._on_pages_error,
+                )
     
     def _load_pages(self):
-        """Carga checkboxes y miniaturas en grid responsivo."""
-        # Limpiar widgets anteriores
-        for widget in self. scroll_frame.winfo_children():
-            widget.destroy()
-        
-        self.check_vars. clear()
-        self.checkboxes.clear()
+        """Vacía el grid y lo prepara para el PDF actual (las miniaturas se piden al mostrarse)."""
+        with self.render_lock:
+            if self.load_job:
+                self.load_job.cancel()
+                self.load_job = None
+            self.render_queue.clear()
+            self.load_token += 1
+        
+        for page in list(self.page_cards):
+            self._release_card(page)
+        
+        self.selected_pages.clear()
         self.thumbnails.clear()
-        self.page_cards.clear()
+        self._update_counter()
         
-        try:
-            for i in range(self.page_count):
-                var = ctk.BooleanVar()
-                
-                # Card de página compacta
-                page_card = ctk.CTkFrame(
-                    self.scroll_frame,
-                    fg_color="gray20",
-                    corner_radius=6,
-                    border_width=1,
-                    border_color="gray25"
-                )
-                
-                row = i // self.num_columns
-                col = i % self. num_columns
-                page_card.grid(row=row, column=col, padx=4, pady=4, sticky="n")
-                
-                # Contenedor vertical
-                content_frame = ctk.CTkFrame(page_card, fg_color="transparent")
-                content_frame.pack(fill="both", expand=False, padx=0, pady=0)
-                
-                # ===== MINIATURA CON NÚMERO DE PÁGINA =====
-                try:
-                    img = self._generate_thumbnail(i)
-                    if img: 
-                        img_width, img_height = img.size
-                        
-                        # Frame para la miniatura
-                        thumb_frame = ctk.CTkFrame(content_frame, fg_color="transparent")
-                        thumb_frame.pack(fill="both", padx=0, pady=0)
-                        
-                        # Miniatura
-                        ctk_img = ctk.CTkImage(light_image=img, size=(img_width, img_height))
-                        lbl_img = ctk.CTkLabel(
-                            thumb_frame,
-                            image=ctk_img,
-                            text="",
-                            corner_radius=3
-                        )
-                        lbl_img.pack(fill="both", padx=0, pady=0)
-                        self.thumbnails.append(ctk_img)
-                        
-                        # Número de página superpuesto
-                        num_label = ctk.CTkLabel(
-                            lbl_img,
-                            text=f"Página {i + 1}",
-                            font=ctk.CTkFont(size=12, weight="bold"),
-                            text_color="white",
-                            bg_color="transparent",
-                            corner_radius=3
-                        )
-                        num_label.place(relx=1, rely=1, anchor="se", padx=4, pady=4)
-                        
-                except Exception as e:
-                    print(f"[WARN] Error mostrando miniatura {i}: {e}")
-                    # Si falla la miniatura, mostrar placeholder
-                    placeholder = ctk.CTkLabel(
-                        content_frame,
-                        text=f"Página {i + 1}",
-                        font=ctk.CTkFont(size=11, weight="bold"),
-                        width=100,
-                        height=60
-                    )
-                    placeholder. pack(padx=4, pady=4)
-                
-                # ===== CHECKBOX ELIMINAR =====
-                info_frame = ctk.CTkFrame(content_frame, fg_color="transparent")
-                info_frame.pack(fill="x", padx=3, pady=3)
-                
-                chk = ctk.CTkCheckBox(
-                    info_frame,
-                    text="Eliminar",
-                    variable=var,
-                    font=ctk.CTkFont(size=10, weight="bold"),
-                    command=self._update_counter,
-                    corner_radius=3,
-                    checkbox_width=18,
-                    checkbox_height=18
-                )
-                chk. pack(anchor="w", pady=2, padx=2)
-                
-                self.check_vars.append(var)
-                self.checkboxes.append(chk)
-                self.page_cards.append(page_card)
-            
-            self._update_counter()
-            
-        except Exception as e:
-            messagebox.showerror("Error", f"Error al cargar las páginas:\n{str(e)}")
-            print(f"[ERROR] Cargar páginas: {e}")
-    
-    def _update_grid_columns(self):
-        """Configura grid con número correcto de columnas."""
-        # Limpiar configuración anterior
-        for i in range(10):
-            try:
-                self.scroll_frame.grid_columnconfigure(i, weight=0)
-            except:
-                pass
-        
-        # Configurar nuevas columnas
-        for i in range(self.num_columns):
-            self.scroll_frame.grid_columnconfigure(i, weight=1)
-    
-    def _reorganize_grid(self):
-        """Reorganiza widgets cuando cambian las columnas."""
-        if not self.page_cards:
+        self.canvas.yview_moveto(0)
+        self._schedule_refresh()
+    
+    def _on_pages_error(self, e):
+        messagebox.showerror("Error", f"Error al cargar las páginas:\n{str(e)}")
+        print(f"[ERROR] Cargar páginas: {e}")
+    
+    def _on_thumbnails_ready(self, token, batch):
+        """Guarda un lote de miniaturas y actualiza sus tarjetas (hilo de la interfaz)."""
+        if token != self.load_token:
+            return  # lote de un PDF anterior
+        for page, img in batch:
+            if img is None:
+                continue
+            self.thumbnails[page] = img
+            self.thumbnails.move_to_end(page)
+            card = self.page_cards.get(page)
+            if card is not None:
+                self._show_thumbnail(card, img)
+        while len(self.thumbnails) > THUMBNAIL_MEMORY:
+            self.thumbnails.popitem(last=False)
+    
+    # ==================== GRID VIRTUAL ====================
+    
+    def _schedule_refresh(self):
+        """Agrupa los eventos de scroll/resize en un solo refresco."""
+        if not self.refresh_pending:
+            self.refresh_pending = True
+            self.after_idle(self._refresh_visible)
+    
+    def _refresh_visible(self):
+        """Asigna tarjetas a las filas visibles (más BUFFER_ROWS) y pide sus miniaturas."""
+        self.refresh_pending = False
+        columns = self.num_columns
+        total_rows = (self.page_count + columns - 1) // columns
+        width = max(self.canvas.winfo_width(), 1)
+        height = max(self.canvas.winfo_height(), 1)
+        self.canvas.configure(scrollregion=(0, 0, width, total_rows * ROW_HEIGHT))
+        
+        top = self.canvas.canvasy(0)
+        first_visible = int(top // ROW_HEIGHT)
+        last_visible = int((top + height) // ROW_HEIGHT)
+        first_row = max(0, first_visible - BUFFER_ROWS)
+        last_row = min(total_rows - 1, last_visible + BUFFER_ROWS)
+        wanted = range(first_row * columns, min(self.page_count, (last_row + 1) * columns))
+        
+        # Liberar las tarjetas que salieron del rango
+        for page in list(self.page_cards):
+            if page not in wanted:
+                self._release_card(page)
+        
+        cell_width = width / columns
+        missing = []
+        for page in wanted:
+            card = self.page_cards.get(page)
+            if card is None:
+                card = self.free_cards.pop() if self.free_cards else self._create_page_card()
+                self._assign_card(card, page)
+            row, col = divmod(page, columns)
+            self.canvas.coords(card.window_id, (col + 0.5) * cell_width, row * ROW_HEIGHT + 4)
+            self.canvas.itemconfigure(card.window_id, state="normal")
+            if page not in self.thumbnails:
+                missing.append(page)
+        
+        # Primero las filas visibles, después el margen
+        visible = range(first_visible * columns, (last_visible + 1) * columns)
+        missing.sort(key=lambda p: (p not in visible, p))
+        self._request_thumbnails(missing)
+    
+    def _assign_card(self, card, page):
+        """Muestra la página `page` en una tarjeta libre."""
+        card.page = page
+        card.var.set(page in self.selected_pages)
+        card.number_label.configure(text=f"Página {page + 1}")
+        img = self.thumbnails.get(page)
+        if img is not None:
+            self.thumbnails.move_to_end(page)
+            self._show_thumbnail(card, img)
+        else:
+            card.image = None
+            card.image_label.configure(image=self.placeholder)
+        self.page_cards[page] = card
+    
+    def _release_card(self, page):
+        card = self.page_cards.pop(page)
+        card.page = None
+        self.canvas.itemconfigure(card.window_id, state="hidden")
+        self.free_cards.append(card)
+    
+    def _show_thumbnail(self, card, img):
+        """Pone la miniatura en la tarjeta, reducida si no cabe en THUMBNAIL_BOX."""
+        img_width, img_height = img.size
+        scale = min(1.0, THUMBNAIL_BOX[0] / img_width, THUMBNAIL_BOX[1] / img_height)
+        size = (max(1, int(img_width * scale)), max(1, int(img_height * scale)))
+        card.image = ctk.CTkImage(light_image=img, size=size)
+        card.image_label.configure(image=card.image)
+    
+    def _on_card_toggled(self, card):
+        if card.page is None:
             return
+        if card.var.get():
+            self.selected_pages.add(card.page)
+        else:
+            self.selected_pages.discard(card.page)
+        self._update_counter()
+    
+    def _create_page_card(self):
+        """Tarjeta compacta con miniatura, número de página y checkbox (sin página asignada)."""
+        var = ctk.BooleanVar()
+        
+        # Card de página compacta
+        page_card = ctk.CTkFrame(
+            self.canvas,
+            fg_color="gray20",
+            corner_radius=6,
+            border_width=1,
+            border_color="gray25"
+        )
         
-        self._update_grid_columns()
+        # Contenedor vertical
+        content_frame = ctk.CTkFrame(page_card, fg_color="transparent")
+        content_frame.pack(fill="both", expand=False, padx=0, pady=0)
         
-        for idx, page_card in enumerate(self.page_cards):
-            row = idx // self.num_columns
-            col = idx % self. num_columns
-            page_card.grid(row=row, column=col, padx=4, pady=4, sticky="n")
+        # ===== MINIATURA CON NÚMERO DE PÁGINA =====
+        thumb_frame = ctk.CTkFrame(content_frame, fg_color="transparent")
+        thumb_frame.pack(fill="both", padx=0, pady=0)
+        
+        lbl_img = ctk.CTkLabel(
+            thumb_frame,
+            image=self.placeholder,
+            text="",
+            width=THUMBNAIL_BOX[0],
+            height=THUMBNAIL_BOX[1],
+            corner_radius=3
+        )
+        lbl_img.pack(fill="both", padx=0, pady=0)
+        
+        # Número de página superpuesto
+        num_label = ctk.CTkLabel(
+            lbl_img,
+            text="",
+            font=ctk.CTkFont(size=12, weight="bold"),
+            text_color="white",
+            bg_color="transparent",
+            corner_radius=3
+        )
+        num_label.place(relx=1, rely=1, anchor="se", padx=4, pady=4)
+        
+        # ===== CHECKBOX ELIMINAR =====
+        info_frame = ctk.CTkFrame(content_frame, fg_color="transparent")
+        info_frame.pack(fill="x", padx=3, pady=3)
+        
+        chk = ctk.CTkCheckBox(
+            info_frame,
+            text="Eliminar",
+            variable=var,
+            font=ctk.CTkFont(size=10, weight="bold"),
+            corner_radius=3,
+            checkbox_width=18,
+            checkbox_height=18
+        )
+        chk. pack(anchor="w", pady=2, padx=2)
+        
+        window_id = self.canvas.create_window(0, 0, window=page_card, anchor="n", state="hidden")
+        card = _PageCard(page_card, window_id, lbl_img, num_label, var)
+        chk.configure(command=lambda: self._on_card_toggled(card))
+        self._bind_mouse_wheel(page_card)
+        return card
+    
+    def _clear_selection(self):
+        self.selected_pages.clear()
+        for card in self.page_cards.values():
+            card.var.set(False)
+        self._update_counter()
     
     def _update_counter(self):
         """Actualiza el contador de páginas seleccionadas."""
-        selected = sum(1 for var in self. check_vars if var.get())
-        total = len(self.check_vars)
+        selected = len(self.selected_pages)
+        total = self.page_count
         
         if selected > 0:
             self.counter_label.configure(
@@ -448,11 +696,11 @@ class PDFPageDeleterApp(ctk.CTkFrame):
     
     def _on_delete_pages(self):
         """Elimina las páginas seleccionadas y guarda el PDF."""
-        if not self.pdf_doc:
+        if not self.pdf_path:
             messagebox. showwarning("Advertencia", "Por favor, seleccione un archivo PDF primero.")
             return
         
-        pages_to_delete = [i for i, var in enumerate(self.check_vars) if var.get()]
+        pages_to_delete = sorted(self.selected_pages)
         
         if not pages_to_delete:
             messagebox. showwarning("Advertencia", "No ha seleccionado ninguna página para eliminar.")
@@ -475,71 +723,82 @@ class PDFPageDeleterApp(ctk.CTkFrame):
         if not response:
             return
         
-        try:
-            # Crear documento nuevo con las páginas no eliminadas
-            new_doc = fitz.open()
-            
-            for i in range(self.page_count):
-                if i not in pages_to_delete:
-                    new_doc.insert_pdf(self.pdf_doc, from_page=i, to_page=i)
-            
-            # Obtener ruta de salida
-            output_path = self._get_output_path()
-            
-            # Guardar documento
-            new_doc.save(output_path, garbage=4, deflate=True)
-            new_doc.close()
-            
-            # Guardar estado para deshacer
-            self.last_operation = {
-                'original':  self.pdf_path,
-                'created': output_path,
-                'deleted_pages': pages_to_delete. copy()
-            }
-            
-            self. undo_button.configure(state="normal")
-            
-            # Mensaje de éxito
-            messagebox.showinfo(
-                "Éxito",
-                f"✓ PDF generado correctamente\n\n"
-                f"{self.page_count - len(pages_to_delete)} páginas guardadas en:\n{output_path}"
-            )
-            
-            # Limpiar selección
-            for var in self.check_vars:
-                var.set(False)
-            self._update_counter()
-            
-        except Exception as e:
-            messagebox.showerror("Error", f"Error al procesar el PDF:\n{str(e)}")
-            print(f"[ERROR] Eliminar páginas: {e}")
+        # Obtener ruta de salida
+        output_path = self._get_output_path()
+        
+        # Guardar documento sin las páginas marcadas (en segundo plano)
+        self.delete_button.configure(state="disabled")
+        self.cancel_button.configure(state="normal")
+        self.progressbar.set(0)
+        pdf_path = self.pdf_path
+        save_profile = get_save_profile("Eliminar paginas de pdf")
+        incremental = self.incremental_var.get()
+        self.current_job = get_runner().submit(
+            self,
+            lambda job: delete_pages(
+                pdf_path, pages_to_delete, output_path,
+                progress_callback=job.progress, save_profile=save_profile,
+                incremental=incremental
+            ),
+            name="Eliminar páginas",
+            on_progress=self.progressbar.set,
+            on_done=lambda _: self._on_delete_done(pdf_path, pages_to_delete, output_path),
+            on_error=self._on_delete_error,
+            on_cancel=self._on_delete_cancelled,
+        )
+    
+    def _job_finished(self):
+        """Restablece los botones al terminar el trabajo."""
+        self.current_job = None
+        self.delete_button.configure(state="normal")
+        self.cancel_button.configure(state="disabled")
+    
+    def _on_delete_done(self, pdf_path, pages_to_delete, output_path):
+        self._job_finished()
+        self.progressbar.set(1)
+        
+        # Guardar estado para deshacer
+        self.last_operation = {
+            'original':  pdf_path,
+            'created': output_path,
+            'deleted_pages': pages_to_delete. copy()
+        }
+        
+        self. undo_button.configure(state="normal")
+        
+        # Mensaje de éxito
+        messagebox.showinfo(
+            "Éxito",
+            f"✓ PDF generado correctamente\n\n"
+            f"{self.page_count - len(pages_to_delete)} páginas guardadas en:\n{output_path}"
+        )
+        
+        # Limpiar selección
+        self._clear_selection()
+    
+    def _on_delete_error(self, e):
+        self._job_finished()
+        messagebox.showerror("Error", f"Error al procesar el PDF:\n{str(e)}")
+        print(f"[ERROR] Eliminar páginas: {e}")
+    
+    def _on_delete_cancelled(self):
+        self._job_finished()
+        self.progressbar.set(0)
+        messagebox.showinfo("Cancelado", "Se canceló la eliminación. No se creó ningún archivo.")
+    
+    def _on_cancel(self):
+        """Cancela la eliminación en curso."""
+        if self.current_job:
+            self.current_job.cancel()
+            self.cancel_button.configure(state="disabled")
     
     def _get_output_path(self):
         """Obtiene la ruta de salida con manejo de duplicados."""
-        output_folder = self.output_entry.get().strip()
-        if not output_folder:
-            output_folder = os.path.dirname(self.pdf_path)
-        
-        file_name = self.name_entry.get().strip()
-        if not file_name:
-            file_name = f"{os.path.splitext(os.path.basename(self.pdf_path))[0]}_editado"
-        
-        # Remover extensión si la incluyó el usuario
-        if file_name. lower().endswith('.pdf'):
-            file_name = file_name[:-4]
-        
-        output_path = os.path.join(output_folder, f"{file_name}.pdf")
-        
-        # Evitar sobrescribir archivos existentes
-        counter = 1
-        base_path = output_path
-        while os.path.exists(output_path):
-            name_without_ext = os.path.splitext(base_path)[0]
-            output_path = f"{name_without_ext} ({counter}).pdf"
-            counter += 1
-        
-        return output_path
+        return edited_output_path(
+            self.pdf_path,
+            self.output_entry.get().strip(),
+            self.name_entry.get().strip()
+        )
     
     def _on_undo(self):
         """Deshace la última operación eliminando el archivo creado."""
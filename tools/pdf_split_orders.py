@@ -1,11 +1,16 @@
 import os
-import re
 import fitz  # PyMuPDF
 import customtkinter as ctk
 import tkinter as tk
 from tkinter import filedialog, messagebox
 from typing import Optional, List, Dict
 
+from core.config import get_name_patterns, get_save_profile, set_name_patterns
+from core.jobs import get_runner
+from core.page_names import DEFAULT_NAME_PATTERNS, auto_names, compile_patterns, unmatched_names
+from core.pdf_ops import split_pdf_by_names
+from core.save_profiles import save_pdf
+
 
 
 # ==================== TEXTBOX CON PLACEHOLDER ====================
@@ -55,28 +60,11 @@ class CTkTextboxWithPlaceholder(ctk. CTkTextbox):
     def clear(self):
         self.delete("1.0", "end")
         self._show_placeholder()
-
-
-# ==================== UTILIDADES ====================
-
-def clean_filename(name: str) -> str:
-    """Elimina caracteres no permitidos en nombres de archivo."""
-    return re. sub(r'[\\/*? :"<>|]', "", name)
-
-
-def create_unique_path(base_path: str) -> str:
-    """Crea una ruta única si el archivo ya existe."""
-    if not os.path.exists(base_path):
-        return base_path
-    
-    base, ext = os.path.splitext(base_path)
-    counter = 2
-    
-    while True:
-        new_path = f"{base} ({counter}){ext}"
-        if not os.path.exists(new_path):
-            return new_path
-        counter += 1
+    
+    def set_content(self, text: str):
+        self._hide_placeholder()
+        self.delete("1.0", "end")
+        self.insert("1.0", text)
 
 
 # ==================== APLICACIÓN PRINCIPAL ====================
@@ -94,6 +82,7 @@ class PDFSplitOrdersApp(ctk.CTkFrame):
         self.pdf_path:  Optional[str] = None
         self.last_operation: Optional[Dict] = None
         self.page_count = 0
+        self.current_job = None           # Trabajo en segundo plano (core.jobs)
         
         # ===== CONSTRUIR UI =====
         self._create_widgets()
@@ -167,9 +156,25 @@ class PDFSplitOrdersApp(ctk.CTkFrame):
         self.prefix_entry.grid(row=3, column=1, columnspan=2, padx=(0, 6), pady=4, sticky="we")
         self.prefix_entry.insert(0, "OPF_900895359_IPSP_")
         
-        # Fila 4: Espaciador
-        spacer = ctk.CTkFrame(top_frame, height=2)
-        spacer.grid(row=4, column=0, columnspan=3)
+        # Fila 4: Patrones para tomar los nombres del texto del PDF (uno por línea)
+        lbl_patterns = ctk.CTkLabel(top_frame, text="Patrones:", width=60, anchor="w")
+        lbl_patterns.grid(row=4, column=0, padx=(6, 4), pady=4, sticky="nw")
+        
+        self.patterns_textbox = ctk.CTkTextbox(
+            top_frame,
+            height=54,
+            font=ctk.CTkFont(family="Consolas", size=11)
+        )
+        self.patterns_textbox.grid(row=4, column=1, padx=(0, 6), pady=4, sticky="we")
+        self.patterns_textbox.insert("1.0", "\n".join(get_name_patterns() or DEFAULT_NAME_PATTERNS))
+        
+        self.auto_names_button = ctk.CTkButton(
+            top_frame,
+            text="🔎 Nombres desde el PDF",
+            width=140,
+            command=self._on_auto_names
+        )
+        self.auto_names_button.grid(row=4, column=2, padx=(0, 6), pady=4, sticky="n")
         
         # Fila 5: Botones de acción
         btn_frame = ctk.CTkFrame(top_frame)
@@ -177,6 +182,7 @@ class PDFSplitOrdersApp(ctk.CTkFrame):
         btn_frame.grid_columnconfigure(0, weight=1)
         btn_frame.grid_columnconfigure(1, weight=1)
         btn_frame.grid_columnconfigure(2, weight=1)
+        btn_frame.grid_columnconfigure(3, weight=1)
         
         self.process_button = ctk.CTkButton(
             btn_frame,
@@ -203,6 +209,15 @@ class PDFSplitOrdersApp(ctk.CTkFrame):
         )
         self.clear_button.grid(row=0, column=2, padx=6, pady=4, sticky="we")
         
+        self.cancel_button = ctk.CTkButton(
+            btn_frame,
+            text="✖ Cancelar",
+            command=self._on_cancel,
+            fg_color="#d9534f"
+        )
+        self.cancel_button.grid(row=0, column=3, padx=6, pady=4, sticky="we")
+        self.cancel_button.configure(state="disabled")
+        
         top_frame.grid_columnconfigure(1, weight=1)
         
         # ===== PANEL DE NOMBRES =====
@@ -242,6 +257,11 @@ class PDFSplitOrdersApp(ctk.CTkFrame):
         
         # Binding para actualizar contador
         self.names_textbox.bind("<KeyRelease>", self._update_counter)
+        
+        # Barra de progreso (la división corre en segundo plano)
+        self.progressbar = ctk.CTkProgressBar(self, height=12, corner_radius=5)
+        self.progressbar.pack(fill="x", padx=6, pady=(2, 6))
+        self.progressbar.set(0)
     
     # ==================== EVENTOS ====================
     
@@ -383,6 +403,14 @@ class PDFSplitOrdersApp(ctk.CTkFrame):
             )
             return
         
+        pending = unmatched_names(names)
+        if pending and not messagebox.askyesno(
+            "Páginas sin nombre",
+            f"{len(pending)} página(s) siguen marcadas para revisar (ej: {pending[0]}).\n\n"
+            f"¿Dividir de todas formas con esos nombres?"
+        ):
+            return
+        
         # Crear carpeta si no existe
         if not os. path.exists(output_dir):
             try:
@@ -402,57 +430,148 @@ class PDFSplitOrdersApp(ctk.CTkFrame):
         if not response:
             return
         
-        # Procesar
+        # Procesar en segundo plano; el progreso vuelve con after()
+        self.process_button.configure(state="disabled")
+        self.cancel_button.configure(state="normal")
+        self.progressbar.set(0)
+        self.current_job = get_runner().submit(
+            self, self._run_split, pdf_path, output_dir, names, prefix, get_save_profile("Separar Ordenes OPF"),
+            name="Separar Ordenes",
+            on_progress=self.progressbar.set,
+            on_done=lambda result: self._on_split_done(pdf_path, *result),
+            on_error=self._on_split_error,
+            on_cancel=self._on_split_cancelled,
+        )
+    
+    def _get_patterns(self) -> List[str]:
+        text = self.patterns_textbox.get("1.0", "end")
+        return [line.strip() for line in text.split("\n") if line.strip()]
+    
+    def _on_auto_names(self):
+        """Llena los nombres con el documento/orden que aparece en el texto de cada página."""
+        pdf_path = self.pdf_entry.get().strip()
+        if not pdf_path or not os.path.exists(pdf_path):
+            messagebox.showerror("Error", "Selecciona un archivo PDF.")
+            return
+        
+        patterns = self._get_patterns()
         try:
-            doc = fitz.open(pdf_path)
-            created_files:  List[str] = []
-            
-            for i, name in enumerate(names):
-                # Crear nuevo documento con una página
-                new_doc = fitz.open()
-                new_doc.insert_pdf(doc, from_page=i, to_page=i)
-                
-                # Generar nombre del archivo
-                clean_name = clean_filename(name)
-                file_name = f"{prefix}{clean_name}.pdf"
-                file_path = os.path.join(output_dir, file_name)
-                file_path = create_unique_path(file_path)
-                
-                # Guardar
-                new_doc.save(file_path, garbage=4, deflate=True)
-                new_doc.close()
-                
-                created_files.append(file_path)
-                print(f"[INFO] Creado: {file_path}")
-            
-            doc.close()
-            
-            # Eliminar archivo original
-            original_removed = False
-            try:
-                os.remove(pdf_path)
-                original_removed = True
-                print(f"[INFO] Original eliminado: {pdf_path}")
-            except Exception as e: 
-                print(f"[WARN] No se pudo eliminar el original: {e}")
-            
-            # Guardar estado para deshacer
-            self.last_operation = {
-                'original_path': pdf_path,
-                'original_removed': original_removed,
-                'created_files': created_files. copy()
-            }
-            self.undo_button.configure(state="normal")
-            
-            # Mensaje de éxito
-            msg = f"Se han creado {len(created_files)} archivos PDF."
-            if original_removed:
-                msg += "\nEl archivo original ha sido eliminado."
-            messagebox.showinfo("Éxito", msg)
-            
+            compile_patterns(patterns)
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
+            return
+        
+        # Guardar los patrones (vacío = los predeterminados)
+        try:
+            set_name_patterns([] if patterns == DEFAULT_NAME_PATTERNS else patterns)
+        except OSError as e:
+            print(f"[WARN] No se pudieron guardar los patrones: {e}")
+        
+        self.auto_names_button.configure(state="disabled")
+        self.process_button.configure(state="disabled")
+        self.cancel_button.configure(state="normal")
+        self.progressbar.set(0)
+        self.current_job = get_runner().submit(
+            self,
+            lambda job: auto_names(pdf_path, patterns, progress_callback=job.progress),
+            name="Nombres desde el PDF",
+            on_progress=self.progressbar.set,
+            on_done=self._on_auto_names_done,
+            on_error=self._on_auto_names_error,
+            on_cancel=self._on_auto_names_cancelled,
+        )
+    
+    def _auto_names_finished(self):
+        self._job_finished()
+        self.auto_names_button.configure(state="normal")
+    
+    def _on_auto_names_done(self, result):
+        self._auto_names_finished()
+        names, unmatched = result
+        self.page_count = len(names)
+        self.names_textbox.set_content("\n".join(names))
+        self._update_counter()
+        self.progressbar.set(1)
+        
+        if unmatched:
+            shown = ", ".join(str(i + 1) for i in unmatched[:30])
+            if len(unmatched) > 30:
+                shown += ", ..."
+            messagebox.showwarning(
+                "Revisar páginas",
+                f"Se encontraron {len(names) - len(unmatched)} de {len(names)} nombres.\n\n"
+                f"Sin coincidencia (quedan como REVISAR_PAG_n; corrígelas en la lista):\n{shown}"
+            )
+        else:
+            messagebox.showinfo("Nombres", f"Se encontraron los {len(names)} nombres.")
+    
+    def _on_auto_names_error(self, err):
+        self._auto_names_finished()
+        messagebox.showerror("Error", f"No se pudo leer el texto del PDF:\n{err}")
+    
+    def _on_auto_names_cancelled(self):
+        self._auto_names_finished()
+        self.progressbar.set(0)
+    
+    def _run_split(self, job, pdf_path, output_dir, names, prefix, save_profile):
+        """Divide el PDF (trabajo en segundo plano). Retorna (archivos creados, original eliminado)."""
+        created_files = split_pdf_by_names(
+            pdf_path, output_dir, names, prefix,
+            progress_callback=job.progress,
+            save_profile=save_profile
+        )
+        
+        # Eliminar archivo original
+        original_removed = False
+        try:
+            os.remove(pdf_path)
+            original_removed = True
+            print(f"[INFO] Original eliminado: {pdf_path}")
         except Exception as e: 
-            messagebox.showerror("Error", f"Hubo un error:\n{e}")
-            print(f"[ERROR] {e}")
+            print(f"[WARN] No se pudo eliminar el original: {e}")
+        return created_files, original_removed
+    
+    def _job_finished(self):
+        """Restablece los botones al terminar el trabajo."""
+        self.current_job = None
+        self.process_button.configure(state="normal")
+        self.cancel_button.configure(state="disabled")
+    
+    def _on_split_done(self, pdf_path, created_files, original_removed):
+        self._job_finished()
+        
+        # Guardar estado para deshacer
+        self.last_operation = {
+            'original_path': pdf_path,
+            'original_removed': original_removed,
+            'created_files': created_files.copy()
+        }
+        self.undo_button.configure(state="normal")
+        self.progressbar.set(1)
+        
+        # Mensaje de éxito
+        msg = f"Se han creado {len(created_files)} archivos PDF."
+        if original_removed:
+            msg += "\nEl archivo original ha sido eliminado."
+        messagebox.showinfo("Éxito", msg)
+    
+    def _on_split_error(self, err):
+        self._job_finished()
+        messagebox.showerror("Error", f"Hubo un error:\n{err}")
+    
+    def _on_split_cancelled(self):
+        self._job_finished()
+        self.progressbar.set(0)
+        messagebox.showinfo(
+            "Cancelado",
+            "Se canceló la división. El original no se eliminó; las páginas ya escritas se mantienen."
+        )
+    
+    def _on_cancel(self):
+        """Cancela la división en curso."""
+        if self.current_job:
+            self.current_job.cancel()
+            self.cancel_button.configure(state="disabled")
     
     def _on_undo(self):
         """Deshace la última operación."""
@@ -492,7 +611,7 @@ class PDFSplitOrdersApp(ctk.CTkFrame):
                             merged_doc.insert_pdf(src_doc)
                             src_doc.close()
                     
-                    merged_doc.save(original_path, garbage=4, deflate=True)
+                    save_pdf(merged_doc, original_path, get_save_profile("Separar Ordenes OPF"))
                     merged_doc.close()
                     print(f"[INFO] Original restaurado: {original_path}")
                 except Exception as e:
@@ -4,6 +4,10 @@ import customtkinter as ctk
 import tkinter as tk
 from tkinter import filedialog, messagebox
 
+from core.config import get_save_profile
+from core.jobs import get_runner
+from core.pdf_ops import split_pdf_pages
+
 class PDFSplitterApp(ctk.CTkFrame):
     def __init__(self, master, go_home):
         super().__init__(master)
@@ -18,6 +22,7 @@ class PDFSplitterApp(ctk.CTkFrame):
         # Default: activar la opción de agregar nombres por página
         self.manual_rename_var = ctk.BooleanVar(value=False)
         self.last_split = None       # {'original': path, 'created_files': [...]}
+        self.current_job = None      # background job (core.jobs)
 
         # Additional state for prefix & preview behavior
         self.prefix_var = tk.StringVar(value="")
@@ -82,6 +87,7 @@ class PDFSplitterApp(ctk.CTkFrame):
         btn_frame.grid_columnconfigure(0, weight=1)
         btn_frame.grid_columnconfigure(1, weight=1)
         btn_frame.grid_columnconfigure(2, weight=1)
+        btn_frame.grid_columnconfigure(3, weight=1)
 
         self.split_button = ctk.CTkButton(btn_frame, text="Dividir PDF", command=self.on_split_pdf, fg_color="#1f6feb")
         self.split_button.grid(row=0, column=0, padx=6, pady=4, sticky="we")
@@ -94,6 +100,10 @@ class PDFSplitterApp(ctk.CTkFrame):
         self.clear_names_button = ctk.CTkButton(btn_frame, text="Limpiar nombres", command=self.on_clear_names)
         self.clear_names_button.grid(row=0, column=2, padx=6, pady=4, sticky="we")
 
+        self.cancel_button = ctk.CTkButton(btn_frame, text="Cancelar", command=self.on_cancel, fg_color="#d9534f")
+        self.cancel_button.grid(row=0, column=3, padx=6, pady=4, sticky="we")
+        self.cancel_button.configure(state="disabled")
+
         top_frame.grid_columnconfigure(1, weight=1)
 
         # Preview panel (no title), compact margins
@@ -127,6 +137,11 @@ class PDFSplitterApp(ctk.CTkFrame):
 
         self.pages_list_labels = []
 
+        # Progress bar (division runs in background)
+        self.progressbar = ctk.CTkProgressBar(self, height=12, corner_radius=5)
+        self.progressbar.pack(fill="x", padx=12, pady=(0, 8))
+        self.progressbar.set(0)
+
     # --- UI Handlers ---
     def on_select_pdf(self):
         path = filedialog.askopenfilename(filetypes=[("Archivos PDF", "*.pdf")])
@@ -292,16 +307,6 @@ class PDFSplitterApp(ctk.CTkFrame):
         self.out_entry.delete(0, tk.END)
         self.out_entry.insert(0, folder)
 
-    def _ensure_unique_filename(self, path, existing_paths=None):
-        existing_paths = set(existing_paths or [])
-        base, ext = os.path.splitext(path)
-        candidate = path
-        counter = 1
-        while os.path.exists(candidate) or candidate in existing_paths:
-            candidate = f"{base} ({counter}){ext}"
-            counter += 1
-        return candidate
-
     # --- Split / Undo logic ---
     def on_split_pdf(self):
         pdf_path = self.pdf_entry.get().strip() or self.pdf_path
@@ -346,60 +351,79 @@ class PDFSplitterApp(ctk.CTkFrame):
         prefix = self.prefix_var.get().strip()
         manual = self.manual_rename_var.get()
 
-        try:
-            doc = fitz.open(pdf_path)
-            num_pages = doc.page_count
-            created_files = []
-            for i in range(num_pages):
-                if manual and i < len(self.rename_entries):
-                    body = self.rename_entries[i].get().strip()
-                    # if user accidentally pasted prefix into body, strip it
-                    if body and "_" in body and body.split("_", 1)[0] == prefix:
-                        body = body.split("_", 1)[1]
-                    # compose final name with prefix if present
-                    final_name = f"{prefix}_{body}" if prefix else body
-                else:
-                    final_name = self.base_names[i] if i < len(self.base_names) else f"Página_{i+1}"
-
-                safe_name = "".join(ch for ch in final_name if ch not in r'\/:*?"<>|').strip()
-                if not safe_name:
-                    safe_name = f"Página_{i+1}"
-
-                intended = os.path.join(output_dir, f"{safe_name}.pdf")
-                out_filename = self._ensure_unique_filename(intended, existing_paths=created_files)
-
-                new_pdf = fitz.open()
-                new_pdf.insert_pdf(doc, from_page=i, to_page=i)
-                new_pdf.save(out_filename)
-                new_pdf.close()
-                created_files.append(out_filename)
-                print(f"[INFO] Página {i+1}/{num_pages} escrita en: {out_filename}")
-
-            doc.close()
+        names = None
+        if manual:
+            names = []
+            for entry in self.rename_entries:
+                try:
+                    names.append(entry.get())
+                except Exception:
+                    names.append("")
+
+        # Division runs as a background job; progress comes back through after()
+        self.split_button.configure(state="disabled")
+        self.cancel_button.configure(state="normal")
+        self.progressbar.set(0)
+        self.current_job = get_runner().submit(
+            self, self._run_split, pdf_path, output_dir, names, prefix, get_save_profile("Dividir PDF"),
+            name="Dividir PDF",
+            on_progress=self.progressbar.set,
+            on_done=lambda result: self._on_split_done(pdf_path, *result),
+            on_error=self._on_split_error,
+            on_cancel=self._on_split_cancelled,
+        )
 
-            removed_original = False
-            try:
-                os.remove(pdf_path)
-                removed_original = True
-                print(f"[INFO] Archivo original eliminado: {pdf_path}")
-            except Exception as e_rm:
-                print(f"[WARN] No se pudo eliminar el original: {e_rm}")
-
-            self.last_split = {
-                "original_path": pdf_path,
-                "created_files": created_files,
-                "original_removed": removed_original
-            }
-            self.undo_button.configure(state="normal")
-
-            if removed_original:
-                messagebox.showinfo("Éxito", f"Se han creado {len(created_files)} archivos PDF y el original ha sido eliminado.")
-            else:
-                messagebox.showinfo("Éxito", f"Se han creado {len(created_files)} archivos PDF. No se eliminó el original.")
+    def _run_split(self, job, pdf_path, output_dir, names, prefix, save_profile):
+        """Worker side: split and remove the original. Returns (created_files, removed_original)."""
+        created_files = split_pdf_pages(
+            pdf_path, output_dir, names=names, prefix=prefix,
+            progress_callback=job.progress,
+            save_profile=save_profile
+        )
 
-        except Exception as e:
-            messagebox.showerror("Error", f"Hubo un error al procesar el PDF: {e}")
-            print(f"[ERROR] Al dividir PDF: {e}")
+        removed_original = False
+        try:
+            os.remove(pdf_path)
+            removed_original = True
+            print(f"[INFO] Archivo original eliminado: {pdf_path}")
+        except Exception as e_rm:
+            print(f"[WARN] No se pudo eliminar el original: {e_rm}")
+        return created_files, removed_original
+
+    def _job_finished(self):
+        self.current_job = None
+        self.split_button.configure(state="normal")
+        self.cancel_button.configure(state="disabled")
+
+    def _on_split_done(self, pdf_path, created_files, removed_original):
+        self._job_finished()
+        self.last_split = {
+            "original_path": pdf_path,
+            "created_files": created_files,
+            "original_removed": removed_original
+        }
+        self.undo_button.configure(state="normal")
+        self.progressbar.set(1)
+
+        if removed_original:
+            messagebox.showinfo("Éxito", f"Se han creado {len(created_files)} archivos PDF y el original ha sido eliminado.")
+        else:
+            messagebox.showinfo("Éxito", f"Se han creado {len(created_files)} archivos PDF. No se eliminó el original.")
+
+    def _on_split_error(self, err):
+        print(f"[ERROR] Al dividir PDF: {err}")
+        self._job_finished()
+        messagebox.showerror("Error", f"Hubo un error al procesar el PDF: {err}")
+
+    def _on_split_cancelled(self):
+        self._job_finished()
+        self.progressbar.set(0)
+        messagebox.showinfo("Cancelado", "Se canceló la división. El original no se eliminó; las páginas ya escritas se mantienen.")
+
+    def on_cancel(self):
+        if self.current_job:
+            self.current_job.cancel()
+            self.cancel_button.configure(state="disabled")
 
     def on_undo(self):
         if not self.last_split:
@@ -1,14 +1,8 @@
-from tools.base import BaseTool
-from tools.pdf_splitter import PDFSplitterApp
-from ALGORITMOS_BASE.pdf_splitter2 import PDFSplitterApp2
-from tools.pdf_page_deleter import PDFPageDeleterApp
-from tools.horus import HorusApp
-from tools.validate_emails import ValidateEmailApp
-from tools.pdf_merge import PDFMergerApp
-from tools.pdf_merge_group import PDFMergerGroupApp
-from tools.pdf_multiplier_support import PDFMultiplierSupportApp
-from tools.pdf_split_orders import PDFSplitOrdersApp
-from tools.carnet_virtual import CarnetVirtualApp
+import importlib
+
+# Cada herramienta indica el módulo y el nombre de la clase; el módulo solo se
+# importa al abrir la herramienta (load_tool_class). Así el arranque no carga
+# fitz, pandas, openpyxl, requests, etc.
 
 TOOLS_REGISTRY = [
 
@@ -16,96 +10,124 @@ TOOLS_REGISTRY = [
         "name": "Unir PDFs",
         "description": "Une múltiples archivos PDF seleccionados en uno solo.",
         "category": "PDF",
-        "class": PDFMergerApp,
+        "module": "tools.pdf_merge",
+        "class": "PDFMergerApp",
     },
     {
         "name": "Unir grupos de PDFs",
         "description": "Une grupos de archivos PDF de acuerdo al nombres similares.",
         "category": "PDF",
-        "class": PDFMergerGroupApp,
+        "module": "tools.pdf_merge_group",
+        "class": "PDFMergerGroupApp",
     },
     {
         "name": "Dividir PDF",
         "description": "Divide un archivo PDF en múltiples archivos según el número de páginas.",
         "category": "PDF",
-        "class": PDFSplitterApp,
+        "module": "tools.pdf_splitter",
+        "class": "PDFSplitterApp",
     },
     {
         "name": "Eliminar paginas de pdf",
         "description": "Permite eliminar páginas específicas de un archivo PDF.",
         "category": "PDF",
-        "class": PDFPageDeleterApp,
+        "module": "tools.pdf_page_deleter",
+        "class": "PDFPageDeleterApp",
     },
     {
         "name": "Multiplicar Soportes CRC",
         "description": "Multiplica un archivo PDF con diferentes nombres de soporte.",
         "category": "FACTURA",
-        "class": PDFMultiplierSupportApp,
+        "module": "tools.pdf_multiplier_support",
+        "class": "PDFMultiplierSupportApp",
     },
     {
         "name": "Separar Ordenes OPF",
         "description": "Divide un archivo PDF de órdenes OPF en múltiples archivos individuales por paciente.",
         "category": "FACTURA",
-        "class": PDFSplitOrdersApp,
+        "module": "tools.pdf_split_orders",
+        "class": "PDFSplitOrdersApp",
     },
     {
         "name": "Validar correos",
         "description": "Valida si una lista de correos electrónicos son válidos o no.",
         "category": "Revisión",
-        "class": ValidateEmailApp,
+        "module": "tools.validate_emails",
+        "class": "ValidateEmailApp",
     },
     {
         "name": "HORUS",
         "description": "Consulta de afiliados en HORUS a partir del detalle de carga.",
         "category": "Revisión",
-        "class": HorusApp,
+        "module": "tools.horus",
+        "class": "HorusApp",
     },
         # {
     #     "name": "Contar Páginas",
     #     "description": "Cuenta el número de páginas totales eun una carpeta de archivos PDF.",
     #     "category": "Revisión",
-    #     "class": BaseTool,
+    #     "module": "tools.base",
+    #     "class": "BaseTool",
     # },
     # {
     #     "name": "Actualizar # Factura",
     #     "description": "Permite insertar o actualizar el número de factura en un conjunto de archivos PDF.",
     #     "category": "PDF",
-    #     "class": BaseTool,
+    #     "module": "tools.base",
+    #     "class": "BaseTool",
     # },
     {
         "name": "Extraer paginas de PDF",
         "description": "",
         "category": "PDF",
-        "class": PDFSplitterApp2,
+        "module": "ALGORITMOS_BASE.pdf_splitter2",
+        "class": "PDFSplitterApp2",
     },
     {
         "name": "Base Carnet Virtual",
         "description": "Genera el archivo masivo con las vacunas aplicadas listo para cargar al sistema",
         "category": "VAXTHERA",
-        "class": CarnetVirtualApp,
+        "module": "tools.carnet_virtual",
+        "class": "CarnetVirtualApp",
     },
     # {
     #     "name": "Reporte POLIZA",
     #     "description": "Genera el archivo de reporte de aplicaciones",
     #     "category": "VAXTHERA",
-    #     "class": BaseTool,
+    #     "module": "tools.base",
+    #     "class": "BaseTool",
     # },
     # {
     #     "name": "",
     #     "description": "",
     #     "category": "",
-    #     "class": BaseTool,
+    #     "module": "tools.base",
+    #     "class": "BaseTool",
     # },
     # {
     #     "name": "",
     #     "description": "",
     #     "category": "",
-    #     "class": BaseTool,
+    #     "module": "tools.base",
+    #     "class": "BaseTool",
     # },
     # {
     #     "name": "",
     #     "description": "",
     #     "category": "",
-    #     "class": BaseTool,
+    #     "module": "tools.base",
+    #     "class": "BaseTool",
     # }
 ]
+
+
+_loaded_classes = {}
+
+
+def load_tool_class(tool):
+    """Importa (una sola vez) el módulo de la herramienta y retorna su clase."""
+    key = (tool["module"], tool["class"])
+    if key not in _loaded_classes:
+        module = importlib.import_module(tool["module"])
+        _loaded_classes[key] = getattr(module, tool["class"])
+    return _loaded_classes[key]
@@ -1,93 +1,11 @@
 import customtkinter as ctk
 from tkinter import filedialog, messagebox
 import tkinter as tk
-import dns.resolver
-import pandas as pd
-import re
-import unicodedata
 import os
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from functools import lru_cache
-from dataclasses import dataclass
 from typing import Optional, List
 import threading
 
-# ==================== DATACLASS PARA ERRORES ====================
-@dataclass
-class EmailError:
-    """Clase para almacenar información de errores en correos."""
-    row: int
-    email: str
-    error_type: str
-    detail:  str = ""
-
-
-# ==================== CLASE VALIDADOR ====================
-class EmailValidator:
-    """
-    Clase encargada de toda la lógica de validación de correos.
-    Valida formato, caracteres y dominios MX.
-    """
-    
-    EMAIL_PATTERN = re.compile(r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$")
-    EMAIL_COLUMN_NAMES = ['correo', 'email', 'e-mail', 'mail', 'correo electrónico', 'correo electronico']
-    
-    @staticmethod
-    def normalize_text(text: str) -> str:
-        """Elimina acentos y caracteres especiales Unicode."""
-        nfkd = unicodedata.normalize('NFKD', text)
-        return ''.join(c for c in nfkd if not unicodedata.combining(c))
-    
-    def is_valid_email(self, email: str) -> bool:
-        """Valida el formato del correo electrónico."""
-        email = email.strip()
-        email = self.normalize_text(email)
-        if not email or any(ord(c) > 127 for c in email):
-            return False
-        return self.EMAIL_PATTERN.fullmatch(email) is not None
-    
-    @lru_cache(maxsize=500)
-    def is_valid_domain(self, domain: str) -> bool:
-        """Valida que el dominio tenga registros MX válidos (con caché)."""
-        try:
-            dns.resolver.resolve(domain, 'MX', lifetime=3)
-            return True
-        except Exception:
-            return False
-    
-    def find_email_column(self, columns: List[str]) -> Optional[str]:
-        """Busca automáticamente la columna que contiene correos."""
-        columns_lower = [col.lower().strip() for col in columns]
-        for name in self.EMAIL_COLUMN_NAMES:
-            if name in columns_lower:
-                return columns[columns_lower.index(name)]
-        return None
-    
-    def validate_single_email(self, idx: int, email: str) -> Optional[EmailError]:
-        """Valida un correo individual y retorna el error si existe."""
-        if pd.isna(email):
-            return None
-        
-        email = str(email).strip()
-        
-        if '@' not in email:
-            return EmailError(idx, email, "FORMATO", "Falta el carácter '@'")
-        
-        user, domain = email.split('@', 1)
-        
-        if any(ord(c) > 127 for c in user):
-            return EmailError(idx, email, "CARACTERES", "Usuario contiene acentos o caracteres no permitidos")
-        
-        clean_email = self.normalize_text(email)
-        
-        if not self.is_valid_email(clean_email):
-            return EmailError(idx, email, "FORMATO", "Formato de correo inválido")
-        
-        clean_domain = clean_email.split('@')[1]
-        if not self.is_valid_domain(clean_domain):
-            return EmailError(idx, email, "DOMINIO", f"Dominio inválido ({clean_domain})")
-        
-        return None
+from core.email_validator import EmailError, EmailValidator, read_email_column, validate_emails
 
 
 class ValidateEmailApp(ctk.CTkFrame):
@@ -312,9 +230,9 @@ class ValidateEmailApp(ctk.CTkFrame):
         
         self._update_ui(clean_and_start)
         
-        # Leer archivo Excel
+        # Leer archivo Excel y buscar columna de correos
         try:
-            df = pd.read_excel(self.file_path, engine='openpyxl')
+            email_column, columns, emails = read_email_column(self.file_path, self.validator)
         except Exception as e:
             def show_error():
                 self.results_textbox.insert("end", f"❌ Error al leer el archivo:\n{str(e)}\n")
@@ -323,12 +241,10 @@ class ValidateEmailApp(ctk.CTkFrame):
             self._update_ui(show_error)
             return
         
-        # Buscar columna de correos
-        email_column = self.validator.find_email_column(df.columns. tolist())
         if not email_column:
             def show_column_error():
                 self.results_textbox.insert("end", "❌ No se encontró una columna de correos.\n")
-                self.results_textbox.insert("end", f"\nColumnas disponibles:  {', '.join(df.columns.tolist())}\n")
+                self.results_textbox.insert("end", f"\nColumnas disponibles:  {', '.join(map(str, columns))}\n")
                 self.results_textbox.insert("end", "\n💡 Tip: Renombra la columna a 'correo', 'email' o 'mail'\n")
                 self.status_label.configure(text="⚠️ Columna de correos no encontrada", text_color="red")
                 self._restore_buttons()
@@ -336,9 +252,7 @@ class ValidateEmailApp(ctk.CTkFrame):
             return
         
         # Preparar datos
-        emails = df[email_column].tolist()
         total = len(emails)
-        errors:  List[EmailError] = []
         
         def show_start():
             self.results_textbox.insert("end", f"📄 Archivo:  {os.path.basename(self.file_path)}\n")
@@ -348,36 +262,25 @@ class ValidateEmailApp(ctk.CTkFrame):
         
         self._update_ui(show_start)
         
-        # Validación paralela
-        with ThreadPoolExecutor(max_workers=10) as executor:
-            futures = {
-                executor.submit(self.validator.validate_single_email, idx + 2, email): idx
-                for idx, email in enumerate(emails)
-            }
-            
-            completed = 0
-            for future in as_completed(futures):
-                completed += 1
-                result = future.result()
-                
-                if result:
-                    errors.append(result)
-                    error = result
-                    
-                    def show_error(e=error):
-                        icon = "❌" if e.error_type == "FORMATO" else "⚠️" if e.error_type == "DOMINIO" else "🚫"
-                        self.results_textbox.insert("end", f"Fila {e.row}: '{e.email}' {icon} {e.detail}\n")
-                        self. results_textbox.see("end")
-                    
-                    self._update_ui(show_error)
+        def on_result(error: Optional[EmailError], completed: int, total: int):
+            if error:
+                def show_error(e=error):
+                    icon = "❌" if e.error_type == "FORMATO" else "⚠️" if e.error_type == "DOMINIO" else "🚫"
+                    self.results_textbox.insert("end", f"Fila {e.row}: '{e.email}' {icon} {e.detail}\n")
+                    self. results_textbox.see("end")
                 
-                progress = completed / total
-                
-                def update_progress(p=progress, c=completed, t=total):
-                    self.progressbar.set(p)
-                    self.status_label.configure(text=f"⏳ Procesando... {c}/{t} ({int(p*100)}%)")
-                
-                self._update_ui(update_progress)
+                self._update_ui(show_error)
+            
+            progress = completed / total
+            
+            def update_progress(p=progress, c=completed, t=total):
+                self.progressbar.set(p)
+                self.status_label.configure(text=f"⏳ Procesando... {c}/{t} ({int(p*100)}%)")
+            
+            self._update_ui(update_progress)
+        
+        # Validación paralela
+        errors: List[EmailError] = validate_emails(emails, self.validator, on_result=on_result)
         
         # Resumen final
         total_errors = len(errors)
@@ -1,6 +1,7 @@
 import customtkinter as ctk
 from ui.sidebar import Sidebar
-from tools.tools_registry import TOOLS_REGISTRY
+from ui.settings_view import SettingsView
+from tools.tools_registry import TOOLS_REGISTRY, load_tool_class
 
 
 class MainWindow(ctk.CTkFrame):
@@ -159,11 +160,7 @@ class MainWindow(ctk.CTkFrame):
     def show_settings(self):
         self.clear_content()
         self.current_view = "settings"
-        ctk.CTkLabel(
-            self.content,
-            text="⚙️ Configuración",
-            font=("Arial", 20, "bold")
-        ).pack(pady=20)
+        SettingsView(self.content, self.config).pack(expand=True, fill="both")
 
     # ------------------ SUPPORT ------------------
     def show_support(self):
@@ -191,7 +188,8 @@ class MainWindow(ctk.CTkFrame):
             return
 
         try:
-            tool_class = tool_data.get("class")
+            # El módulo de la herramienta se importa aquí, la primera vez que se abre
+            tool_class = load_tool_class(tool_data)
             tool_frame = tool_class(self.content, go_home=self.show_home)
             tool_frame.pack(expand=True, fill="both")
         except Exception as e:
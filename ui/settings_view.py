@@ -1,5 +1,18 @@
 import customtkinter as ctk
-from core.config import save_config
+from core.config import set_save_profile, update_config
+from core.instrumentation import set_profiling
+from core.save_profiles import PROFILE_CHOICES
+
+# Herramientas que guardan PDFs con fitz (nombre en TOOLS_REGISTRY)
+SAVE_PROFILE_TOOLS = [
+    "Unir PDFs",
+    "Unir grupos de PDFs",
+    "Dividir PDF",
+    "Eliminar paginas de pdf",
+    "Multiplicar Soportes CRC",
+    "Separar Ordenes OPF",
+    "Extraer paginas de PDF",
+]
 
 class SettingsView(ctk.CTkFrame):
     def __init__(self, master, app_config):
@@ -16,7 +29,42 @@ class SettingsView(ctk.CTkFrame):
         self.theme_option.set(self.app_config.get("theme", "dark"))
         self.theme_option.pack(pady=10)
 
+        # Perfilado de rendimiento (guarda un .pstats por trabajo en data/profiles)
+        self.profiling_switch = ctk.CTkSwitch(
+            self, text="Perfilar trabajos (data/profiles)",
+            command=self.toggle_profiling
+        )
+        if self.app_config.get("profiling", False):
+            self.profiling_switch.select()
+        self.profiling_switch.pack(pady=10)
+
+        # Perfil de guardado por herramienta (ver core/save_profiles.py)
+        ctk.CTkLabel(
+            self, text="Perfil de guardado (fast: rápido, smallest: más pequeño, auto: según el PDF)",
+            font=("Arial", 13, "bold")
+        ).pack(pady=(15, 5))
+        profiles_frame = ctk.CTkFrame(self)
+        profiles_frame.pack(pady=5)
+        saved_profiles = self.app_config.get("save_profiles", {})
+        for row, tool_name in enumerate(SAVE_PROFILE_TOOLS):
+            ctk.CTkLabel(profiles_frame, text=tool_name, anchor="w").grid(row=row, column=0, sticky="w", padx=10, pady=3)
+            option = ctk.CTkOptionMenu(
+                profiles_frame, values=list(PROFILE_CHOICES), width=120,
+                command=lambda value, name=tool_name: self.change_save_profile(name, value)
+            )
+            option.set(saved_profiles.get(tool_name, "auto"))
+            option.grid(row=row, column=1, padx=10, pady=3)
+
     def change_theme(self, new_theme):
         self.app_config["theme"] = new_theme
-        save_config(self.app_config)
+        update_config(theme=new_theme)
         ctk.set_appearance_mode(new_theme)
+
+    def toggle_profiling(self):
+        enabled = bool(self.profiling_switch.get())
+        self.app_config["profiling"] = enabled
+        update_config(profiling=enabled)
+        set_profiling(enabled)
+
+    def change_save_profile(self, tool_name, profile):
+        self.app_config["save_profiles"] = set_save_profile(tool_name, profile)